@@ -0,0 +1,67 @@
+"""
+Compare JSON codecs on a large JSON API document.
+
+Usage: python benchmarks/bench_codec.py [number-of-resources]
+
+For each installed codec this measures decoding and encoding of the raw document
+and the full Session.read() path (decode + Document construction).
+"""
+
+import sys
+import timeit
+
+from jsonapi_client.codec import CODECS, get_codec
+from jsonapi_client.session import Session
+
+
+def make_document(count: int) -> dict:
+    return {
+        'data': [
+            {
+                'type': 'articles',
+                'id': str(i),
+                'attributes': {
+                    'title': f'Article number {i}',
+                    'body': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 4,
+                    'tags': ['json', 'api', 'benchmark'],
+                    'stats': {'views': i * 7, 'likes': i % 13, 'ratio': i / 7},
+                },
+                'relationships': {
+                    'author': {'data': {'type': 'people', 'id': str(i % 50)}},
+                },
+                'links': {'self': f'http://example.com/articles/{i}'},
+            }
+            for i in range(count)
+        ],
+        'links': {'self': 'http://example.com/articles'},
+    }
+
+
+def best_of(func, repeat: int=5) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(count: int) -> None:
+    document = make_document(count)
+    encoded = get_codec('json').dumps(document)
+    print(f'Document: {count} resources, {len(encoded) / 1e6:.1f} MB')
+    print(f'{"codec":<8} {"loads":>9} {"dumps":>9} {"read":>9}')
+
+    for name, codec_class in CODECS.items():
+        try:
+            codec = codec_class()
+        except ImportError:
+            print(f'{name:<8} (not installed)')
+            continue
+        session = Session('http://example.com', json_codec=codec)
+        loads = best_of(lambda: codec.loads(encoded))
+        dumps = best_of(lambda: codec.dumps(document))
+        read = best_of(lambda: session.read(encoded, 'http://example.com/articles',
+                                            no_cache=True))
+        print(f'{name:<8} {loads * 1000:>7.1f}ms {dumps * 1000:>7.1f}ms '
+              f'{read * 1000:>7.1f}ms')
+        session.close()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
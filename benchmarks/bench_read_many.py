@@ -0,0 +1,84 @@
+"""
+Compare Session.read with Session.read_many on many JSON API documents.
+
+Usage: python benchmarks/bench_read_many.py [number-of-documents]
+
+Documents are written as JSON files to a temporary directory and read with a
+schema, sequentially and with an increasing number of worker processes.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from jsonapi_client.session import Session
+
+
+SCHEMA = {
+    'articles': {'properties': {
+        'title': {'type': 'string'},
+        'body': {'type': 'string'},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+        'views': {'type': 'integer'},
+        'author': {'relation': 'to-one', 'resource': ['people']}}},
+    'people': {'properties': {'name': {'type': 'string'}}},
+}
+
+
+def make_document(number: int, count: int=100) -> dict:
+    return {
+        'data': [
+            {
+                'type': 'articles',
+                'id': f'{number}-{i}',
+                'attributes': {
+                    'title': f'Article number {i}',
+                    'body': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 4,
+                    'tags': ['json', 'api', 'benchmark'],
+                    'views': i * 7,
+                },
+                'relationships': {
+                    'author': {'data': {'type': 'people', 'id': str(i % 10)}},
+                },
+            }
+            for i in range(count)
+        ],
+        'included': [{'type': 'people', 'id': str(i), 'attributes': {'name': f'P{i}'}}
+                     for i in range(10)],
+    }
+
+
+def main(count: int) -> None:
+    directory = Path(tempfile.mkdtemp())
+    paths = []
+    for number in range(count):
+        path = directory / f'{number}.json'
+        path.write_text(json.dumps(make_document(number)))
+        paths.append(path)
+    print(f'{count} documents, {os.cpu_count()} CPUs')
+
+    session = Session('http://example.com', schema=SCHEMA)
+    started = time.perf_counter()
+    for path in paths:
+        session.read(path.read_bytes(), path.as_uri())
+    sequential = time.perf_counter() - started
+    print(f'{"read":<16} {sequential:>7.2f}s')
+    session.close()
+
+    processes = 1
+    while processes <= (os.cpu_count() or 1):
+        session = Session('http://example.com', schema=SCHEMA)
+        started = time.perf_counter()
+        session.read_many(paths, processes=processes)
+        elapsed = time.perf_counter() - started
+        print(f'{f"read_many({processes})":<16} {elapsed:>7.2f}s '
+              f'{sequential / elapsed:>5.1f}x')
+        session.close()
+        processes *= 2
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
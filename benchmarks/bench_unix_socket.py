@@ -0,0 +1,105 @@
+"""
+Compare loopback TCP and Unix domain socket transports.
+
+Usage: python benchmarks/bench_unix_socket.py [number-of-requests]
+
+A local aiohttp server stands in for a sidecar API gateway and listens both on
+a loopback TCP port and on a Unix domain socket. The same Session workload is
+run against both with the sync (requests) and async (aiohttp) transports.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from jsonapi_client.session import Session
+
+
+CONCURRENCY = 10
+
+
+def start_server(socket_path: str) -> int:
+    """
+    Start stand-in server in a background thread and return its TCP port.
+    """
+    from aiohttp import web
+
+    async def article(request: 'web.Request') -> 'web.Response':
+        content = {'data': {'type': 'articles', 'id': request.match_info['id'],
+                            'attributes': {'title': 'Benchmark'}}}
+        return web.Response(body=json.dumps(content).encode(),
+                            content_type='application/vnd.api+json')
+
+    started = threading.Event()
+    port = []
+
+    async def serve() -> None:
+        app = web.Application()
+        app.router.add_get('/api/articles/{id}', article)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        tcp_site = web.TCPSite(runner, '127.0.0.1', 0)
+        await tcp_site.start()
+        await web.UnixSite(runner, socket_path).start()
+        port.append(tcp_site._server.sockets[0].getsockname()[1])
+        started.set()
+        await asyncio.Event().wait()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    started.wait()
+    return port[0]
+
+
+def run_sync(server_url: str, count: int, unix_socket: str=None) -> float:
+    s = Session(server_url, unix_socket=unix_socket)
+    s.get('articles', 'warmup')
+    started = time.perf_counter()
+    for i in range(count):
+        s.get('articles', str(i))
+    elapsed = time.perf_counter() - started
+    s.close()
+    return elapsed
+
+
+async def run_async(server_url: str, count: int, unix_socket: str=None) -> float:
+    from jsonapi_client.transport import AiohttpTransport
+
+    s = Session(server_url, enable_async=True,
+                transport=AiohttpTransport(unix_socket=unix_socket))
+    await s.get('articles', 'warmup')
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def get(i: int) -> None:
+        async with semaphore:
+            await s.get('articles', str(i))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[get(i) for i in range(count)])
+    elapsed = time.perf_counter() - started
+    await s.close()
+    return elapsed
+
+
+def main(count: int) -> None:
+    socket_path = os.path.join(tempfile.mkdtemp(), 'gateway.sock')
+    port = start_server(socket_path)
+    tcp_url = f'http://127.0.0.1:{port}/api'
+    unix_url = 'http://gateway/api'
+    print(f'{count} GET requests per run (async runs {CONCURRENCY} concurrently)')
+    print(f'{"transport":<10} {"tcp":>12} {"unix":>12}')
+
+    tcp = run_sync(tcp_url, count)
+    unix = run_sync(unix_url, count, socket_path)
+    print(f'{"requests":<10} {count / tcp:>8.0f}/sec {count / unix:>8.0f}/sec')
+
+    tcp = asyncio.run(run_async(tcp_url, count))
+    unix = asyncio.run(run_async(unix_url, count, socket_path))
+    print(f'{"aiohttp":<10} {count / tcp:>8.0f}/sec {count / unix:>8.0f}/sec')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -26,4 +26,8 @@ setup(
         "jsonschema",
         "aiohttp",
     ],
+    extras_require={
+        "compression": ["brotli", "zstandard"],
+        "json": ["orjson"],
+    },
 )
@@ -0,0 +1,240 @@
+"""
+JSON API Python client
+https://github.com/qvantel/jsonapi-client
+
+(see JSON API specification in http://jsonapi.org/)
+
+Copyright (c) 2017, Qvantel
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of the Qvantel nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL QVANTEL BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from .transport import TransportResponse
+
+logger = logging.getLogger(__name__)
+
+#: Endpoint selection strategies
+LEAST_OUTSTANDING = 'least_outstanding'
+LATENCY = 'latency'
+
+
+class Endpoint:
+    """
+    Base url of one server, with its load and health as seen by the balancer.
+    """
+    def __init__(self, url: str) -> None:
+        self.url = url.rstrip('/')
+        self.outstanding = 0
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.ejections = 0
+
+    def is_ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+    def __repr__(self) -> str:
+        return f'<Endpoint {self.url}>'
+
+
+class EndpointBalancer:
+    """
+    Balances read (GET) requests between several servers that serve the same
+    API, such as read replicas.
+
+    Each request goes to the endpoint with fewest outstanding requests
+    ('least_outstanding'), or with lowest expected latency taking outstanding
+    requests into account ('latency'). An endpoint that fails max_failures
+    times in a row (connection error or 5xx response) is ejected for eject_time
+    seconds. If all endpoints are ejected, the one that was ejected first is
+    used anyway.
+
+    Balancer can be used from several threads and from AsyncIO tasks.
+
+    :param urls: Base urls of the endpoints. Their paths must correspond to
+        Session's server_url, which is replaced by them in request urls.
+    :param strategy: 'least_outstanding' or 'latency'
+    :param max_failures: Consecutive failures after which endpoint is ejected.
+    :param eject_time: Seconds that ejected endpoint is not used.
+    :param decay: Weight of the latest response in the moving latency average.
+    """
+
+    def __init__(self, urls: Iterable[str],
+                 strategy: str=LEAST_OUTSTANDING,
+                 max_failures: int=3,
+                 eject_time: float=30.0,
+                 decay: float=0.3) -> None:
+        if strategy not in (LEAST_OUTSTANDING, LATENCY):
+            raise ValueError(f'Unknown balancing strategy: {strategy}')
+        self.endpoints: List[Endpoint] = [Endpoint(url) for url in urls]
+        if not self.endpoints:
+            raise ValueError('At least one endpoint url is needed')
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.eject_time = eject_time
+        self.decay = decay
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def _score(self, endpoint: Endpoint) -> float:
+        if self.strategy == LATENCY:
+            # Endpoints without measurements are tried first
+            return (endpoint.outstanding + 1) * (endpoint.latency or 0.0)
+        return endpoint.outstanding
+
+    def select(self) -> Endpoint:
+        """
+        Choose endpoint for a new request and count it as outstanding. The
+        request must be finished with release().
+        """
+        now = time.monotonic()
+        with self._lock:
+            count = len(self.endpoints)
+            # Rotate starting point so that ties are spread round-robin
+            ordered = [self.endpoints[(self._next + i) % count] for i in range(count)]
+            self._next = (self._next + 1) % count
+            healthy = [e for e in ordered if not e.is_ejected(now)]
+            if healthy:
+                endpoint = min(healthy, key=self._score)
+            else:
+                endpoint = min(ordered, key=lambda e: e.ejected_until)
+                logger.warning('All endpoints are ejected, using %s', endpoint.url)
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, status: int=None, latency: float=None,
+                cancelled: bool=False) -> None:
+        """
+        Finish request to endpoint. Request failed if status is None (no
+        response) or 5xx, unless it was cancelled.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if cancelled:
+                return
+            if status is None or status >= 500:
+                endpoint.errors += 1
+                endpoint.failures += 1
+                if endpoint.failures >= self.max_failures:
+                    endpoint.failures = 0
+                    endpoint.ejections += 1
+                    endpoint.ejected_until = time.monotonic() + self.eject_time
+                    logger.warning('Ejecting endpoint %s for %.1f s',
+                                   endpoint.url, self.eject_time)
+                return
+            endpoint.failures = 0
+            if latency is not None:
+                endpoint.latency = latency if endpoint.latency is None else (
+                    self.decay * latency + (1 - self.decay) * endpoint.latency)
+
+    def _match(self, url: str, prefix: str) -> Optional[str]:
+        """
+        Return path of url relative to prefix or to one of the endpoints, or
+        None if url does not point to any of them.
+        """
+        for base in (prefix, *(e.url for e in self.endpoints)):
+            if url == base or url.startswith(base + '/') or url.startswith(base + '?'):
+                return url[len(base):]
+        return None
+
+    def canonical_url(self, url: str, prefix: str) -> str:
+        """
+        Return url where endpoint base url is replaced by prefix (Session's
+        server_url), so that documents are cached under one url whichever
+        endpoint served them.
+        """
+        path = self._match(url, prefix)
+        return url if path is None else prefix + path
+
+    def call(self, url: str, prefix: str,
+             send: 'Callable[[str], TransportResponse]') -> 'TransportResponse':
+        """
+        Call send(endpoint_url) with url rebased to a selected endpoint. Urls
+        that do not start with prefix or endpoint url are sent as is.
+        """
+        path = self._match(url, prefix)
+        if path is None:
+            return send(url)
+        endpoint = self.select()
+        started = time.monotonic()
+        status = None
+        try:
+            response = send(endpoint.url + path)
+            status = response.status
+            return response
+        finally:
+            self.release(endpoint, status, time.monotonic() - started)
+
+    async def call_async(self, url: str, prefix: str,
+                         send: 'Callable[[str], Awaitable[TransportResponse]]') \
+            -> 'TransportResponse':
+        """
+        Async version of call.
+        """
+        path = self._match(url, prefix)
+        if path is None:
+            return await send(url)
+        endpoint = self.select()
+        started = time.monotonic()
+        try:
+            response = await send(endpoint.url + path)
+        except asyncio.CancelledError:
+            # For example the slower one of hedged requests
+            self.release(endpoint, cancelled=True)
+            raise
+        except BaseException:
+            self.release(endpoint)
+            raise
+        self.release(endpoint, response.status, time.monotonic() - started)
+        return response
+
+    def stats(self) -> dict:
+        """
+        Return snapshot of endpoint state, by endpoint url.
+
+        Keys:
+         - outstanding: requests in progress
+         - latency: moving average of response time (seconds), or None
+         - requests, errors, ejections: totals
+         - ejected: remaining ejection time (seconds)
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {e.url: {'outstanding': e.outstanding,
+                            'latency': e.latency,
+                            'requests': e.requests,
+                            'errors': e.errors,
+                            'ejections': e.ejections,
+                            'ejected': max(0.0, e.ejected_until - now)}
+                    for e in self.endpoints}
@@ -0,0 +1,96 @@
+"""
+JSON API Python client
+https://github.com/qvantel/jsonapi-client
+
+(see JSON API specification in http://jsonapi.org/)
+
+Copyright (c) 2017, Qvantel
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of the Qvantel nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL QVANTEL BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import os
+from pathlib import Path
+from typing import Union
+
+from .codec import CODECS, JsonCodec, get_codec
+
+#: Source of a document in bulk read: encoded JSON or path of a JSON file
+Source = Union[bytes, str, 'os.PathLike']
+
+
+def load_source(source: Source, codec: JsonCodec) -> dict:
+    """
+    Decode document from encoded JSON (bytes or str) or from a JSON file.
+    """
+    if isinstance(source, os.PathLike):
+        with open(source, 'rb') as f:
+            source = f.read()
+    return codec.loads(source) if source else {}
+
+
+def source_url(source: Source) -> str:
+    """
+    Return default url of a document source: file uri for paths, otherwise
+    empty (like Session.read).
+    """
+    if isinstance(source, os.PathLike):
+        return Path(source).absolute().as_uri()
+    return ''
+
+
+def codec_for_workers(codec: JsonCodec) -> Union[str, JsonCodec]:
+    """
+    Return codec in a form that can be sent to worker processes: name of a
+    built-in codec (their instances hold module references and do not pickle),
+    or the codec instance itself.
+    """
+    return codec.name if CODECS.get(codec.name) is type(codec) else codec
+
+
+def decode_and_validate(source: Source, codec: Union[str, JsonCodec],
+                        schema_data: dict=None) -> dict:
+    """
+    Worker process function of bulk read. Decode document and validate
+    attributes of its resources (data and included) against schema, like
+    ResourceObject construction would. Return decoded document.
+    """
+    import jsonschema
+    from .session import Schema
+    json_data = load_source(source, get_codec(codec))
+    schema = Schema(schema_data)
+    if schema.is_enabled:
+        data = json_data.get('data')
+        resources = data if isinstance(data, list) else [data] if data else []
+        for resource in resources + json_data.get('included', []):
+            if not resource.get('id'):
+                continue
+            try:
+                schema.validate(resource['type'], resource.get('attributes', {}))
+            except jsonschema.ValidationError as exc:
+                # Original refers to validator internals that can not be pickled
+                raise jsonschema.ValidationError(
+                    f'{resource["type"]} {resource["id"]}: {exc.message}',
+                    path=exc.path, schema_path=exc.schema_path) from None
+    return json_data
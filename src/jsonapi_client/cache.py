@@ -0,0 +1,528 @@
+"""
+JSON API Python client
+https://github.com/qvantel/jsonapi-client
+
+(see JSON API specification in http://jsonapi.org/)
+
+Copyright (c) 2017, Qvantel
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of the Qvantel nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL QVANTEL BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import collections
+import logging
+import time
+import weakref
+from typing import (Any, Callable, Dict, Hashable, Iterable, Iterator, List,
+                    MutableMapping, Optional, Set, Union)
+
+logger = logging.getLogger(__name__)
+
+#: Time to live: seconds for all entries, or seconds by resource type
+TTL = Union[float, Dict[str, float]]
+
+
+def approximate_size(value: Any) -> int:
+    """
+    Return rough size in bytes of decoded JSON value (as held in memory).
+    """
+    if isinstance(value, str):
+        return 49 + len(value)
+    if isinstance(value, dict):
+        return 64 + sum(approximate_size(k) + approximate_size(v)
+                        for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(8 + approximate_size(i) for i in value)
+    return 24
+
+
+def url_prefixes(url: str) -> List[str]:
+    """
+    Return prefixes of url (without query) that end at a path segment boundary.
+    For example http://host, http://host/api and http://host/api/articles for
+    http://host/api/articles?page=2.
+    """
+    url = url.partition('?')[0].partition('#')[0].rstrip('/')
+    scheme_end = url.find('://')
+    i = url.find('/', scheme_end + 3 if scheme_end >= 0 else 1)
+    prefixes = []
+    while i >= 0:
+        prefixes.append(url[:i])
+        i = url.find('/', i + 1)
+    prefixes.append(url)
+    return prefixes
+
+
+class _Entry:
+    # In weak mode value may be a weakref.KeyedRef (and weak is True). Size is
+    # set only when sizes are tracked, category when entries are counted and
+    # tags when entries are tagged.
+    __slots__ = ('value', 'weak', 'size', 'expires_at', 'category', 'tags')
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+        self.weak = False
+        self.size = 0
+        self.expires_at: Optional[float] = None
+        self.category: Optional[str] = None
+        self.tags: Iterable[Hashable] = ()
+
+    def get(self) -> Any:
+        return self.value() if self.weak else self.value
+
+
+class CacheCounters:
+    """
+    Statistics of one cache, or of one category (resource type) in it.
+    """
+    __slots__ = ('hits', 'misses', 'fetches', 'evictions', 'collected', 'entries',
+                 'bytes')
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.evictions = 0
+        self.collected = 0
+        self.entries = 0
+        self.bytes = 0
+
+    def reset(self) -> None:
+        """
+        Reset cumulative counters (entries and bytes describe current state).
+        """
+        self.hits = self.misses = self.fetches = self.evictions = self.collected = 0
+
+    def add(self, other: 'CacheCounters') -> None:
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def as_dict(self) -> Dict[str, Union[int, float]]:
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'fetches': self.fetches, 'evictions': self.evictions,
+                'collected': self.collected, 'entries': self.entries,
+                'bytes': self.bytes}
+
+
+class ObjectCache(MutableMapping):
+    """
+    Mapping with least-recently-used eviction, bounded by number of entries
+    and/or approximate size in bytes, and optional time to live.
+
+    Entries for which is_evictable returns False (such as dirty resources) are
+    never evicted, also when they have expired. Evicted entries are passed to
+    on_evict. Entries that are explicitly deleted are not.
+
+    Without limits, TTL and weak mode this behaves like a plain dict (apart
+    from maintaining the index of tags): entries are not sized or categorized.
+
+    In weak mode evictable values are held by weak references, so that entries
+    disappear when values are no longer used elsewhere (they are not passed to
+    on_evict, but to on_collect). Values that are not evictable, the keep_recent
+    most recently used ones and those pinned with pin() are held strongly.
+
+    Entries can be indexed by tags (such as resource type or url prefix), so
+    that keys_tagged() finds them without going through the whole cache. The
+    index is kept up to date as entries are added and removed.
+
+    Statistics are kept by category (such as resource type) of entries: hits
+    and misses of lookup(), fetches reported with record_fetch(), evictions,
+    collected weak entries, and current number and size of entries. Number
+    and size of entries are counted from the start if stats is True,
+    otherwise the first call of stats() counts the current entries.
+
+    :param max_entries: Maximum number of entries.
+    :param max_bytes: Maximum total size of entries, as returned by sizeof.
+    :param ttl: Function returning time to live (seconds, or None for no
+        expiry) for a new entry, given key and value.
+    :param sizeof: Function returning approximate size of a value in bytes.
+    :param is_evictable: Function returning False for values that must stay.
+    :param on_evict: Called with key and value of each evicted entry.
+    :param category: Function returning category of an entry, given its key.
+    :param weak: Hold evictable values by weak references.
+    :param keep_recent: Weak mode only. Number of most recently used values
+        that are held strongly nevertheless.
+    :param on_collect: Weak mode only. Called with key of each entry whose value
+        has been garbage collected.
+    :param tags: Function returning tags of an entry, given key and value.
+    :param stats: Count number and size of entries from the start.
+    """
+
+    def __init__(self, max_entries: int=None,
+                 max_bytes: int=None,
+                 ttl: Callable[[Hashable, Any], Optional[float]]=None,
+                 sizeof: Callable[[Any], int]=None,
+                 is_evictable: Callable[[Any], bool]=None,
+                 on_evict: Callable[[Hashable, Any], None]=None,
+                 category: Callable[[Hashable], str]=None,
+                 weak: bool=False,
+                 keep_recent: int=0,
+                 on_collect: Callable[[Hashable], None]=None,
+                 tags: Callable[[Hashable, Any], Iterable[Hashable]]=None,
+                 stats: bool=False) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # Least recently used order is kept only when it is needed for eviction
+        self._lru = max_entries is not None or max_bytes is not None
+        self._ttl = ttl
+        self._sizeof = sizeof
+        self._track_sizes = sizeof is not None and (max_bytes is not None or stats)
+        self._is_evictable = is_evictable
+        self._on_evict = on_evict
+        self._category = category or (lambda key: '')
+        # Without limits, TTL, weak mode and entry counts, values are stored
+        # in _data as such (plain mode) instead of in _Entry objects
+        self._plain = not (self._lru or ttl or weak or stats)
+        self._data: 'Dict[Hashable, Union[_Entry, Any]]' = \
+            {} if self._plain else collections.OrderedDict()
+        self._counters: Dict[str, CacheCounters] = collections.defaultdict(CacheCounters)
+        self._count_entries = False
+        self.size = 0
+        self.evictions = 0
+        self.weak = weak
+        self.keep_recent = keep_recent
+        self._on_collect = on_collect
+        self._tags = tags
+        # Keys of entries by tag
+        self._index: Dict[Hashable, Set[Hashable]] = {}
+        # Strong references to most recently used values (weak mode)
+        self._recent: 'collections.OrderedDict[Hashable, Any]' = collections.OrderedDict()
+        # References of collected values. Weakref callbacks only append here, as
+        # they may run at any point (in garbage collection), and the entries
+        # are removed later by _remove_collected.
+        self._collected: 'List[weakref.KeyedRef]' = []
+        if stats:
+            self._count_current_entries()
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return entry.expires_at is not None and entry.expires_at <= now
+
+    def _evictable(self, value: Any) -> bool:
+        # value is None when its weak reference is dead
+        return self._is_evictable is None or value is None or self._is_evictable(value)
+
+    def _use_entries(self) -> None:
+        if self._plain:
+            self._plain = False
+            data = self._data
+            self._data = collections.OrderedDict()
+            for key, value in data.items():
+                entry = self._data[key] = _Entry(value)
+                if self._tags is not None:
+                    entry.tags = self._tags(key, value)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        if self._plain:
+            return self._data[key]
+        if self._collected:
+            self._remove_collected()
+        entry = self._data[key]
+        if entry.weak:
+            value = entry.value()
+            if value is None:
+                self._remove_collected_entry(key, entry)
+                raise KeyError(key)
+        else:
+            value = entry.value
+        if (entry.expires_at is not None and self._expired(entry, time.monotonic())
+                and self._evictable(value)):
+            self.evict(key)
+            raise KeyError(key)
+        if self._lru:
+            self._data.move_to_end(key)
+        if self.keep_recent:
+            self._keep(key, value)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if self._plain:
+            if self._tags is not None:
+                # Tags of a replaced value are computed again to unindex it
+                old = self._data.get(key)
+                if old is not None:
+                    self._unindex(key, self._tags(key, old))
+                self._index_keys(key, self._tags(key, value))
+            self._data[key] = value
+            return
+        if self._collected:
+            self._remove_collected()
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._removed(key, old)
+        entry = _Entry(value)
+        if self._ttl is not None:
+            ttl = self._ttl(key, value)
+            if ttl is not None:
+                entry.expires_at = time.monotonic() + ttl
+        if self._track_sizes:
+            entry.size = self._sizeof(value)
+            self.size += entry.size
+        if self._count_entries:
+            self._count_entry(key, entry)
+        if self._tags is not None:
+            entry.tags = self._tags(key, value)
+            self._index_keys(key, entry.tags)
+        if self.weak and self._evictable(value):
+            self._make_weak(key, entry)
+            if self.keep_recent:
+                self._keep(key, value)
+        self._data[key] = entry
+        if self._lru:
+            self._evict_over_limits(key)
+
+    def _count_entry(self, key: Hashable, entry: _Entry) -> None:
+        entry.category = self._category(key)
+        counters = self._counters[entry.category]
+        counters.entries += 1
+        counters.bytes += entry.size
+
+    def _index_keys(self, key: Hashable, tags: Iterable[Hashable]) -> None:
+        for tag in tags:
+            keys = self._index.get(tag)
+            if keys is None:
+                self._index[tag] = {key}
+            else:
+                keys.add(key)
+
+    def _unindex(self, key: Hashable, tags: Iterable[Hashable]) -> None:
+        for tag in tags:
+            keys = self._index[tag]
+            keys.discard(key)
+            if not keys:
+                del self._index[tag]
+
+    def _removed(self, key: Hashable, entry: _Entry) -> None:
+        self._unindex(key, entry.tags)
+        self.size -= entry.size
+        if self._count_entries:
+            counters = self._counters[entry.category]
+            counters.entries -= 1
+            counters.bytes -= entry.size
+
+    def __delitem__(self, key: Hashable) -> None:
+        if self._plain:
+            value = self._data.pop(key)
+            if self._tags is not None:
+                self._unindex(key, self._tags(key, value))
+            return
+        self._removed(key, self._data.pop(key))
+        self._recent.pop(key, None)
+
+    def _make_weak(self, key: Hashable, entry: _Entry) -> None:
+        entry.value = weakref.KeyedRef(entry.value, self._collected.append, key)
+        entry.weak = True
+
+    def _keep(self, key: Hashable, value: Any) -> None:
+        self._recent[key] = value
+        self._recent.move_to_end(key)
+        if len(self._recent) > self.keep_recent:
+            self._recent.popitem(last=False)
+
+    def _remove_collected(self) -> None:
+        while self._collected:
+            ref = self._collected.pop()
+            entry = self._data.get(ref.key)
+            # Entry may have been replaced after its value was collected
+            if entry is not None and entry.value is ref:
+                self._remove_collected_entry(ref.key, entry)
+
+    def _remove_collected_entry(self, key: Hashable, entry: _Entry) -> None:
+        del self._data[key]
+        self._removed(key, entry)
+        self._counters[self._category(key)].collected += 1
+        if self._on_collect is not None:
+            self._on_collect(key)
+
+    def pin(self, key: Hashable, value: Any) -> None:
+        """
+        Weak mode: hold value of entry strongly, if value is still cached.
+        """
+        entry = None if self._plain else self._data.get(key)
+        if entry is not None and entry.weak and entry.value() is value:
+            entry.value = value
+            entry.weak = False
+
+    def unpin(self, key: Hashable, value: Any) -> None:
+        """
+        Weak mode: hold value of entry weakly again, if value is evictable.
+        """
+        entry = self._data.get(key)
+        if (self.weak and entry is not None and not entry.weak
+                and entry.value is value and self._evictable(value)):
+            self._make_weak(key, entry)
+
+    def __contains__(self, key: Hashable) -> bool:
+        if self._plain:
+            return key in self._data
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[Hashable]:
+        if self._collected:
+            self._remove_collected()
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        if self._collected:
+            self._remove_collected()
+        return len(self._data)
+
+    def values(self) -> List[Any]:
+        return [value for key, value in self.items()]
+
+    def items(self) -> List[tuple]:
+        if self._plain:
+            return list(self._data.items())
+        if self._collected:
+            self._remove_collected()
+        items = [(key, entry.get()) for key, entry in self._data.items()]
+        if self.weak:
+            return [(key, value) for key, value in items if value is not None]
+        return items
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._index.clear()
+        self._recent.clear()
+        self._collected.clear()
+        self.size = 0
+        for counters in self._counters.values():
+            counters.entries = counters.bytes = 0
+
+    def evict(self, key: Hashable) -> None:
+        """
+        Remove entry and pass it to on_evict.
+        """
+        if self._plain:
+            value = self._data.pop(key)
+            if self._tags is not None:
+                self._unindex(key, self._tags(key, value))
+            self.evictions += 1
+            self._counters[self._category(key)].evictions += 1
+            if self._on_evict is not None:
+                self._on_evict(key, value)
+            return
+        entry = self._data.pop(key)
+        self._removed(key, entry)
+        self._recent.pop(key, None)
+        self.evictions += 1
+        self._counters[self._category(key)].evictions += 1
+        value = entry.get()
+        if self._on_evict is not None and value is not None:
+            self._on_evict(key, value)
+
+    def keys_tagged(self, tag: Hashable) -> List[Hashable]:
+        """
+        Return keys of entries that have given tag.
+        """
+        if self._collected:
+            self._remove_collected()
+        return list(self._index.get(tag, ()))
+
+    def lookup(self, key: Hashable) -> Any:
+        """
+        Return value (or None if not found) and count it as hit or miss.
+        """
+        value = self.get(key)
+        counters = self._counters[self._category(key)]
+        if value is None:
+            counters.misses += 1
+        else:
+            counters.hits += 1
+        return value
+
+    def record_fetch(self, key: Hashable) -> None:
+        """
+        Count a fetch of entry from its source.
+        """
+        self._counters[self._category(key)].fetches += 1
+
+    def _count_current_entries(self) -> None:
+        self._use_entries()
+        if self._collected:
+            self._remove_collected()
+        self._count_entries = True
+        size_entries = self._sizeof is not None and not self._track_sizes
+        self._track_sizes = self._sizeof is not None
+        for key, entry in self._data.items():
+            if size_entries:
+                value = entry.get()
+                entry.size = 0 if value is None else self._sizeof(value)
+                self.size += entry.size
+            self._count_entry(key, entry)
+
+    def stats(self, reset: bool=False) -> dict:
+        """
+        Return snapshot of statistics: totals, and 'by_type' for each category.
+        See CacheCounters.as_dict for the keys.
+
+        :param reset: Reset hits, misses, fetches and evictions after snapshot.
+        """
+        if not self._count_entries:
+            self._count_current_entries()
+        total = CacheCounters()
+        by_type = {}
+        for category, counters in sorted(self._counters.items()):
+            total.add(counters)
+            by_type[category] = counters.as_dict()
+            if reset:
+                counters.reset()
+        return {**total.as_dict(), 'by_type': by_type}
+
+    def _over_limits(self) -> bool:
+        return ((self.max_entries is not None and len(self._data) > self.max_entries)
+                or (self.max_bytes is not None and self.size > self.max_bytes))
+
+    def _evict_over_limits(self, new_key: Hashable) -> None:
+        # Entries that can not be evicted (and the one just added) are moved to
+        # the end, so that each of them is looked at only once.
+        checked = 0
+        while self._over_limits() and checked < len(self._data):
+            key, entry = next(iter(self._data.items()))
+            if key != new_key and self._evictable(entry.get()):
+                self.evict(key)
+            else:
+                self._data.move_to_end(key)
+                checked += 1
+        if self._over_limits():
+            logger.warning('Cache is over its limits, but remaining %d entries can '
+                           'not be evicted', len(self._data))
+
+    def purge_expired(self) -> int:
+        """
+        Evict all expired entries. Return number of entries evicted.
+        """
+        if self._plain:
+            return 0
+        now = time.monotonic()
+        expired = [key for key, entry in self._data.items()
+                   if self._expired(entry, now) and self._evictable(entry.get())]
+        for key in expired:
+            self.evict(key)
+        return len(expired)
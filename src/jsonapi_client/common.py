@@ -32,7 +32,7 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import asyncio
 import logging
-from typing import Union, TYPE_CHECKING, NamedTuple
+from typing import Optional, Union, TYPE_CHECKING, NamedTuple
 
 if TYPE_CHECKING:
     from .session import Session
@@ -45,6 +45,7 @@ class HttpStatus:
     CREATED_201 = 201
     ACCEPTED_202 = 202
     NO_CONTENT_204 = 204
+    NOT_MODIFIED_304 = 304
     FORBIDDEN_403 = 403
     NOT_FOUND_404 = 404
     CONFLICT_409 = 409
@@ -54,6 +55,7 @@ class HttpStatus:
 
 
 class HttpMethod:
+    GET = 'get'
     POST = 'post'
     PATCH = 'patch'
     DELETE = 'delete'
@@ -68,8 +70,13 @@ class AbstractJsonObject:
     """
     Base for all JSON API specific objects
     """
+    # Objects stored in session cache record session's generation.
+    # Session.invalidate() increments it, which makes them invalid without
+    # visiting them. Objects outside the cache are not affected.
+    _generation: Optional[int] = None
+
     def __init__(self, session: 'Session', data: Union[dict, list]) -> None:
-        self._invalid = False
+        self._invalidated = False
         self._session = session
         self._handle_data(data)
 
@@ -93,8 +100,13 @@ class AbstractJsonObject:
     def url(self) -> str:
         raise NotImplementedError
 
+    @property
+    def _invalid(self) -> bool:
+        return self._invalidated or (self._generation is not None
+                                     and self._generation != self._session._generation)
+
     def mark_invalid(self):
-        self._invalid = True
+        self._invalidated = True
 
 
 def error_from_response(response_content):
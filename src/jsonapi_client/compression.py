@@ -0,0 +1,230 @@
+"""
+JSON API Python client
+https://github.com/qvantel/jsonapi-client
+
+(see JSON API specification in http://jsonapi.org/)
+
+Copyright (c) 2017, Qvantel
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of the Qvantel nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL QVANTEL BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import logging
+import zlib
+from typing import Iterable, List
+
+logger = logging.getLogger(__name__)
+
+GZIP = 'gzip'
+DEFLATE = 'deflate'
+BROTLI = 'br'
+ZSTD = 'zstd'
+
+
+def _import_brotli():
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        try:
+            import brotli
+        except ImportError:
+            return None
+    return brotli
+
+
+def _import_zstd():
+    """
+    Return (module, is_zstandard). Standard library compression.zstd (and its
+    backport) are preferred over zstandard package.
+    """
+    try:
+        from compression import zstd
+        return zstd, False
+    except ImportError:
+        pass
+    try:
+        from backports import zstd
+        return zstd, False
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard, True
+    except ImportError:
+        return None, False
+
+
+def available_encodings() -> List[str]:
+    """
+    Content codings that can be compressed and decompressed with installed
+    libraries. Brotli requires brotli (or brotlicffi) and Zstandard requires
+    zstandard (or Python 3.14) to be installed.
+    """
+    encodings = [GZIP, DEFLATE]
+    if _import_brotli():
+        encodings.append(BROTLI)
+    if _import_zstd()[0]:
+        encodings.append(ZSTD)
+    return encodings
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress data with given content coding.
+    """
+    if encoding == GZIP:
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush()
+    elif encoding == DEFLATE:
+        return zlib.compress(data)
+    elif encoding == BROTLI and _import_brotli():
+        return _import_brotli().compress(data)
+    elif encoding == ZSTD and _import_zstd()[0]:
+        zstd, is_zstandard = _import_zstd()
+        if is_zstandard:
+            return zstd.ZstdCompressor().compress(data)
+        return zstd.compress(data)
+    raise ValueError(f'Unsupported content coding: {encoding}')
+
+
+class _DeflateDecoder:
+    """
+    Decoder for 'deflate' coding. Some servers send raw deflate stream instead
+    of zlib stream, so that is supported as well.
+    """
+    def __init__(self) -> None:
+        self._first_try = True
+        self._data = b''
+        self._obj = zlib.decompressobj()
+
+    def decompress(self, data: bytes) -> bytes:
+        if not self._first_try:
+            return self._obj.decompress(data)
+        self._data += data
+        try:
+            decompressed = self._obj.decompress(data)
+            if decompressed:
+                self._first_try = False
+                self._data = b''
+            return decompressed
+        except zlib.error:
+            self._first_try = False
+            self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+            try:
+                return self.decompress(self._data)
+            finally:
+                self._data = b''
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliDecoder:
+    def __init__(self) -> None:
+        brotli = _import_brotli()
+        self._obj = brotli.Decompressor()
+        self._decompress = getattr(self._obj, 'process', None) or self._obj.decompress
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompress(data)
+
+    def flush(self) -> bytes:
+        return b''
+
+
+class _ZstdDecoder:
+    def __init__(self) -> None:
+        zstd, is_zstandard = _import_zstd()
+        if is_zstandard:
+            self._obj = zstd.ZstdDecompressor().decompressobj()
+        else:
+            self._obj = zstd.ZstdDecompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        if not data:
+            return b''
+        return self._obj.decompress(data)
+
+    def flush(self) -> bytes:
+        return b''
+
+
+class _ZlibDecoder:
+    def __init__(self, wbits: int) -> None:
+        self._obj = zlib.decompressobj(wbits)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._obj.decompress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class Decompressor:
+    """
+    Streaming decompressor for value of Content-Encoding header. Data can be
+    fed in chunks, as it is received.
+
+    :param content_encoding: Content-Encoding header value, such as 'gzip' or
+        'gzip, br' (codings applied in that order).
+    """
+    def __init__(self, content_encoding: str) -> None:
+        self._decoders = []
+        for encoding in reversed(content_encoding.split(',')):
+            encoding = encoding.strip().lower()
+            if encoding in ('', 'identity'):
+                continue
+            self._decoders.append(self._decoder_for(encoding))
+
+    @staticmethod
+    def _decoder_for(encoding: str):
+        if encoding in (GZIP, 'x-gzip'):
+            return _ZlibDecoder(16 + zlib.MAX_WBITS)
+        elif encoding == DEFLATE:
+            return _DeflateDecoder()
+        elif encoding == BROTLI and _import_brotli():
+            return _BrotliDecoder()
+        elif encoding == ZSTD and _import_zstd()[0]:
+            return _ZstdDecoder()
+        raise ValueError(f'Unsupported content coding: {encoding}')
+
+    def decompress(self, data: bytes) -> bytes:
+        for decoder in self._decoders:
+            data = decoder.decompress(data)
+        return data
+
+    def flush(self) -> bytes:
+        data = b''
+        for decoder in self._decoders:
+            data = decoder.decompress(data) + decoder.flush()
+        return data
+
+
+def decompress_chunks(chunks: Iterable[bytes], content_encoding: str) -> bytes:
+    """
+    Decompress response body that is received in chunks.
+    """
+    decompressor = Decompressor(content_encoding)
+    return b''.join([decompressor.decompress(chunk) for chunk in chunks]
+                    + [decompressor.flush()])
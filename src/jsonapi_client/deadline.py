@@ -0,0 +1,115 @@
+"""
+JSON API Python client
+https://github.com/qvantel/jsonapi-client
+
+(see JSON API specification in http://jsonapi.org/)
+
+Copyright (c) 2017, Qvantel
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of the Qvantel nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL QVANTEL BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from .exceptions import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+#: Absolute deadline (time.monotonic()) of the current operation, if any
+_deadline: 'ContextVar[Optional[float]]' = ContextVar('jsonapi_client_deadline',
+                                                      default=None)
+
+
+def current_deadline() -> Optional[float]:
+    """
+    Return absolute deadline (in time.monotonic() time) of the current
+    operation, or None if there is no deadline.
+    """
+    return _deadline.get()
+
+
+def remaining(deadline: Optional[float]) -> Optional[float]:
+    """
+    Return seconds left until deadline (None if deadline is None). Raise
+    DeadlineExceeded if deadline has passed.
+    """
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded('Deadline exceeded')
+    return left
+
+
+def expired(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+class Deadline:
+    """
+    Time budget that spans all requests made within the context (also in
+    AsyncIO tasks started within it). Each request gets the remaining budget as
+    its timeout, and DeadlineExceeded is raised when the budget has been spent.
+    Nested deadlines can only shorten the outer one.
+
+    Usage::
+
+        with session.deadline(2.5):
+            for resource in session.iterate('articles'):
+                ...
+
+    :param timeout: Budget in seconds.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self.expires_at: float = None
+        self._token = None
+
+    def __enter__(self) -> 'Deadline':
+        expires_at = time.monotonic() + self.timeout
+        outer = _deadline.get()
+        if outer is not None:
+            expires_at = min(outer, expires_at)
+        self.expires_at = expires_at
+        self._token = _deadline.set(expires_at)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        _deadline.reset(self._token)
+
+    async def __aenter__(self) -> 'Deadline':
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.__exit__(exc_type, exc_val, exc_tb)
+
+    def remaining(self) -> float:
+        """
+        Seconds left in the budget (0 if spent).
+        """
+        return max(0.0, self.expires_at - time.monotonic())
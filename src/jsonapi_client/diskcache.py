@@ -0,0 +1,265 @@
+"""
+JSON API Python client
+https://github.com/qvantel/jsonapi-client
+
+(see JSON API specification in http://jsonapi.org/)
+
+Copyright (c) 2017, Qvantel
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of the Qvantel nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL QVANTEL BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Mapping, NamedTuple, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    content BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize url so that equivalent urls map to the same cache entry: scheme
+    and host are lowercased, default port and fragment are dropped and query
+    parameters are sorted.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{parts.port}'
+    if parts.username:
+        netloc = f'{parts.username}@{netloc}'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+def _cache_control(headers: Mapping[str, str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for directive in (headers.get('Cache-Control') or '').split(','):
+        name, _, value = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+class CachedResponse(NamedTuple):
+    """
+    Response body stored in DiskCache with its freshness metadata.
+    """
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    expires_at: float
+
+    def is_fresh(self, now: float=None) -> bool:
+        return (time.time() if now is None else now) < self.expires_at
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """
+        Conditional request headers to revalidate this response.
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class DiskCache:
+    """
+    Persistent HTTP response cache in a SQLite database, keyed by canonical url.
+    Cache can be shared by several processes on the same host (SQLite locking,
+    WAL journal) and threads (connection is guarded by a lock).
+
+    Bodies are stored zlib compressed. Freshness lifetime is taken from
+    Cache-Control max-age of the response (default_ttl if not given). Stale
+    entries are kept so that they can be revalidated with a conditional GET.
+    Least recently used entries are evicted when the total size of stored
+    bodies exceeds max_size.
+
+    :param path: Path of the database file. Created if it does not exist.
+    :param max_size: Maximum total size of stored (compressed) bodies in bytes.
+    :param default_ttl: Freshness lifetime in seconds for responses that don't
+        have Cache-Control max-age.
+    :param timeout: Seconds to wait for a lock held by another process.
+    """
+
+    def __init__(self, path: str, max_size: int=100 * 1024 * 1024,
+                 default_ttl: float=60, timeout: float=30) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                           check_same_thread=False)
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(_SCHEMA)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self.path}>'
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """
+        Return cached response for url (fresh or stale), or None.
+        """
+        key = canonical_url(url)
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT content, etag, last_modified, stored_at, expires_at '
+                'FROM responses WHERE url = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._connection.execute('UPDATE responses SET accessed_at = ? WHERE url = ?',
+                                     (time.time(), key))
+        content, *metadata = row
+        return CachedResponse(zlib.decompress(content), *metadata)
+
+    def _expires_at(self, headers: Mapping[str, str], now: float) -> Optional[float]:
+        """
+        Return expiration time of response, or None if it must not be stored.
+        """
+        directives = _cache_control(headers)
+        if 'no-store' in directives:
+            return None
+        if 'no-cache' in directives:
+            return now
+        try:
+            return now + int(directives['max-age'])
+        except (KeyError, TypeError, ValueError):
+            return now + self.default_ttl
+
+    def set(self, url: str, content: bytes, headers: Mapping[str, str]) -> None:
+        """
+        Store response body with freshness metadata from response headers.
+        """
+        key = canonical_url(url)
+        now = time.time()
+        expires_at = self._expires_at(headers, now)
+        if expires_at is None:
+            self.delete(url)
+            return
+        compressed = zlib.compress(content)
+        if len(compressed) > self.max_size:
+            logger.debug('Response of %s is too large to be cached', url)
+            self.delete(url)
+            return
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, compressed, len(compressed), headers.get('ETag'),
+                     headers.get('Last-Modified'), now, expires_at, now))
+                self._evict()
+                self._connection.execute('COMMIT')
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+
+    def refresh(self, url: str, headers: Mapping[str, str]) -> None:
+        """
+        Update freshness of an entry that was revalidated (304 Not Modified).
+        """
+        now = time.time()
+        expires_at = self._expires_at(headers, now)
+        if expires_at is None:
+            self.delete(url)
+            return
+        with self._lock:
+            self._connection.execute(
+                'UPDATE responses SET expires_at = ?, accessed_at = ?, '
+                'etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) '
+                'WHERE url = ?',
+                (expires_at, now, headers.get('ETag'), headers.get('Last-Modified'),
+                 canonical_url(url)))
+
+    def _evict(self) -> None:
+        total, = self._connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()
+        if total <= self.max_size:
+            return
+        freed = 0
+        evicted = []
+        for url, size in self._connection.execute(
+                'SELECT url, size FROM responses ORDER BY accessed_at'):
+            evicted.append((url,))
+            freed += size
+            if total - freed <= self.max_size:
+                break
+        logger.debug('Evicting %d responses from disk cache', len(evicted))
+        self._connection.executemany('DELETE FROM responses WHERE url = ?', evicted)
+
+    def delete(self, url: str) -> None:
+        with self._lock:
+            self._connection.execute('DELETE FROM responses WHERE url = ?',
+                                     (canonical_url(url),))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute('DELETE FROM responses')
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of stored (compressed) bodies in bytes.
+        """
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
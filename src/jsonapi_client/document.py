@@ -59,9 +59,18 @@ class Document(AbstractJsonObject):
     def __init__(self, session: 'Session',
                  json_data: dict,
                  url: str,
-                 no_cache: bool=False) -> None:
+                 no_cache: bool=False,
+                 resources: 'List[ResourceObject]'=None,
+                 included: 'List[ResourceObject]'=None) -> None:
+        """
+        :param resources: Already constructed ResourceObjects of 'data' (used when
+            document is read from a stream). If given, 'data' of json_data is ignored.
+        :param included: Already constructed ResourceObjects of 'included'.
+        """
         self._no_cache = no_cache  # if true, do not store resources to session cache
         self._url = url
+        self._prebuilt_resources = resources
+        self._prebuilt_included = included
         super().__init__(session, json_data)
 
     @property
@@ -83,7 +92,10 @@ class Document(AbstractJsonObject):
 
         self.resources = []
 
-        if data:
+        if self._prebuilt_resources is not None:
+            data = self._prebuilt_resources
+            self.resources.extend(data)
+        elif data:
             if isinstance(data, list):
                 self.resources.extend([ResourceObject(self.session, i) for i in data])
             elif isinstance(data, dict):
@@ -102,8 +114,11 @@ class Document(AbstractJsonObject):
         if self.errors:
             raise DocumentError(f'Error document was fetched. Details: {self.errors}',
                                 errors=self.errors)
-        self.included = [ResourceObject(self.session, i)
-                         for i in json_data.get('included', [])]
+        if self._prebuilt_included is not None:
+            self.included = self._prebuilt_included
+        else:
+            self.included = [ResourceObject(self.session, i)
+                             for i in json_data.get('included', [])]
         if not self._no_cache:
             self.session.add_resources(*self.resources, *self.included)
 
@@ -117,11 +132,16 @@ class Document(AbstractJsonObject):
         # there are no items on the page
         if len(self.resources) == 0:
             return
-        
+
+        next_page = None
+        if self.links.next and self.session._fan_out:
+            # Fetch next page while resources of this one are being consumed
+            next_page = self.session._prefetch_document(self.links.next.url)
+
         yield from self.resources
 
         if self.links.next:
-            next_doc = self.links.next.fetch()
+            next_doc = next_page() if next_page else self.links.next.fetch()
             yield from next_doc.iterator()
 
     async def _iterator_async(self) -> 'AsyncIterator[ResourceObject]':
@@ -152,10 +172,14 @@ class Document(AbstractJsonObject):
         else:
             return self._iterator_sync()
 
-    def mark_invalid(self):
+    def mark_invalid(self, resources: bool=True):
         """
         Mark this Document and it's resources invalid.
+
+        :param resources: If False, only the Document itself is marked invalid
+            (when it is evicted from Session's cache but its resources are not).
         """
         super().mark_invalid()
-        for r in self.resources:
-            r.mark_invalid()
\ No newline at end of file
+        if resources:
+            for r in self.resources:
+                r.mark_invalid()
\ No newline at end of file
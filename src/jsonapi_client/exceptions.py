@@ -60,3 +60,10 @@ class DocumentInvalid(JsonApiClientError):
 
 class AsyncError(JsonApiClientError):
     pass
+
+
+class DeadlineExceeded(JsonApiClientError):
+    """
+    Raised when time budget of an operation (see Session.deadline) has been spent.
+    """
+    pass
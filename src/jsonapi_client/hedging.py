@@ -0,0 +1,227 @@
+"""
+JSON API Python client
+https://github.com/qvantel/jsonapi-client
+
+(see JSON API specification in http://jsonapi.org/)
+
+Copyright (c) 2017, Qvantel
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of the Qvantel nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL QVANTEL BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import asyncio
+import collections
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+
+if TYPE_CHECKING:
+    from .transport import TransportResponse
+
+logger = logging.getLogger(__name__)
+
+
+class HedgingPolicy:
+    """
+    Hedging for idempotent (GET) requests: if response has not arrived within
+    the given percentile of observed latencies, a duplicate request is sent and
+    whichever response arrives first is used.
+
+    In sync mode the original request is sent from the calling thread, and the
+    hedge from a background thread. The caller gets the response of the hedge
+    if it arrived first or if the original request failed, and the hedge is
+    left to complete in the background if the original one succeeded first.
+    In AsyncIO mode the slower request is cancelled.
+
+    :param percentile: Latency percentile (0-100) after which a hedge is sent.
+    :param budget: Maximum fraction of requests that may be hedged.
+    :param min_samples: Number of latency samples needed before hedging starts.
+    :param window: Number of most recent latency samples that are kept.
+    :param min_delay: Lower bound for hedge delay in seconds.
+    :param max_workers: Sync mode only. Size of the background thread pool
+        that waits for the hedge delay and sends hedges.
+    """
+
+    def __init__(self, percentile: float=95,
+                 budget: float=0.05,
+                 min_samples: int=20,
+                 window: int=1000,
+                 min_delay: float=0.0,
+                 max_workers: int=8) -> None:
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_workers = max_workers
+        self._samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = None
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+
+    def delay(self) -> Optional[float]:
+        """
+        Return current hedge delay, or None if there are not enough samples yet.
+        """
+        with self._lock:
+            if not self._samples or len(self._samples) < self.min_samples:
+                return None
+            samples = sorted(self._samples)
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return max(self.min_delay, samples[index])
+
+    def _start(self) -> Optional[float]:
+        with self._lock:
+            self.requests += 1
+        return self.delay()
+
+    def _try_hedge(self) -> bool:
+        with self._lock:
+            if self.hedges + 1 > self.budget * self.requests:
+                self.budget_exhausted += 1
+                return False
+            self.hedges += 1
+            return True
+
+    def _won(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+
+    def call(self, send: 'Callable[[], TransportResponse]') -> 'TransportResponse':
+        """
+        Call send(), and call it again in another thread if it takes too long.
+        """
+        delay = self._start()
+
+        def timed_send():
+            started = time.monotonic()
+            result = send()
+            self.record(time.monotonic() - started)
+            return result
+
+        if delay is None:
+            return timed_send()
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.max_workers, thread_name_prefix='jsonapi-hedge')
+        original_done = threading.Event()
+
+        def hedge():
+            if original_done.wait(delay) or not self._try_hedge():
+                return None
+            logger.debug('Sending hedged request after %.3f s', delay)
+            return timed_send()
+
+        # Only the wait and the hedge use the pool, so that concurrent callers
+        # are not limited by its size
+        hedge_future = self._executor.submit(hedge)
+        try:
+            result = timed_send()
+        except Exception:
+            original_done.set()
+            # Failed request is ignored if the hedge succeeds
+            try:
+                hedged = hedge_future.result()
+            except Exception:
+                hedged = None
+            if hedged is None:
+                raise
+            self._won()
+            return hedged
+        original_done.set()
+        if (hedge_future.done() and not hedge_future.cancelled()
+                and hedge_future.exception() is None and hedge_future.result() is not None):
+            self._won()
+            return hedge_future.result()
+        return result
+
+    async def call_async(self, send: 'Callable[[], Awaitable[TransportResponse]]') \
+            -> 'TransportResponse':
+        """
+        Await send(), and send it again if it takes too long. The slower one is
+        cancelled.
+        """
+        delay = self._start()
+
+        async def timed_send():
+            started = time.monotonic()
+            result = await send()
+            self.record(time.monotonic() - started)
+            return result
+
+        if delay is None:
+            return await timed_send()
+        tasks = [asyncio.ensure_future(timed_send())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._try_hedge():
+                logger.debug('Sending hedged request after %.3f s', delay)
+                tasks.append(asyncio.ensure_future(timed_send()))
+            pending = tasks
+            while True:
+                done, pending = await asyncio.wait(pending,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                successful = [i for i in done if i.exception() is None]
+                if successful or not pending:
+                    task = successful[0] if successful else done.pop()
+                    break
+        finally:
+            for other in tasks:
+                other.cancel()
+        if len(tasks) > 1 and task is tasks[1]:
+            self._won()
+        return task.result()
+
+    def stats(self) -> dict:
+        """
+        Return snapshot of hedging metrics.
+
+        Keys:
+         - requests: requests sent through the policy
+         - hedges: duplicate requests sent
+         - hedge_wins: hedges that answered before the original request
+         - budget_exhausted: hedges that were not sent because of the budget
+         - delay: current hedge delay in seconds (None until enough samples)
+        """
+        with self._lock:
+            stats = {'requests': self.requests, 'hedges': self.hedges,
+                     'hedge_wins': self.hedge_wins,
+                     'budget_exhausted': self.budget_exhausted}
+        stats['delay'] = self.delay()
+        return stats
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,344 @@
+"""
+JSON API Python client
+https://github.com/qvantel/jsonapi-client
+
+(see JSON API specification in http://jsonapi.org/)
+
+Copyright (c) 2017, Qvantel
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of the Qvantel nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL QVANTEL BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import (TYPE_CHECKING, Awaitable, Callable, Dict, List, Mapping, Optional,
+                    Tuple)
+from urllib.parse import urlsplit
+
+from .deadline import remaining
+
+if TYPE_CHECKING:
+    from .transport import TransportResponse
+
+logger = logging.getLogger(__name__)
+
+#: Statuses that signal the server is overloaded or enforcing a quota
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str], now: float=None) -> Optional[float]:
+    """
+    Return delay in seconds from Retry-After header value (delay-seconds or
+    HTTP-date), or None if value is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0.0, date.timestamp() - (time.time() if now is None else now))
+
+
+class _Window:
+    """
+    AIMD concurrency window: limit grows additively on success (by `increase`
+    per window of completed requests) and shrinks multiplicatively on congestion.
+    """
+    def __init__(self, limit: float, min_limit: int, max_limit: int) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max(min_limit, min(limit, max_limit)))
+        self.in_flight = 0
+        self._decreased_at = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def on_success(self, increase: float) -> None:
+        self.limit = min(self.max_limit, self.limit + increase / self.limit)
+
+    def on_congestion(self, started_at: float, now: float, decrease: float) -> None:
+        # React once per congestion event: requests that were already in flight
+        # when the limit was decreased do not decrease it again.
+        if started_at < self._decreased_at:
+            return
+        self.limit = max(self.min_limit, self.limit * decrease)
+        self._decreased_at = now
+
+
+class Permit:
+    """
+    Permission to send one request, returned by AdaptiveLimiter.acquire.
+    Must be released with the response status (or None if request failed).
+    """
+    def __init__(self, limiter: 'AdaptiveLimiter', host: str) -> None:
+        self._limiter = limiter
+        self.host = host
+        self.started_at = time.monotonic()
+        self._released = False
+
+    def release(self, status: int=None, headers: Mapping[str, str]=None) -> Optional[float]:
+        """
+        Release permit and feed response to the limiter. Return Retry-After
+        delay if server asked to retry later.
+        """
+        if self._released:
+            return None
+        self._released = True
+        return self._limiter._release(self, status, headers or {})
+
+
+class AdaptiveLimiter:
+    """
+    Session-wide limiter for concurrent requests. In-flight requests are capped
+    globally and per host. Limits adapt AIMD-style: they grow on successful
+    responses and are multiplied by `decrease` when server responds 429 or 503
+    or (if latency_threshold is set) when responses get slow.
+
+    When server responds 429/503 with Retry-After, no new requests are sent to
+    that host before the given time, and the rejected request is sent again
+    (at most max_throttle_retries times).
+
+    Limiter can be used from several threads and from AsyncIO tasks.
+
+    :param initial_limit: Initial limit of in-flight requests (globally and per host).
+    :param max_limit: Upper bound of global limit.
+    :param max_limit_per_host: Upper bound of per host limit (defaults to max_limit).
+    :param min_limit: Lower bound of limits.
+    :param latency_threshold: Seconds. Slower responses are treated as congestion.
+    :param increase: Additive increase per window of successful responses.
+    :param decrease: Multiplicative decrease factor on congestion.
+    :param max_throttle_retries: How many times a request rejected with
+        Retry-After is sent again before the response is returned as is.
+    :param max_retry_after: Upper bound (seconds) for honoured Retry-After delays.
+    """
+
+    def __init__(self, initial_limit: int=10,
+                 max_limit: int=100,
+                 max_limit_per_host: int=None,
+                 min_limit: int=1,
+                 latency_threshold: float=None,
+                 increase: float=1.0,
+                 decrease: float=0.5,
+                 max_throttle_retries: int=3,
+                 max_retry_after: float=60) -> None:
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit_per_host = max_limit_per_host or max_limit
+        self.latency_threshold = latency_threshold
+        self.increase = increase
+        self.decrease = decrease
+        self.max_throttle_retries = max_throttle_retries
+        self.max_retry_after = max_retry_after
+        self._global = _Window(initial_limit, min_limit, max_limit)
+        self._hosts: Dict[str, _Window] = {}
+        self._paused_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters: List[asyncio.Future] = []
+        self._waiting = 0
+        self._throttled = 0
+        self._congested = 0
+
+    def _host_window(self, host: str) -> _Window:
+        window = self._hosts.get(host)
+        if window is None:
+            window = self._hosts[host] = _Window(self.initial_limit, self.min_limit,
+                                                 self.max_limit_per_host)
+        return window
+
+    def _try_acquire(self, host: str) -> Tuple[Optional[Permit], float]:
+        """
+        Return (permit, 0) or (None, seconds to sleep before trying again).
+        Must be called with lock held.
+        """
+        pause = self._paused_until.get(host, 0) - time.monotonic()
+        if pause > 0:
+            return None, pause
+        window = self._host_window(host)
+        if not (window.available and self._global.available):
+            return None, 0
+        window.in_flight += 1
+        self._global.in_flight += 1
+        return Permit(self, host), 0
+
+    def acquire(self, url: str, deadline: float=None) -> Permit:
+        """
+        Block until a request to url may be sent.
+
+        :param deadline: time.monotonic() time after which DeadlineExceeded is raised.
+        """
+        host = urlsplit(url).netloc
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    permit, pause = self._try_acquire(host)
+                    if permit:
+                        return permit
+                    timeout = remaining(deadline)
+                    if pause:
+                        timeout = pause if timeout is None else min(pause, timeout)
+                    self._condition.wait(timeout)
+            finally:
+                self._waiting -= 1
+
+    async def acquire_async(self, url: str) -> Permit:
+        """
+        Wait until a request to url may be sent.
+        """
+        host = urlsplit(url).netloc
+        loop = asyncio.get_event_loop()
+        while True:
+            with self._lock:
+                permit, pause = self._try_acquire(host)
+                if permit:
+                    return permit
+                waiter = loop.create_future()
+                self._async_waiters.append(waiter)
+                self._waiting += 1
+            try:
+                if pause:
+                    await asyncio.wait([waiter], timeout=pause)
+                else:
+                    await waiter
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+
+    def _wake_up(self) -> None:
+        # Must be called with lock held
+        self._condition.notify_all()
+        for waiter in self._async_waiters:
+            waiter.get_loop().call_soon_threadsafe(_set_result, waiter)
+        self._async_waiters = []
+
+    def _release(self, permit: Permit, status: Optional[int],
+                 headers: Mapping[str, str]) -> Optional[float]:
+        now = time.monotonic()
+        latency = now - permit.started_at
+        retry_after = None
+        with self._lock:
+            window = self._hosts[permit.host]
+            window.in_flight -= 1
+            self._global.in_flight -= 1
+            if status in THROTTLE_STATUSES:
+                self._throttled += 1
+                retry_after = parse_retry_after(headers.get('Retry-After'))
+                if retry_after is not None:
+                    retry_after = min(retry_after, self.max_retry_after)
+                    self._paused_until[permit.host] = max(
+                        self._paused_until.get(permit.host, 0), now + retry_after)
+                    logger.info('Server %s asked to retry after %.1f s',
+                                permit.host, retry_after)
+            congested = status in THROTTLE_STATUSES or (
+                self.latency_threshold is not None and latency > self.latency_threshold)
+            if congested:
+                self._congested += 1
+                window.on_congestion(permit.started_at, now, self.decrease)
+                self._global.on_congestion(permit.started_at, now, self.decrease)
+            elif status is not None:
+                window.on_success(self.increase)
+                self._global.on_success(self.increase)
+            self._wake_up()
+        return retry_after
+
+    def call(self, url: str, send: 'Callable[[], TransportResponse]',
+             deadline: float=None) -> 'TransportResponse':
+        """
+        Call send() within the limits. Requests rejected with Retry-After are
+        sent again after the delay.
+
+        :param deadline: time.monotonic() time after which DeadlineExceeded is
+            raised instead of waiting for a permit.
+        """
+        for _ in range(self.max_throttle_retries + 1):
+            permit = self.acquire(url, deadline)
+            try:
+                response = send()
+            except BaseException:
+                permit.release()
+                raise
+            retry_after = permit.release(response.status, response.headers)
+            if retry_after is None:
+                break
+        return response
+
+    async def call_async(self, url: str,
+                         send: 'Callable[[], Awaitable[TransportResponse]]') \
+            -> 'TransportResponse':
+        """
+        Async version of call.
+        """
+        for _ in range(self.max_throttle_retries + 1):
+            permit = await self.acquire_async(url)
+            try:
+                response = await send()
+            except BaseException:
+                permit.release()
+                raise
+            retry_after = permit.release(response.status, response.headers)
+            if retry_after is None:
+                break
+        return response
+
+    def stats(self) -> dict:
+        """
+        Return snapshot of limiter state.
+
+        Keys:
+         - limit, in_flight: current global limit and in-flight requests
+         - waiting: requests that are waiting for a permit
+         - throttled: total number of 429/503 responses
+         - congested: total number of congestion signals (throttled or slow responses)
+         - hosts: limit, in_flight and remaining pause (seconds) for each host
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'limit': int(self._global.limit),
+                'in_flight': self._global.in_flight,
+                'waiting': self._waiting,
+                'throttled': self._throttled,
+                'congested': self._congested,
+                'hosts': {host: {'limit': int(window.limit),
+                                 'in_flight': window.in_flight,
+                                 'paused': max(0.0, self._paused_until.get(host, 0) - now)}
+                          for host, window in self._hosts.items()},
+            }
+
+
+def _set_result(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
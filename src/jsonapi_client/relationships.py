@@ -44,6 +44,7 @@ R_IDENT_TYPES = Union[str, ResourceObject, ResourceIdentifier, ResourceTuple]
 
 if TYPE_CHECKING:
     from .filter import Modifier
+    from .resourceobject import RelationshipDict
     from .document import Document
     from .session import Session
 
@@ -68,8 +69,9 @@ class AbstractRelationship(AbstractJsonObject):
             or not specified (empty string).
         """
         self._resources: Dict[Tuple[str, str], ResourceObject] = None
-        self._invalid = False
         self._is_dirty: bool = False
+        # RelationshipDict of the resource that this relationship belongs to
+        self._container: 'RelationshipDict' = None
         self._resource_types = resource_types or []
         self._relation_type = relation_type
 
@@ -79,6 +81,11 @@ class AbstractRelationship(AbstractJsonObject):
     def is_single(self) -> bool:
         raise NotImplementedError
 
+    @property
+    def _invalid(self) -> bool:
+        return (super()._invalid
+                or self._container is not None and self._container._invalid)
+
     def _modify_sync(self, modifier: 'Modifier') -> 'Document':
         url = modifier.url_with_modifiers(self.url)
         return self.session.fetch_document_by_url(url)
@@ -113,6 +120,8 @@ class AbstractRelationship(AbstractJsonObject):
         Mark this relationship as modified/dirty.
         """
         self._is_dirty = True
+        if self._container is not None:
+            self.session._resource_dirty(self._container._resource)
 
     async def _fetch_async(self) -> 'List[ResourceObject]':
         raise NotImplementedError
@@ -309,6 +318,8 @@ class MultiRelationship(AbstractRelationship):
     def _fetch_sync(self) -> 'List[ResourceObject]':
         self.session.assert_sync()
         self._resources = {}
+        if self.session._fan_out:
+            self.session._prefetch_resources(self._resource_identifiers)
         for res_id in self._resource_identifiers:
             res = self.session.fetch_resource_by_resource_identifier(res_id)
             self._resources[(res.type, res.id)] = res
@@ -30,9 +30,10 @@ ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
 SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
+import functools
 import logging
 from itertools import chain
-from typing import Set, Optional, Awaitable, Union, Iterable, TYPE_CHECKING
+from typing import Set, Optional, Awaitable, Union, Iterable, Callable, TYPE_CHECKING
 
 from .common import (jsonify_attribute_name, AbstractJsonObject,
                      dejsonify_attribute_names, HttpMethod, HttpStatus, AttributeProxy,
@@ -76,8 +77,10 @@ class AttributeDict(dict):
         self._resource = resource
         self._schema: 'Schema' = resource.session.schema
         self._full_name: str = name
-        self._invalid = False
+        self._invalidated = False
         self._dirty_attributes: Set[str] = set()
+        # Root AttributeDict tells session about changes, after it is built
+        self._notify_session = False
 
         if self._parent is not None and self._parent._full_name:
             self._full_name = f'{parent._full_name}.{name}'
@@ -114,6 +117,7 @@ class AttributeDict(dict):
                 if isinstance(value, dict):
                     self[key] = AttributeDict(data=value, name=key, parent=self, resource=resource)
         self._dirty_attributes.clear()
+        self._notify_session = parent is None
 
     def create_map(self, attr_name):
         """
@@ -125,6 +129,12 @@ class AttributeDict(dict):
         name = jsonify_attribute_name(attr_name)
         self[name] = AttributeDict(data={}, name=name, parent=self, resource=self._resource)
 
+    @property
+    def _invalid(self) -> bool:
+        # Nested dictionaries are invalid when their root is, and root when
+        # resource is
+        return self._invalidated or (self._parent or self._resource)._invalid
+
     def _check_invalid(self):
         if self._invalid:
             raise DocumentInvalid('Resource has been invalidated.')
@@ -156,6 +166,8 @@ class AttributeDict(dict):
         self._dirty_attributes.add(name)
         if self._parent:
             self._parent.mark_dirty(self._name)
+        elif self._notify_session:
+            self._resource.session._resource_dirty(self._resource)
 
     def mark_clean(self):
         """
@@ -205,12 +217,9 @@ class AttributeDict(dict):
 
     def mark_invalid(self):
         """
-        Recursively mark this and contained objects as invalid.
+        Mark this and (implicitly) contained objects as invalid.
         """
-        self._invalid = True
-        for value in self.values():
-            if isinstance(value, AttributeDict):
-                value.mark_invalid()
+        self._invalidated = True
 
     def change_resource(self, new_resource: 'ResourceObject') -> None:
         """
@@ -240,7 +249,7 @@ class RelationshipDict(dict):
         :param resource: Parent ResourceObject
         """
         super().__init__()
-        self._invalid = False
+        self._invalidated = False
         self._resource = resource
         self.session = resource.session
         self._schema = schema = resource.session.schema
@@ -259,13 +268,15 @@ class RelationshipDict(dict):
                              for key, value in data.items()}
             self.update(relationships)
 
+    @property
+    def _invalid(self) -> bool:
+        return self._invalidated or self._resource._invalid
+
     def mark_invalid(self):
         """
-        Mark invalid this dictionary and contained Relationships.
+        Mark invalid this dictionary and (implicitly) contained Relationships.
         """
-        self._invalid = True
-        for value in self.values():
-            value.mark_invalid()
+        self._invalidated = True
 
     def change_resource(self, new_resource: 'ResourceObject') -> None:
         """
@@ -307,8 +318,10 @@ class RelationshipDict(dict):
 
     def _make_relationship(self, data, relation_type=None, resource_types=None):
         cls = self._determine_class(data, relation_type)
-        return cls(self.session, data, resource_types=resource_types,
-                   relation_type=relation_type)
+        relationship = cls(self.session, data, resource_types=resource_types,
+                           relation_type=relation_type)
+        relationship._container = self
+        return relationship
 
     def mark_clean(self):
         """
@@ -552,14 +565,27 @@ class ResourceObject(AbstractJsonObject):
         return self._post_commit(status, result, location)
 
     def _commit_sync(self, url: str= '', meta: dict=None) -> 'None':
+        return self._commit_task(url, meta)()
+
+    def _commit_task(self, url: str= '', meta: dict=None) \
+            -> 'Callable[[], Optional[ResourceObject]]':
+        """
+        Internal use.
+
+        Make the commit request and return function that applies its result
+        to this resource and session cache. Session commits resources
+        concurrently from a thread pool, and calls those functions in its own
+        thread, as session cache is not thread-safe.
+        """
         self.session.assert_sync()
         if self._delete:
-            return self._perform_delete(url)
+            self.session.http_request(HttpMethod.DELETE, url or self.url, {})
+            return functools.partial(self.session.remove_resource, self)
 
         url = self._pre_commit(url)
         status, result, location = self.session.http_request(self._http_method, url,
                                                              self._commit_data(meta))
-        return self._post_commit(status, result, location)
+        return functools.partial(self._post_commit, status, result, location)
 
     def commit(self, custom_url: str = '', meta: dict = None) \
             -> 'Union[None, ResourceObject, Awaitable[Optional[ResourceObject]]':
@@ -623,11 +649,7 @@ class ResourceObject(AbstractJsonObject):
         Mark resource to be deleted. Resource will be deleted upon commit.
         """
         self._delete = True
-
-    def _perform_delete(self, url=''):
-        url = url or self.url
-        self.session.http_request(HttpMethod.DELETE, url, {})
-        self.session.remove_resource(self)
+        self.session._resource_dirty(self)
 
     async def _perform_delete_async(self, url=''):
         url = url or self.url
@@ -640,14 +662,14 @@ class ResourceObject(AbstractJsonObject):
         """
         self._attributes.mark_clean()
         self._relationships.mark_clean()
+        self.session._resource_clean(self)
 
     def mark_invalid(self):
         """
-        Mark this resource and it's related objects as invalid.
+        Mark this resource and it's related objects as invalid. Attributes and
+        relationships are invalid when their resource is.
         """
         super().mark_invalid()
-        self._attributes.mark_invalid()
-        self._relationships.mark_invalid()
         self.meta.mark_invalid()
         self.links.mark_invalid()
 
@@ -0,0 +1,284 @@
+"""
+JSON API Python client
+https://github.com/qvantel/jsonapi-client
+
+(see JSON API specification in http://jsonapi.org/)
+
+Copyright (c) 2017, Qvantel
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of the Qvantel nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL QVANTEL BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import asyncio
+import collections
+import logging
+import random
+import threading
+import time
+from typing import (TYPE_CHECKING, Any, Awaitable, Callable, Counter, Deque, Iterable,
+                    Optional, Tuple)
+
+from .common import HttpMethod
+from .deadline import remaining
+
+if TYPE_CHECKING:
+    from .transport import TransportResponse
+
+logger = logging.getLogger(__name__)
+
+#: Methods that are retried by default
+IDEMPOTENT_METHODS = (HttpMethod.GET, HttpMethod.DELETE)
+
+#: Response statuses that are retried by default
+TRANSIENT_STATUSES = (502, 503, 504)
+
+
+def transient_exceptions() -> Tuple[type, ...]:
+    """
+    Return exception classes of failed connections and timeouts of the
+    installed HTTP libraries.
+    """
+    exceptions = [ConnectionError, TimeoutError]
+    try:
+        import requests
+    except ImportError:
+        pass
+    else:
+        exceptions += [requests.ConnectionError, requests.Timeout,
+                       requests.exceptions.ChunkedEncodingError]
+    try:
+        import aiohttp
+    except ImportError:
+        pass
+    else:
+        exceptions += [aiohttp.ClientConnectionError, aiohttp.ClientPayloadError]
+    return tuple(exceptions)
+
+
+class RetryPolicy:
+    """
+    Retries requests that failed transiently: connection errors, timeouts and
+    responses with one of the given statuses. Retries are delayed by
+    exponential backoff with full jitter, and only a fraction of requests
+    (the budget) may be retries, so that retries do not multiply load on a
+    server that is already failing.
+
+    Only idempotent methods (GET, DELETE) are retried unless others are given
+    explicitly in methods.
+
+    Policy can be used from several threads and from AsyncIO tasks.
+
+    :param max_attempts: Maximum number of attempts per request, including the first.
+    :param backoff: Base delay (seconds). Delay before retry n is a random value
+        between 0 and min(max_backoff, backoff * 2 ** (n - 1)).
+    :param max_backoff: Upper bound of backoff delay (seconds).
+    :param budget: Fraction of requests (within the last `window` seconds) that
+        may be retried.
+    :param min_retries: Number of retries per window that are allowed regardless
+        of the budget, so that sessions making few requests can retry too.
+    :param window: Length of budget window in seconds.
+    :param statuses: Response statuses that are retried.
+    :param methods: HTTP methods (see HttpMethod) that are retried. Add
+        HttpMethod.POST / HttpMethod.PATCH only if server can handle duplicates.
+    :param exceptions: Exception classes that are retried (defaults to
+        transient_exceptions()).
+    """
+
+    def __init__(self, max_attempts: int=3,
+                 backoff: float=0.1,
+                 max_backoff: float=10.0,
+                 budget: float=0.2,
+                 min_retries: int=10,
+                 window: float=10.0,
+                 statuses: Iterable[int]=TRANSIENT_STATUSES,
+                 methods: Iterable[str]=IDEMPOTENT_METHODS,
+                 exceptions: Tuple[type, ...]=None) -> None:
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.budget = budget
+        self.min_retries = min_retries
+        self.window = window
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.lower() for method in methods)
+        self.exceptions = exceptions or transient_exceptions()
+        self._lock = threading.Lock()
+        self._recent_requests: Deque[float] = collections.deque()
+        self._recent_retries: Deque[float] = collections.deque()
+        self.requests = 0
+        self.retries = 0
+        self.recovered = 0
+        self.gave_up = 0
+        self.budget_exhausted = 0
+        self.reasons: Counter[str] = collections.Counter()
+
+    def backoff_delay(self, retry: int) -> float:
+        """
+        Return delay (seconds) before given retry (1 for the first retry).
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (retry - 1)))
+
+    def _start(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            self._recent_requests.append(now)
+
+    def _try_retry(self, reason: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            for recent in (self._recent_requests, self._recent_retries):
+                while recent and recent[0] < now - self.window:
+                    recent.popleft()
+            allowed = max(self.min_retries, self.budget * len(self._recent_requests))
+            if len(self._recent_retries) + 1 > allowed:
+                self.budget_exhausted += 1
+                return False
+            self._recent_retries.append(now)
+            self.retries += 1
+            self.reasons[reason] += 1
+            return True
+
+    def _reason(self, response: Any=None, exc: BaseException=None) -> Optional[str]:
+        """
+        Return reason for retrying, or None if result is not transient.
+        """
+        if exc is not None:
+            return type(exc).__name__ if isinstance(exc, self.exceptions) else None
+        if response.status in self.statuses:
+            return f'status {response.status}'
+        return None
+
+    def _next_delay(self, http_method: str, attempt: int, reason: Optional[str],
+                    deadline: Optional[float]) -> Optional[float]:
+        """
+        Return delay before the next attempt, or None if request is not retried.
+        """
+        if reason is None:
+            return None
+        if attempt >= self.max_attempts:
+            with self._lock:
+                self.gave_up += 1
+            logger.warning('%s request failed after %d attempts (%s)',
+                           http_method.upper(), attempt, reason)
+            return None
+        delay = self.backoff_delay(attempt)
+        if deadline is not None and remaining(deadline) <= delay:
+            return None
+        if not self._try_retry(reason):
+            logger.info('Retry budget exhausted, not retrying %s request (%s)',
+                        http_method.upper(), reason)
+            return None
+        logger.info('Retrying %s request in %.3f s (%s)', http_method.upper(), delay,
+                    reason)
+        return delay
+
+    def _finish(self, attempt: int, response: 'TransportResponse') -> None:
+        if attempt > 1 and self._reason(response) is None:
+            with self._lock:
+                self.recovered += 1
+
+    def call(self, http_method: str, send: 'Callable[[], TransportResponse]',
+             deadline: float=None,
+             discard: 'Callable[[TransportResponse], None]'=None) -> 'TransportResponse':
+        """
+        Call send() and call it again while it fails transiently.
+
+        :param deadline: time.monotonic() time; request is not retried if
+            backoff delay would pass it.
+        :param discard: Called with a response that is not used because
+            request is retried (for example to close streaming response).
+        """
+        if http_method.lower() not in self.methods:
+            return send()
+        self._start()
+        attempt = 1
+        while True:
+            try:
+                response = send()
+            except Exception as exc:
+                delay = self._next_delay(http_method, attempt, self._reason(exc=exc),
+                                         deadline)
+                if delay is None:
+                    raise
+            else:
+                delay = self._next_delay(http_method, attempt,
+                                         self._reason(response), deadline)
+                if delay is None:
+                    self._finish(attempt, response)
+                    return response
+                if discard is not None:
+                    discard(response)
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, http_method: str,
+                         send: 'Callable[[], Awaitable[TransportResponse]]',
+                         discard: 'Callable[[TransportResponse], Awaitable]'=None) \
+            -> 'TransportResponse':
+        """
+        Async version of call. Deadline is enforced by the caller.
+        """
+        if http_method.lower() not in self.methods:
+            return await send()
+        self._start()
+        attempt = 1
+        while True:
+            try:
+                response = await send()
+            except Exception as exc:
+                delay = self._next_delay(http_method, attempt, self._reason(exc=exc),
+                                         None)
+                if delay is None:
+                    raise
+            else:
+                delay = self._next_delay(http_method, attempt,
+                                         self._reason(response), None)
+                if delay is None:
+                    self._finish(attempt, response)
+                    return response
+                if discard is not None:
+                    await discard(response)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict:
+        """
+        Return snapshot of retry metrics.
+
+        Keys:
+         - requests: requests sent through the policy (retryable methods only)
+         - retries: retry attempts made
+         - recovered: requests that succeeded after being retried
+         - gave_up: requests that still failed after max_attempts
+         - budget_exhausted: retries that were not made because of the budget
+         - reasons: number of retries by reason (status or exception name)
+        """
+        with self._lock:
+            return {'requests': self.requests,
+                    'retries': self.retries,
+                    'recovered': self.recovered,
+                    'gave_up': self.gave_up,
+                    'budget_exhausted': self.budget_exhausted,
+                    'reasons': dict(self.reasons)}
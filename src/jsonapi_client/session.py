@@ -30,22 +30,43 @@ ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
 SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
+import asyncio
 import collections
-import json
+import contextvars
+import functools
 import logging
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from itertools import chain
+from operator import itemgetter
 from typing import (TYPE_CHECKING, Set, Optional, Tuple, Dict, Union, Iterable,
-                    AsyncIterable, Awaitable, AsyncIterator, Iterator, List)
+                    AsyncIterable, Awaitable, AsyncIterator, Iterator, List, Callable,
+                    Hashable, MutableMapping)
 from urllib.parse import ParseResult, urlparse
 
 import jsonschema
 
 from .common import jsonify_attribute_name, error_from_response, \
-    HttpStatus, HttpMethod
-from .exceptions import DocumentError, AsyncError
+    HttpStatus, HttpMethod, execute_async
+from .codec import JsonCodec, get_codec
+from .balancer import EndpointBalancer
+from .cache import ObjectCache, approximate_size, url_prefixes
+from .compression import available_encodings, compress
+from .deadline import Deadline, current_deadline, expired, remaining
+from .exceptions import DocumentError, AsyncError, DeadlineExceeded
+from .streaming import DocumentStreamReader
+from .transport import (Transport, AsyncTransport, TransportResponse, RequestsTransport,
+                        AiohttpTransport, EngineTransport, StreamingResponse,
+                        AsyncStreamingResponse)
 
 if TYPE_CHECKING:
     from asyncio import AbstractEventLoop
+    from .bulk import Source
+    from .cache import TTL
+    from .diskcache import DiskCache
+    from .hedging import HedgingPolicy
+    from .limiter import AdaptiveLimiter
+    from .retry import RetryPolicy
     from .objects import ResourceIdentifier
     from .document import Document
     from .resourceobject import ResourceObject
@@ -54,6 +75,11 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 NOT_FOUND = object()
+#: Set while documents that were validated in worker processes are read
+_prevalidated: 'contextvars.ContextVar[bool]' = contextvars.ContextVar(
+    'jsonapi_client_prevalidated', default=False)
+#: Default number of concurrent requests in Session.fetch_many (sync mode)
+DEFAULT_FETCH_WORKERS = 10
 
 
 class Schema:
@@ -102,7 +128,7 @@ class Schema:
         Validate model data against schema.
         """
         schema = self.schema_for_model(model_type)
-        if not schema:
+        if not schema or _prevalidated.get():
             return
         jsonschema.validate(data, schema)
 
@@ -116,6 +142,88 @@ class Session:
     :param schema: Schema in jsonschema format. See example from :ref:`usage-schema`.
     :param request_kwargs: Additional keyword arguments that are passed to requests.request or
         aiohttp.request functions (such as authentication object)
+    :param pool_size_per_host: Maximum number of keep-alive connections kept open
+        per host. Defaults to the HTTP library's own default.
+    :param pool_size: AsyncIO mode only. Maximum number of simultaneous connections
+        in total (aiohttp default is 100).
+    :param dns_cache_ttl: AsyncIO mode only. Time in seconds that resolved DNS
+        entries are cached (aiohttp default is 10).
+    :param keepalive_timeout: AsyncIO mode only. Time in seconds that idle
+        connections are kept alive (aiohttp default is 15).
+    :param transport: Transport instance that is used to make HTTP requests
+        (see jsonapi_client.transport). By default RequestsTransport is used in
+        sync mode and AiohttpTransport in AsyncIO mode, configured with the pool
+        arguments above. A shared transport (such as
+        RequestsTransport(shared=True)) lets many sessions use the same
+        connection pool while their request_kwargs, caches and dirty resources
+        stay separate; it is not closed when session is closed.
+    :param accept_encodings: Content codings (such as 'gzip', 'br', 'zstd') that are
+        advertised to server in Accept-Encoding header. Defaults to all codings the
+        transport can decode. Empty list disables response compression.
+    :param request_compression: Content coding that is used to compress request
+        bodies (POST/PATCH), for example 'gzip'. Disabled by default.
+    :param request_compression_threshold: Request bodies smaller than this
+        (in bytes) are not compressed.
+    :param json_codec: JSON library used to decode and encode documents: 'orjson',
+        'ujson', 'json' or JsonCodec instance. By default ('auto') the fastest
+        installed library is used.
+    :param revalidate: Revalidate cached documents with a conditional GET
+        (If-None-Match / If-Modified-Since) when they are fetched again. If server
+        responds 304 Not Modified, cached Document is reused as is.
+    :param disk_cache: DiskCache instance (see jsonapi_client.diskcache) where fetched
+        documents are persisted. Fresh responses are read from it instead of the
+        server, and stale ones are revalidated with a conditional GET.
+    :param limiter: AdaptiveLimiter instance (see jsonapi_client.limiter) that caps
+        and adapts the number of concurrent requests, and honours Retry-After.
+        It is used by all requests of the session (fetches, pagination and
+        commits) and can be shared between sessions.
+    :param hedging: HedgingPolicy instance (see jsonapi_client.hedging). If given,
+        a duplicate GET request is sent when response is slower than usual, and
+        the first response is used.
+    :param async_engine: Sync mode only. Make requests with aiohttp in a private
+        event loop that runs in a background thread (see EngineTransport; pool
+        arguments above apply), and run fan-out operations concurrently:
+        fetching resources of a to-many relationship, prefetching the next page
+        while iterating and committing several dirty resources. Public API stays
+        blocking. Enabled also when an EngineTransport is given.
+    :param unix_socket: Path of a Unix domain socket (for example of a local
+        sidecar proxy) that the default transports connect to instead of TCP.
+        Urls are still built from server_url.
+    :param read_urls: Base urls of servers (such as read replicas) that GET requests
+        are balanced between, or an EndpointBalancer (see jsonapi_client.balancer)
+        for other than the default balancing options. Their paths must correspond
+        to server_url. Writes (POST, PATCH, DELETE) always go to server_url, and
+        resources and documents are cached under server_url whichever endpoint
+        served them.
+    :param retry: RetryPolicy instance (see jsonapi_client.retry). If given,
+        requests that fail transiently (connection errors, timeouts, 502/503/504)
+        are retried with exponential backoff, within a retry budget. Only
+        idempotent methods are retried unless the policy says otherwise.
+    :param offload_threshold: AsyncIO mode only. Responses of at least this many
+        bytes are decoded, and their Document and ResourceObjects constructed
+        (including schema validation), in the default executor so that the event
+        loop is not blocked. Disabled by default.
+    :param cache_max_resources: Maximum number of resources in session cache
+        (identity map). Least recently used resources are evicted first.
+        Dirty resources are never evicted. Evicted resources are marked invalid
+        and fetched again when needed, and documents that contain them are
+        evicted too. Should be well above the number of resources in the
+        largest document, which is not cached otherwise. Unbounded by default.
+    :param cache_max_documents: Maximum number of documents in session cache.
+    :param cache_max_bytes: Maximum approximate size (in bytes) of the attributes
+        of cached resources.
+    :param cache_ttl: Time (seconds) that resources and documents are cached,
+        or dictionary of seconds by resource type. Document expires with the
+        first of its resources.
+    :param cache_weak: Hold clean resources and documents in session cache by
+        weak references, so that they are freed when the application no longer
+        uses them (and fetched again if needed later). Dirty resources are held
+        strongly until committed.
+    :param cache_keep_recent: With cache_weak, number of most recently used
+        resources (and documents) that are held strongly nevertheless.
+    :param cache_collect_stats: Count number and size of entries in session
+        cache (see cache_stats) from the start. Otherwise the first call of
+        cache_stats counts the current entries, to keep the default cache fast.
 
     """
     def __init__(self, server_url: str=None,
@@ -123,7 +231,32 @@ class Session:
                  schema: dict=None,
                  request_kwargs: dict=None,
                  loop: 'AbstractEventLoop'=None,
-                 use_relationship_iterator: bool=False,) -> None:
+                 use_relationship_iterator: bool=False,
+                 pool_size_per_host: int=None,
+                 pool_size: int=None,
+                 dns_cache_ttl: int=None,
+                 keepalive_timeout: float=None,
+                 transport: 'Union[Transport, AsyncTransport]'=None,
+                 accept_encodings: Iterable[str]=None,
+                 request_compression: str=None,
+                 request_compression_threshold: int=1024,
+                 json_codec: 'Union[str, JsonCodec]'='auto',
+                 revalidate: bool=False,
+                 disk_cache: 'DiskCache'=None,
+                 limiter: 'AdaptiveLimiter'=None,
+                 hedging: 'HedgingPolicy'=None,
+                 async_engine: bool=False,
+                 unix_socket: str=None,
+                 read_urls: 'Union[Iterable[str], EndpointBalancer]'=None,
+                 retry: 'RetryPolicy'=None,
+                 offload_threshold: int=None,
+                 cache_max_resources: int=None,
+                 cache_max_documents: int=None,
+                 cache_max_bytes: int=None,
+                 cache_ttl: 'TTL'=None,
+                 cache_weak: bool=False,
+                 cache_keep_recent: int=0,
+                 cache_collect_stats: bool=False) -> None:
         self._server: ParseResult
         self.enable_async = enable_async
 
@@ -134,26 +267,221 @@ class Session:
         else:
             self._server = None
 
+        # Objects cached in earlier generations are invalid (see invalidate)
+        self._generation = 0
+        self._cache_ttl = cache_ttl
+        # Whether resources may be evicted already while a document is read
+        self._check_documents = (cache_max_resources is not None
+                                 or cache_max_bytes is not None)
         self.resources_by_resource_identifier: \
-            'Dict[Tuple[str, str], ResourceObject]' = {}
-        self.resources_by_link: 'Dict[str, ResourceObject]' = {}
-        self.documents_by_link: 'Dict[str, Document]' = {}
+            'MutableMapping[Tuple[str, str], ResourceObject]' = ObjectCache(
+                max_entries=cache_max_resources, max_bytes=cache_max_bytes,
+                ttl=None if cache_ttl is None else self._resource_ttl, sizeof=self._resource_size,
+                is_evictable=lambda res: not res.is_dirty,
+                on_evict=self._resource_evicted, category=itemgetter(0),
+                weak=cache_weak, keep_recent=cache_keep_recent,
+                tags=lambda key, res: key[:1], stats=cache_collect_stats)
+        self.resources_by_link: 'MutableMapping[str, ResourceObject]' = \
+            weakref.WeakValueDictionary() if cache_weak else {}
+        self.documents_by_link: 'MutableMapping[str, Document]' = ObjectCache(
+            max_entries=cache_max_documents,
+            ttl=None if cache_ttl is None else self._document_ttl,
+            sizeof=self._document_size, on_evict=self._document_evicted, category=self._type_of_url,
+            weak=cache_weak, keep_recent=cache_keep_recent,
+            on_collect=lambda url: self._validators.pop(url, None),
+            tags=self._document_tags, stats=cache_collect_stats)
+        self._cache_weak = cache_weak
+        # Conditional request headers (validators) of fetched documents by url
+        self._validators: 'Dict[str, Dict[str, str]]' = {}
+        # AsyncIO mode: fetches in progress, by url or (type, id)
+        self._in_flight: 'Dict[Hashable, asyncio.Future]' = {}
         self.schema: Schema = Schema(schema)
-        if enable_async:
-            import aiohttp
-            self._aiohttp_session = aiohttp.ClientSession(loop=loop)
+        if enable_async and async_engine:
+            raise AsyncError('async_engine can be used only with enable_async=False')
+        if transport is None:
+            if enable_async or async_engine:
+                transport = AiohttpTransport(None if async_engine else loop,
+                                             pool_size=pool_size,
+                                             pool_size_per_host=pool_size_per_host,
+                                             dns_cache_ttl=dns_cache_ttl,
+                                             keepalive_timeout=keepalive_timeout,
+                                             unix_socket=unix_socket)
+                if async_engine:
+                    transport = EngineTransport(transport)
+            else:
+                transport = RequestsTransport(pool_size_per_host, unix_socket)
+        elif transport.is_async != enable_async:
+            raise AsyncError(f'{transport.__class__.__name__} can not be used '
+                             f'with enable_async={enable_async}')
+        self._transport = transport
+        # Run fan-out operations concurrently (sync mode with EngineTransport)
+        self._fan_out = isinstance(transport, EngineTransport)
+        self._fan_out_executor: ThreadPoolExecutor = None
+
+        decodable = transport.accept_encodings()
+        if accept_encodings is None:
+            accept_encodings = decodable
+        else:
+            accept_encodings = [i for i in accept_encodings if i in decodable]
+        self._accept_encoding = ', '.join(accept_encodings) or 'identity'
+        if request_compression and request_compression not in available_encodings():
+            raise ValueError(f'Unsupported request compression: {request_compression}')
+        self._request_compression = request_compression
+        self._request_compression_threshold = request_compression_threshold
+        self.codec: JsonCodec = get_codec(json_codec)
         self.use_relationship_iterator = use_relationship_iterator
+        self.revalidate = revalidate
+        self.disk_cache = disk_cache
+        self.limiter = limiter
+        self.hedging = hedging
+        if read_urls is not None and not isinstance(read_urls, EndpointBalancer):
+            read_urls = EndpointBalancer(read_urls)
+        self.balancer: EndpointBalancer = read_urls
+        self.retry = retry
+        self.offload_threshold = offload_threshold
+
+    def deadline(self, timeout: float) -> Deadline:
+        """
+        Return context manager that sets a time budget (in seconds) for all
+        requests made within it, for example a whole iterate() or commit().
+        Each request gets the remaining budget as its timeout, and
+        DeadlineExceeded is raised once the budget has been spent.
+
+        Can be used both in sync and AsyncIO mode (with or async with).
+        """
+        return Deadline(timeout)
+
+    def pool_stats(self) -> dict:
+        """
+        Return snapshot of connection pool utilisation.
+
+        Keys:
+         - limit, limit_per_host: configured connector limits (0 means unlimited)
+         - in_flight: requests that are currently being processed
+         - waiting: requests that are currently waiting for a free connection
+         - waited: total number of requests that have had to wait for a connection
+         - created: total number of new connections opened
+         - reused: total number of requests served by a kept-alive connection
+         - utilisation: in_flight / limit
+
+        Transports that do not have a connection pool return an empty dictionary.
+        """
+        return self._transport.pool_stats()
 
     def add_resources(self, *resources: 'ResourceObject') -> None:
         """
         Add resources to session cache.
         """
+        generation = self._generation
         for res in resources:
+            res._generation = generation
             self.resources_by_resource_identifier[(res.type, res.id)] = res
             lnk = res.links.self.url if res.links.self else res.url
             if lnk:
                 self.resources_by_link[lnk] = res
 
+    def _cache_document(self, url: str, doc: 'Document') -> 'Document':
+        # Document that is larger than the bounded resource cache is not cached,
+        # as its resources have been evicted already
+        resources = self.resources_by_resource_identifier
+        if (self._check_documents and not doc._no_cache
+                and any((r.type, r.id) not in resources
+                        for r in chain(doc.resources, doc.included))):
+            return doc
+        # Resources of a document stored with no_cache are not in the identity
+        # map, but are invalidated with the document
+        generation = doc._generation = self._generation
+        for res in doc.resources:
+            res._generation = generation
+        self.documents_by_link[url] = doc
+        return doc
+
+    def _resource_ttl(self, key: Tuple[str, str],
+                      res: 'ResourceObject') -> Optional[float]:
+        if isinstance(self._cache_ttl, dict):
+            return self._cache_ttl.get(res.type)
+        return self._cache_ttl
+
+    def _document_ttl(self, url: str, doc: 'Document') -> Optional[float]:
+        if not isinstance(self._cache_ttl, dict):
+            return self._cache_ttl
+        ttls = [self._cache_ttl[r.type] for r in chain(doc.resources, doc.included)
+                if r.type in self._cache_ttl]
+        return min(ttls) if ttls else None
+
+    @staticmethod
+    def _resource_size(res: 'ResourceObject') -> int:
+        return 200 * (1 + len(res._relationships)) + approximate_size(res._attributes)
+
+    @classmethod
+    def _document_size(cls, doc: 'Document') -> int:
+        # Resources of document are counted also in the resource cache
+        return 200 + sum(cls._resource_size(r) for r in chain(doc.resources, doc.included))
+
+    @staticmethod
+    def _document_tags(url: str, doc: 'Document') -> List[str]:
+        # Tags are types and keys (type, id) of contained resources, and url
+        # prefixes (that contain '/', unlike types)
+        keys = {(r.type, r.id) for r in chain(doc.resources, doc.included)}
+        return [*{type_ for type_, id_ in keys}, *keys,
+                *(url_prefixes(url) if url else ())]
+
+    def _resource_evicted(self, key: Tuple[str, str], res: 'ResourceObject') -> None:
+        lnk = res.links.self.url if res.links.self else res.url
+        if self.resources_by_link.get(lnk) is res:
+            del self.resources_by_link[lnk]
+        res.mark_invalid()
+        # Documents would keep evicted resources alive
+        for url in self.documents_by_link.keys_tagged(key):
+            self.documents_by_link.evict(url)
+
+    def _resource_dirty(self, res: 'ResourceObject') -> None:
+        """
+        Internal use.
+
+        Called when resource is modified. With weak cache, hold it strongly.
+        """
+        if self._cache_weak and res.id:
+            self.resources_by_resource_identifier.pin((res.type, res.id), res)
+
+    def _resource_clean(self, res: 'ResourceObject') -> None:
+        """
+        Internal use.
+
+        Called when resource is marked clean. With weak cache, hold it weakly.
+        """
+        if self._cache_weak and res.id:
+            self.resources_by_resource_identifier.unpin((res.type, res.id), res)
+
+    def _document_evicted(self, url: str, doc: 'Document') -> None:
+        self._validators.pop(url, None)
+        doc.mark_invalid(resources=False)
+
+    def _type_of_url(self, url: str) -> str:
+        """
+        Internal use.
+
+        Return resource type that url refers to, for cache statistics.
+        """
+        if self._server is None or not url:
+            return ''
+        prefix = self.url_prefix + '/'
+        if not url.startswith(prefix):
+            return ''
+        return urlparse(url[len(prefix):]).path.partition('/')[0]
+
+    def _cached_document(self, url: str, count: bool=True) -> 'Optional[Document]':
+        """
+        Internal use.
+
+        Return Document from cache.
+
+        :param count: Count lookup as cache hit or miss.
+        """
+        if count:
+            return self.documents_by_link.lookup(url)
+        return self.documents_by_link.get(url)
+
     def remove_resource(self, res: 'ResourceObject') -> None:
         """
         Remove resource from session cache.
@@ -282,25 +610,106 @@ class Session:
 
     def close(self):
         """
-        Close session and invalidate resources.
+        Close session and invalidate resources. Transport is closed too, unless
+        it is shared.
         """
         self.invalidate()
+        if self._fan_out_executor is not None:
+            self._fan_out_executor.shutdown(wait=False)
+            self._fan_out_executor = None
+        if not self._transport.shared:
+            return self._transport.close()
         if self.enable_async:
-            return self._aiohttp_session.close()
+            # Keep close() awaitable in AsyncIO mode
+            return asyncio.sleep(0)
 
-    def invalidate(self):
+    def cache_stats(self, reset: bool=False) -> dict:
         """
-        Invalidate resources and documents associated with this Session.
+        Return snapshot of session cache statistics: hits, misses, hit ratio,
+        fetches from server, evictions, and number and approximate size (bytes)
+        of entries, in total and by resource type ('by_type'), separately for
+        'resources' (identity map) and 'documents'. Size of a document is the
+        size of the resources it contains, so they are counted in both.
+
+        :param reset: Reset cumulative counters (all but entries and bytes)
+            after taking the snapshot, for example to report them periodically.
         """
-        for resource in chain(self.documents_by_link.values(),
-                              self.resources_by_link.values(),
-                              self.resources_by_resource_identifier.values()):
-            resource.mark_invalid()
+        return {'resources': self.resources_by_resource_identifier.stats(reset),
+                'documents': self.documents_by_link.stats(reset)}
 
+    def invalidate(
+            self, resource_types: Iterable[str]=None,
+            resources: 'Iterable[Union[ResourceIdentifier, ResourceObject, ResourceTuple]]'=None,
+            prefix: str=None) -> None:
+        """
+        Invalidate resources and documents associated with this Session.
+
+        Without arguments everything in session cache is invalidated, in
+        constant time: cached objects check whether they were cached in an
+        earlier generation of the session when they are used. Otherwise only
+        the given resources and documents that contain or refer to them are
+        invalidated and removed from session cache, in time proportional to
+        their number.
+
+        :param resource_types: Invalidate resources of these types, and documents
+            that contain them.
+        :param resources: Invalidate these resources (ResourceTuples,
+            ResourceIdentifiers or ResourceObjects), documents fetched from
+            their urls, and documents that contain them.
+        :param prefix: Invalidate documents whose url (without query) starts with
+            prefix at a path segment boundary, and resources whose url
+            (server_url/type/id) does. Prefix may be relative to server_url,
+            for example 'articles'.
+        """
+        if resource_types is not None or resources is not None or prefix is not None:
+            return self._invalidate_selected(resource_types or (), resources or (),
+                                             prefix)
+        self._generation += 1
         self.documents_by_link.clear()
+        self._validators.clear()
         self.resources_by_link.clear()
         self.resources_by_resource_identifier.clear()
 
+    def _invalidate_selected(
+            self, resource_types: Iterable[str],
+            resources: 'Iterable[Union[ResourceIdentifier, ResourceObject, ResourceTuple]]',
+            prefix: Optional[str]) -> None:
+        resource_cache = self.resources_by_resource_identifier
+        document_cache = self.documents_by_link
+        keys = {(res.type, res.id) for res in resources}
+        resource_types = set(resource_types)
+        urls = set()
+        if prefix is not None:
+            if '://' not in prefix:
+                prefix = f'{self.url_prefix}/{prefix.strip("/")}'
+            prefix = prefix.rstrip('/')
+            urls.update(document_cache.keys_tagged(prefix))
+            # Resource urls are url_prefix/type/id
+            if (self.url_prefix + '/').startswith(prefix + '/'):
+                keys.update(resource_cache)
+            elif prefix.startswith(self.url_prefix + '/'):
+                path = prefix[len(self.url_prefix) + 1:].split('/')
+                if len(path) == 1:
+                    resource_types.add(path[0])
+                elif len(path) == 2:
+                    keys.add(tuple(path))
+        for type_ in resource_types:
+            keys.update(resource_cache.keys_tagged(type_))
+            urls.update(document_cache.keys_tagged(type_))
+        for key in keys:
+            urls.update(document_cache.keys_tagged(key))
+            res = resource_cache.get(key)
+            if res is None:
+                continue
+            del resource_cache[key]
+            self._resource_evicted(key, res)
+            urls.update(document_cache.keys_tagged(res.url))
+        for url in urls:
+            doc = document_cache.get(url)
+            if doc is not None:
+                del document_cache[url]
+                self._document_evicted(url, doc)
+
     @property
     def server_url(self) -> str:
         return f'{self._server.scheme}://{self._server.netloc}'
@@ -309,6 +718,11 @@ class Session:
     def url_prefix(self) -> str:
         return self._server.geturl().rstrip('/')
 
+    def _canonical_url(self, url: str) -> str:
+        if self.balancer is None:
+            return url
+        return self.balancer.canonical_url(url, self.url_prefix)
+
     def _url_for_resource(self, resource_type: str,
                           resource_id: str=None,
                           filter: 'Modifier'=None) -> str:
@@ -374,7 +788,91 @@ class Session:
         async for res in doc._iterator_async():
             yield res
 
-    def iterate(self, resource_type: str, filter: 'Modifier'=None) \
+    def _iterate_stream_sync(self, resource_type: str, filter: 'Modifier'=None) \
+            -> 'Iterator[ResourceObject]':
+        url = self._url_for_resource(resource_type, None, filter)
+        while url:
+            doc = self._cached_document(url)
+            if doc:
+                if self.revalidate:
+                    doc = self.fetch_document_by_url(url)
+                yield from doc.resources
+            else:
+                reader = DocumentStreamReader(self, url)
+                deadline = current_deadline()
+                permit = self.limiter.acquire(url, deadline) if self.limiter else None
+                response = None
+                try:
+                    response = self._stream_response(url)
+                    if response.status != HttpStatus.OK_200:
+                        self._json_from_fetch_response(response.read())
+                    for chunk in response.iter_chunks():
+                        remaining(deadline)
+                        yield from reader.feed(chunk)
+                finally:
+                    if response is not None:
+                        response.close()
+                    if permit:
+                        permit.release(response and response.status,
+                                       response and response.headers)
+                doc = self._cache_document(url, reader.close())
+                self._store_validators(url, response)
+                if not reader.data_streamed:
+                    yield from doc.resources
+            url = self._next_page_url(doc)
+
+    async def _iterate_stream_async(self, resource_type: str, filter: 'Modifier'=None) \
+            -> 'AsyncIterator[ResourceObject]':
+        url = self._url_for_resource(resource_type, None, filter)
+        while url:
+            doc = self._cached_document(url)
+            if doc:
+                if self.revalidate:
+                    doc = await self.fetch_document_by_url_async(url)
+                for res in doc.resources:
+                    yield res
+            else:
+                reader = DocumentStreamReader(self, url)
+                permit = None
+                if self.limiter:
+                    permit = await self._with_deadline(self.limiter.acquire_async, url)
+                response = None
+                try:
+                    response = await self._with_deadline(self._stream_response_async,
+                                                          url)
+                    if response.status != HttpStatus.OK_200:
+                        self._json_from_fetch_response(await response.read())
+                    # Each chunk is awaited within the deadline, so that a stalled
+                    # body does not block forever
+                    chunks = response.iter_chunks().__aiter__()
+                    while True:
+                        try:
+                            chunk = await self._with_deadline(chunks.__anext__)
+                        except StopAsyncIteration:
+                            break
+                        for res in reader.feed(chunk):
+                            yield res
+                finally:
+                    if response is not None:
+                        await response.close()
+                    if permit:
+                        permit.release(response and response.status,
+                                       response and response.headers)
+                doc = self._cache_document(url, reader.close())
+                self._store_validators(url, response)
+                if not reader.data_streamed:
+                    for res in doc.resources:
+                        yield res
+            url = self._next_page_url(doc)
+
+    def _next_page_url(self, doc: 'Document') -> Optional[str]:
+        # Stop at empty page, like Document.iterator() does. Links to read
+        # replicas are cached under server_url, like with fetch_document_by_url.
+        if doc.resources and doc.links.next:
+            return self._canonical_url(doc.links.next.url)
+        return None
+
+    def iterate(self, resource_type: str, filter: 'Modifier'=None, stream: bool=False) \
             -> 'Union[AsyncIterator[ResourceObject], Iterator[ResourceObject]]':
         """
         Request (GET) Document from server and iterate through resources.
@@ -385,25 +883,69 @@ class Session:
         async for.
 
         :param filter: Modifier instance to filter resulting resources.
+        :param stream: Parse response while it is being received, and yield each
+            resource as soon as it is complete instead of waiting for the whole
+            page. Included resources are available in the session as soon as
+            'included' has been received.
         """
+        if stream:
+            if self.enable_async:
+                return self._iterate_stream_async(resource_type, filter)
+            return self._iterate_stream_sync(resource_type, filter)
         if self.enable_async:
             return self._iterate_async(resource_type, filter)
         else:
             return self._iterate_sync(resource_type, filter)
 
-    def read(self, json_data: dict, url='', no_cache=False)-> 'Document':
+    def read(self, json_data: Union[dict, str, bytes], url='', no_cache=False)-> 'Document':
         """
         Read document from json_data dictionary instead of fetching it from the server.
 
-        :param json_data: JSON API document as dictionary.
+        :param json_data: JSON API document as dictionary, or as encoded JSON
+            (str or bytes) that is decoded with Session's codec.
         :param url: Set source url to resulting document.
         :param no_cache: do not store results into Session's cache.
         """
         from .document import Document
-        doc = self.documents_by_link[url] = Document(self, json_data, url,
-                                                     no_cache=no_cache)
+        if isinstance(json_data, (str, bytes)):
+            json_data = self._decode_json(json_data)
+        doc = self._cache_document(url, Document(self, json_data, url,
+                                                 no_cache=no_cache))
         return doc
 
+    def read_many(self, sources: 'Iterable[Source]', urls: Iterable[str]=None,
+                  processes: int=None, chunksize: int=8,
+                  no_cache: bool=False) -> 'List[Document]':
+        """
+        Read many documents (for example archived API responses) using a pool of
+        worker processes. Workers decode the documents and validate their
+        resources against schema; decoded documents are sent back to this
+        process, where Documents are constructed and cached in order of sources.
+
+        :param sources: Encoded JSON documents (bytes or str) or paths of JSON
+            files (os.PathLike, such as pathlib.Path). Files are read by workers.
+        :param urls: Source urls of the documents, in the same order. Defaults
+            to path uris for files.
+        :param processes: Number of worker processes (defaults to CPU count).
+        :param chunksize: Number of documents sent to a worker at once.
+        :param no_cache: do not store results into Session's cache.
+        """
+        from .bulk import codec_for_workers, decode_and_validate, source_url
+        sources = list(sources)
+        if urls is None:
+            urls = [source_url(source) for source in sources]
+        worker = functools.partial(decode_and_validate,
+                                   codec=codec_for_workers(self.codec),
+                                   schema_data=self.schema._schema_data)
+        with ProcessPoolExecutor(processes) as executor:
+            decoded = executor.map(worker, sources, chunksize=chunksize)
+            token = _prevalidated.set(True)
+            try:
+                return [self.read(json_data, url, no_cache=no_cache)
+                        for json_data, url in zip(decoded, urls)]
+            finally:
+                _prevalidated.reset(token)
+
     def fetch_resource_by_resource_identifier(
                 self,
                 resource: 'Union[ResourceIdentifier, ResourceObject, ResourceTuple]',
@@ -415,12 +957,13 @@ class Session:
         Fetch resource from server by resource identifier.
         """
         type_, id_ = resource.type, resource.id
-        new_res = not force and self.resources_by_resource_identifier.get((type_, id_))
+        new_res = not force and self.resources_by_resource_identifier.lookup((type_, id_))
         if new_res:
             return new_res
         elif cache_only:
             return None
         else:
+            self.resources_by_resource_identifier.record_fetch((type_, id_))
             # Note: Document creation will add its resources to cache via .add_resources,
             # no need to do it manually here
             return self._ext_fetch_by_url(resource.url).resource
@@ -436,15 +979,127 @@ class Session:
         Fetch resource from server by resource identifier.
         """
         type_, id_ = resource.type, resource.id
-        new_res = not force and self.resources_by_resource_identifier.get((type_, id_))
+        new_res = not force and self.resources_by_resource_identifier.lookup((type_, id_))
         if new_res:
             return new_res
         elif cache_only:
             return None
         else:
+            self.resources_by_resource_identifier.record_fetch((type_, id_))
             # Note: Document creation will add its resources to cache via .add_resources,
             # no need to do it manually here
-            return (await self._ext_fetch_by_url_async(resource.url)).resource
+            doc = await self._single_flight((type_, id_), self._ext_fetch_by_url_async,
+                                            resource.url)
+            return doc.resource
+
+    def _fetch_many_sync(self, urls: Iterable[str],
+                         max_workers: int=None) -> 'List[Document]':
+        self.assert_sync()
+        urls = [self._canonical_url(url) for url in urls]
+        # Network requests are made concurrently. Each of them returns a function
+        # that builds the Document, and those are called here in order of urls,
+        # so that session cache is updated like with sequential fetches.
+        tasks: 'Dict[str, Callable[[], Callable[[], Document]]]' = {}
+        # Documents are collected here, as they may be evicted from a bounded cache
+        docs: 'Dict[str, Document]' = {}
+        for url in urls:
+            if url in tasks or url in docs:
+                continue
+            doc = self._cached_document(url)
+            if doc and self.revalidate and url in self._validators:
+                tasks[url] = functools.partial(self._revalidate_many_task, url, doc)
+            elif not doc:
+                tasks[url] = functools.partial(self._fetch_many_task, url)
+            else:
+                docs[url] = doc
+        if not tasks:
+            return [docs[url] for url in urls]
+
+        max_workers = min(len(tasks), max_workers or getattr(
+            self._transport, 'pool_size_per_host', DEFAULT_FETCH_WORKERS))
+        with ThreadPoolExecutor(max_workers,
+                                thread_name_prefix='jsonapi-fetch') as executor:
+            futures = {url: executor.submit(contextvars.copy_context().run, task)
+                       for url, task in tasks.items()}
+            try:
+                for url, future in futures.items():
+                    docs[url] = future.result()()
+            except BaseException:
+                for future in futures.values():
+                    future.cancel()
+                raise
+        return [docs[url] for url in urls]
+
+    def _submit(self, func: Callable, *args) -> 'Future':
+        """
+        Internal use.
+
+        Run func(*args) in fan-out thread pool, in the current context (so
+        that deadline applies).
+        """
+        if self._fan_out_executor is None:
+            self._fan_out_executor = ThreadPoolExecutor(DEFAULT_FETCH_WORKERS,
+                                                        thread_name_prefix='jsonapi-fan-out')
+        return self._fan_out_executor.submit(contextvars.copy_context().run, func, *args)
+
+    def _prefetch_document(self, url: str) -> 'Callable[[], Document]':
+        """
+        Internal use.
+
+        Start fetching Document in the background and return function that
+        waits for it (and caches it, in the calling thread).
+        """
+        if self._cached_document(url, count=False) is not None:
+            return functools.partial(self.fetch_document_by_url, url)
+        future = self._submit(self._fetch_many_task, url)
+        return lambda: future.result()()
+
+    def _prefetch_resources(self,
+                            identifiers: 'Iterable[ResourceIdentifier]') -> None:
+        """
+        Internal use.
+
+        Fetch resources that are not in cache concurrently.
+        """
+        urls = [i.url for i in identifiers
+                if (i.type, i.id) not in self.resources_by_resource_identifier]
+        if len(urls) > 1:
+            self._fetch_many_sync(urls)
+
+    def _fetch_many_task(self, url: str) -> 'Callable[[], Document]':
+        if self.disk_cache is not None:
+            content = self._fetch_disk_cached(url)
+            return functools.partial(self.read, content, url)
+        json_data = self._fetch_json(url)
+        return functools.partial(self.read, json_data, url)
+
+    def _revalidate_many_task(self, url: str, doc: 'Document') -> 'Callable[[], Document]':
+        response = self._get_response(url, self._validators[url])
+        return functools.partial(self._revalidated_document, url, doc, response)
+
+    async def _fetch_many_async(self, urls: Iterable[str]) -> 'List[Document]':
+        return list(await asyncio.gather(*[self.fetch_document_by_url_async(url)
+                                           for url in urls]))
+
+    def fetch_many(self, urls: Iterable[str], max_workers: int=None) \
+            -> 'Union[Awaitable[List[Document]], List[Document]]':
+        """
+        Fetch Documents by urls concurrently, and return them in the same order.
+        Documents are cached exactly as with fetch_document_by_url.
+
+        In sync mode requests are made from a thread pool sharing the session's
+        connection pool; if one of the fetches fails, its exception is raised
+        after Documents preceding it have been read. In AsyncIO mode this needs
+        to be awaited.
+
+        :param urls: Urls of the documents
+        :param max_workers: Sync mode only. Maximum number of concurrent requests
+            (defaults to the connection pool size per host).
+        """
+        if self.enable_async:
+            return self._fetch_many_async(urls)
+        else:
+            return self._fetch_many_sync(urls, max_workers)
 
     def fetch_document_by_url(self, url: str) -> 'Document':
         """
@@ -454,7 +1109,11 @@ class Session:
         """
 
         # TODO: should we try to guess type, id from url?
-        return self.documents_by_link.get(url) or self._ext_fetch_by_url(url)
+        url = self._canonical_url(url)
+        doc = self._cached_document(url)
+        if doc and self.revalidate and url in self._validators:
+            return self._revalidate_document(url, doc)
+        return doc or self._ext_fetch_by_url(url)
 
     async def fetch_document_by_url_async(self, url: str) -> 'Document':
         """
@@ -464,89 +1123,423 @@ class Session:
         """
 
         # TODO: should we try to guess type, id from url?
-        return (self.documents_by_link.get(url) or
-                await self._ext_fetch_by_url_async(url))
+        url = self._canonical_url(url)
+        doc = self._cached_document(url)
+        if doc and self.revalidate and url in self._validators:
+            return await self._single_flight(url, self._revalidate_document_async,
+                                             url, doc)
+        return doc or await self._single_flight(url, self._ext_fetch_by_url_async, url)
+
+    async def _single_flight(self, key: Hashable,
+                             coroutine_function: 'Callable[..., Awaitable]', *args):
+        """
+        Internal use.
+
+        Coalesce concurrent fetches with the same key: only the first caller
+        starts coroutine_function(*args), others wait for its result. The fetch
+        is run as a separate task, so cancelling one of the waiters does not
+        cancel it for the others.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(coroutine_function(*args))
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            logger.debug('Waiting for in-flight fetch of %s', key)
+        return await asyncio.shield(task)
+
+    def _revalidate_document(self, url: str, doc: 'Document') -> 'Document':
+        response = self._get_response(url, self._validators[url])
+        return self._revalidated_document(url, doc, response)
+
+    async def _revalidate_document_async(self, url: str, doc: 'Document') -> 'Document':
+        response = await self._get_response_async(url, self._validators[url])
+        return self._revalidated_document(url, doc, response)
+
+    def _revalidated_document(self, url: str, doc: 'Document',
+                              response: 'TransportResponse') -> 'Document':
+        if response.status == HttpStatus.NOT_MODIFIED_304:
+            logger.debug('Document %s not modified', url)
+            self._store_validators(url, response, keep_old=True)
+            return doc
+        json_data = self._json_from_fetch_response(response)
+        self._store_validators(url, response)
+        return self.read(json_data, url)
+
+    def _store_validators(self, url: str,
+                          response: 'Union[TransportResponse, StreamingResponse]',
+                          keep_old: bool=False) -> None:
+        validators = {}
+        etag = response.headers.get('ETag')
+        if etag:
+            validators['If-None-Match'] = etag
+        last_modified = response.headers.get('Last-Modified')
+        if last_modified:
+            validators['If-Modified-Since'] = last_modified
+        if validators:
+            self._validators[url] = validators
+        elif not keep_old:
+            self._validators.pop(url, None)
 
     def _ext_fetch_by_url(self, url: str) -> 'Document':
+        if self.disk_cache is not None:
+            return self.read(self._fetch_disk_cached(url), url)
         json_data = self._fetch_json(url)
         return self.read(json_data, url)
 
     async def _ext_fetch_by_url_async(self, url: str) -> 'Document':
-        json_data = await self._fetch_json_async(url)
-        return self.read(json_data, url)
+        if self.disk_cache is not None:
+            return await self._read_async(await self._fetch_disk_cached_async(url), url)
+        if self.offload_threshold is None:
+            json_data = await self._fetch_json_async(url)
+            return self.read(json_data, url)
+        response = await self._get_response_async(url)
+        return await self._read_async(self._content_from_fetch_response(url, response),
+                                      url)
+
+    async def _read_async(self, content: bytes, url: str) -> 'Document':
+        """
+        Internal use.
 
-    def _fetch_json(self, url: str) -> dict:
+        Read Document from response content. Large documents are decoded and
+        their resources constructed in executor, and only added to session
+        cache in the event loop.
+        """
+        if self.offload_threshold is None or len(content) < self.offload_threshold:
+            return self.read(content, url)
+        from .document import Document
+        logger.debug('Reading document %s (%d bytes) in executor', url, len(content))
+        json_data, resources, included = await execute_async(self._build_resources,
+                                                             content)
+        doc = self._cache_document(url, Document(self, json_data, url,
+                                                 resources=resources,
+                                                 included=included))
+        return doc
+
+    def _build_resources(self, content: bytes) \
+            -> 'Tuple[dict, Optional[List[ResourceObject]], List[ResourceObject]]':
         """
         Internal use.
 
-        Fetch document raw json from server using requests library.
+        Decode document and construct its ResourceObjects (of data and included)
+        without touching session cache, so that this can be run in another thread.
         """
-        self.assert_sync()
-        import requests
-        parsed_url = urlparse(url)
-        logger.info('Fetching document from url %s', parsed_url)
-        response = requests.get(parsed_url.geturl(), **self._request_kwargs)
-        response_content = response.json()
-        if response.status_code == HttpStatus.OK_200:
-            return response_content
+        from .resourceobject import ResourceObject
+        json_data = self._decode_json(content)
+        data = json_data.get('data')
+        if isinstance(data, list):
+            resources = [ResourceObject(self, i) for i in data]
+        elif isinstance(data, dict):
+            resources = [ResourceObject(self, data)]
         else:
+            # Let Document handle missing data and error documents
+            resources = None
+        if json_data.get('errors'):
+            return json_data, resources, None
+        included = [ResourceObject(self, i) for i in json_data.get('included', [])]
+        return json_data, resources, included
+
+    def _fetch_disk_cached(self, url: str) -> bytes:
+        """
+        Internal use.
 
-            raise DocumentError(f'Error {response.status_code}: '
+        Return document content from disk cache if it's fresh, otherwise fetch
+        (or revalidate) it from server and update the cache.
+        """
+        entry = self.disk_cache.get(url)
+        if entry and entry.is_fresh():
+            logger.debug('Using document %s from disk cache', url)
+            return entry.content
+        response = self._get_response(url, entry.validators if entry else None)
+        if entry and response.status == HttpStatus.NOT_MODIFIED_304:
+            self.disk_cache.refresh(url, response.headers)
+            return entry.content
+        content = self._content_from_fetch_response(url, response)
+        self.disk_cache.set(url, content, response.headers)
+        return content
+
+    async def _fetch_disk_cached_async(self, url: str) -> bytes:
+        """
+        Internal use. Async version. Disk cache is accessed in executor.
+        """
+        entry = await execute_async(self.disk_cache.get, url)
+        if entry and entry.is_fresh():
+            logger.debug('Using document %s from disk cache', url)
+            return entry.content
+        response = await self._get_response_async(url,
+                                                  entry.validators if entry else None)
+        if entry and response.status == HttpStatus.NOT_MODIFIED_304:
+            await execute_async(self.disk_cache.refresh, url, response.headers)
+            return entry.content
+        content = self._content_from_fetch_response(url, response)
+        await execute_async(self.disk_cache.set, url, content, response.headers)
+        return content
+
+    def _content_from_fetch_response(self, url: str,
+                                     response: 'TransportResponse') -> bytes:
+        if response.status != HttpStatus.OK_200:
+            self._json_from_fetch_response(response)  # raises DocumentError
+        self._store_validators(url, response)
+        return response.content
+
+    def _decode_json(self, content: bytes) -> dict:
+        if not content:
+            return {}
+        return self.codec.loads(content)
+
+    def _request_headers_and_kwargs(self, headers: dict=None) -> Tuple[dict, dict]:
+        kwargs = {**self._request_kwargs}
+        headers = {'Accept-Encoding': self._accept_encoding,
+                   **(headers or {}), **kwargs.pop('headers', {})}
+        return headers, kwargs
+
+    def _json_from_fetch_response(self, response: 'TransportResponse') -> dict:
+        response_content = self._decode_json(response.content)
+        if response.status == HttpStatus.OK_200:
+            return response_content
+        else:
+            raise DocumentError(f'Error {response.status}: '
                                 f'{error_from_response(response_content)}',
-                                errors={'status_code': response.status_code},
-                                response=response)
+                                errors={'status_code': response.status},
+                                response=response.original)
 
-    async def _fetch_json_async(self, url: str) -> dict:
+    def _send(self, http_method: str, url: str, **kwargs) -> 'TransportResponse':
+        """
+        Internal use.
+
+        Send request using transport, within the limits of session's limiter.
+        Transient failures are retried if session has a retry policy. GET
+        requests are hedged if session has a hedging policy, and balanced
+        between read endpoints if there are any. Within a deadline, each attempt
+        gets the remaining time budget as its timeout.
+        """
+        deadline = current_deadline()
+
+        def transport_request(endpoint_url: str):
+            if deadline is None:
+                return self._transport.request(http_method, endpoint_url, **kwargs)
+            request_kwargs = self._with_timeout(kwargs, remaining(deadline))
+            try:
+                return self._transport.request(http_method, endpoint_url,
+                                               **request_kwargs)
+            except Exception as exc:
+                if expired(deadline):
+                    raise DeadlineExceeded(f'Deadline exceeded: {http_method.upper()} '
+                                           f'{endpoint_url}') from exc
+                raise
+
+        def limited_request(endpoint_url: str):
+            if self.limiter is None:
+                return transport_request(endpoint_url)
+            return self.limiter.call(endpoint_url,
+                                     functools.partial(transport_request, endpoint_url),
+                                     deadline)
+
+        def send():
+            if self.balancer is None or http_method != HttpMethod.GET:
+                return limited_request(url)
+            return self.balancer.call(url, self.url_prefix, limited_request)
+
+        def attempt():
+            if self.hedging is not None and http_method == HttpMethod.GET:
+                return self.hedging.call(send)
+            return send()
+
+        if self.retry is None:
+            return attempt()
+        return self.retry.call(http_method, attempt, deadline)
+
+    async def _send_async(self, http_method: str, url: str,
+                          **kwargs) -> 'TransportResponse':
         """
         Internal use. Async version.
+        """
+        async def limited_request(endpoint_url: str):
+            if self.limiter is None:
+                return await self._transport.request(http_method, endpoint_url, **kwargs)
+            return await self.limiter.call_async(
+                endpoint_url,
+                lambda: self._transport.request(http_method, endpoint_url, **kwargs))
+
+        async def send():
+            if self.balancer is None or http_method != HttpMethod.GET:
+                return await limited_request(url)
+            return await self.balancer.call_async(url, self.url_prefix, limited_request)
+
+        async def attempt():
+            if self.hedging is not None and http_method == HttpMethod.GET:
+                return await self.hedging.call_async(send)
+            return await send()
+
+        if self.retry is None:
+            return await self._with_deadline(attempt)
+        return await self._with_deadline(self.retry.call_async, http_method, attempt)
+
+    @staticmethod
+    def _with_timeout(kwargs: dict, timeout: float) -> dict:
+        configured = kwargs.get('timeout')
+        if isinstance(configured, (int, float)):
+            timeout = min(configured, timeout)
+        return {**kwargs, 'timeout': timeout}
 
-        Fetch document raw json from server using aiohttp library.
+    @staticmethod
+    async def _with_deadline(coroutine_function: 'Callable[..., Awaitable]', *args):
         """
+        Internal use.
+
+        Await coroutine_function(*args) within the deadline of current operation.
+        """
+        deadline = current_deadline()
+        if deadline is None:
+            return await coroutine_function(*args)
+        timeout = remaining(deadline)
+        try:
+            return await asyncio.wait_for(coroutine_function(*args), timeout)
+        except asyncio.TimeoutError as exc:
+            # Timeouts of transport (such as aiohttp's ServerTimeoutError) are
+            # raised as is while there is budget left
+            if not expired(deadline):
+                raise
+            raise DeadlineExceeded('Deadline exceeded') from exc
+
+    def _get_response(self, url: str, headers: dict=None) -> 'TransportResponse':
+        self.assert_sync()
+        parsed_url = urlparse(url)
+        logger.info('Fetching document from url %s', parsed_url)
+        self.documents_by_link.record_fetch(url)
+        headers, kwargs = self._request_headers_and_kwargs(headers)
+        return self._send(HttpMethod.GET, parsed_url.geturl(), headers=headers, **kwargs)
+
+    async def _get_response_async(self, url: str,
+                                  headers: dict=None) -> 'TransportResponse':
         self.assert_async()
         parsed_url = urlparse(url)
         logger.info('Fetching document from url %s', parsed_url)
-        async with self._aiohttp_session.get(parsed_url.geturl(),
-                                             **self._request_kwargs) as response:
-            response_content = await response.json(content_type='application/vnd.api+json')
-            if response.status == HttpStatus.OK_200:
-                return response_content
-            else:
-                raise DocumentError(f'Error {response.status}: '
-                                    f'{error_from_response(response_content)}',
-                                    errors={'status_code': response.status},
-                                    response=response)
+        self.documents_by_link.record_fetch(url)
+        headers, kwargs = self._request_headers_and_kwargs(headers)
+        return await self._send_async(HttpMethod.GET, parsed_url.geturl(),
+                                      headers=headers, **kwargs)
 
-    def http_request(self, http_method: str, url: str, send_json: dict,
-                     expected_statuses: List[str]=None) -> Tuple[int, dict, str]:
+    def _fetch_json(self, url: str) -> dict:
         """
         Internal use.
 
-        Method to make PATCH/POST requests to server using requests library.
+        Fetch document raw json from server using transport.
         """
-        self.assert_sync()
-        import requests
-        logger.debug('%s request: %s', http_method.upper(), send_json)
-        expected_statuses = expected_statuses or HttpStatus.ALL_OK
-        kwargs = {**self._request_kwargs}
-        headers = {'Content-Type':'application/vnd.api+json'}
-        headers.update(kwargs.pop('headers', {}))
+        response = self._get_response(url)
+        json_data = self._json_from_fetch_response(response)
+        self._store_validators(url, response)
+        return json_data
 
-        response = requests.request(http_method, url, json=send_json,
-                                    headers=headers,
-                                    **kwargs)
+    async def _fetch_json_async(self, url: str) -> dict:
+        """
+        Internal use. Async version.
+
+        Fetch document raw json from server using transport.
+        """
+        response = await self._get_response_async(url)
+        json_data = self._json_from_fetch_response(response)
+        self._store_validators(url, response)
+        return json_data
 
-        response_json = response.json()
-        if response.status_code not in expected_statuses:
+    def _stream_response(self, url: str) -> 'StreamingResponse':
+        """
+        Internal use.
+
+        Start streaming document from server using transport.
+        """
+        self.assert_sync()
+        logger.info('Streaming document from url %s', url)
+        self.documents_by_link.record_fetch(url)
+        headers, kwargs = self._request_headers_and_kwargs()
+        deadline = current_deadline()
+        if deadline is not None:
+            kwargs = self._with_timeout(kwargs, remaining(deadline))
+
+        def stream(endpoint_url: str) -> 'StreamingResponse':
+            return self._transport.stream(HttpMethod.GET, endpoint_url, headers=headers,
+                                          **kwargs)
+
+        def send() -> 'StreamingResponse':
+            if self.balancer is None:
+                return stream(url)
+            return self.balancer.call(url, self.url_prefix, stream)
+
+        if self.retry is None:
+            return send()
+        return self.retry.call(HttpMethod.GET, send, deadline,
+                               discard=lambda response: response.close())
+
+    async def _stream_response_async(self, url: str) -> 'AsyncStreamingResponse':
+        """
+        Internal use. Async version.
+
+        Start streaming document from server using transport.
+        """
+        self.assert_async()
+        logger.info('Streaming document from url %s', url)
+        self.documents_by_link.record_fetch(url)
+        headers, kwargs = self._request_headers_and_kwargs()
+
+        async def stream(endpoint_url: str) -> 'AsyncStreamingResponse':
+            return await self._transport.stream(HttpMethod.GET, endpoint_url,
+                                                headers=headers, **kwargs)
+
+        async def send() -> 'AsyncStreamingResponse':
+            if self.balancer is None:
+                return await stream(url)
+            return await self.balancer.call_async(url, self.url_prefix, stream)
+
+        if self.retry is None:
+            return await send()
+        return await self.retry.call_async(HttpMethod.GET, send,
+                                           discard=lambda response: response.close())
+
+    def _prepare_http_request(self, http_method: str, send_json: dict) \
+            -> Tuple[bytes, dict, dict]:
+        logger.debug('%s request: %s', http_method.upper(), send_json)
+        headers, kwargs = self._request_headers_and_kwargs(
+            {'Content-Type': 'application/vnd.api+json'})
+        data = self.codec.dumps(send_json)
+        if (self._request_compression
+                and len(data) >= self._request_compression_threshold):
+            data = compress(data, self._request_compression)
+            headers['Content-Encoding'] = self._request_compression
+        return data, headers, kwargs
+
+    def _result_from_http_response(self, http_method: str,
+                                   response: 'TransportResponse',
+                                   send_json: dict,
+                                   expected_statuses: List[str]) -> Tuple[int, dict, str]:
+        try:
+            response_json = self._decode_json(response.content)
+        except ValueError:
+            if response.status in expected_statuses:
+                raise
+            response_json = {}
+        if response.status not in expected_statuses:
             raise DocumentError(f'Could not {http_method.upper()} '
-                                f'({response.status_code}): '
+                                f'({response.status}): '
                                 f'{error_from_response(response_json)}',
-                                errors={'status_code': response.status_code},
-                                response=response,
+                                errors={'status_code': response.status},
+                                response=response.original,
                                 json_data=send_json)
 
-        return response.status_code, response_json \
-            if response.content \
-            else {}, response.headers.get('Location')
+        return response.status, response_json, response.headers.get('Location')
+
+    def http_request(self, http_method: str, url: str, send_json: dict,
+                     expected_statuses: List[str]=None) -> Tuple[int, dict, str]:
+        """
+        Internal use.
+
+        Method to make PATCH/POST requests to server using transport.
+        """
+        self.assert_sync()
+        expected_statuses = expected_statuses or HttpStatus.ALL_OK
+        data, headers, kwargs = self._prepare_http_request(http_method, send_json)
+        response = self._send(http_method, url, headers=headers, data=data, **kwargs)
+        return self._result_from_http_response(http_method, response, send_json,
+                                               expected_statuses)
 
     async def http_request_async(
                 self,
@@ -558,31 +1551,15 @@ class Session:
         """
         Internal use. Async version.
 
-        Method to make PATCH/POST requests to server using aiohttp library.
+        Method to make PATCH/POST requests to server using transport.
         """
-
         self.assert_async()
-        logger.debug('%s request: %s', http_method.upper(), send_json)
         expected_statuses = expected_statuses or HttpStatus.ALL_OK
-        content_type = '' if http_method == HttpMethod.DELETE else 'application/vnd.api+json'
-        kwargs = {**self._request_kwargs}
-        headers = {'Content-Type':'application/vnd.api+json'}
-        headers.update(kwargs.pop('headers', {}))
-        async with self._aiohttp_session.request(
-                http_method, url, data=json.dumps(send_json),
-                headers=headers,
-                **kwargs) as response:
-
-            response_json = await response.json(content_type=content_type)
-            if response.status not in expected_statuses:
-                raise DocumentError(f'Could not {http_method.upper()} '
-                                    f'({response.status}): '
-                                    f'{error_from_response(response_json)}',
-                                    errors={'status_code': response.status},
-                                    response=response,
-                                    json_data=send_json)
-
-            return response.status, response_json or {}, response.headers.get('Location')
+        data, headers, kwargs = self._prepare_http_request(http_method, send_json)
+        response = await self._send_async(http_method, url, headers=headers, data=data,
+                                          **kwargs)
+        return self._result_from_http_response(http_method, response, send_json,
+                                               expected_statuses)
 
     @property
     def dirty_resources(self) -> 'Set[ResourceObject]':
@@ -599,7 +1576,23 @@ class Session:
     def _commit_sync(self) -> None:
         self.assert_sync()
         logger.info('Committing dirty resources')
-        for res in self.dirty_resources:
+        dirty_resources = self.dirty_resources
+        if self._fan_out and len(dirty_resources) > 1:
+            # Only requests are made concurrently. Their results are applied
+            # here, so that session cache is modified in one thread only.
+            futures = [self._submit(res._commit_task) for res in dirty_resources]
+            error = None
+            for future in futures:
+                try:
+                    apply_result = future.result()
+                except Exception as exc:
+                    error = error or exc
+                else:
+                    apply_result()
+            if error is not None:
+                raise error
+            return
+        for res in dirty_resources:
             res.commit()
 
     async def _commit_async(self) -> None:
@@ -0,0 +1,266 @@
+"""
+JSON API Python client
+https://github.com/qvantel/jsonapi-client
+
+(see JSON API specification in http://jsonapi.org/)
+
+Copyright (c) 2017, Qvantel
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of the Qvantel nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL QVANTEL BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import logging
+import re
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+from .exceptions import ValidationError
+
+if TYPE_CHECKING:
+    from .codec import JsonCodec
+    from .document import Document
+    from .resourceobject import ResourceObject
+    from .session import Session
+
+logger = logging.getLogger(__name__)
+
+#: Characters that are significant outside of JSON strings
+_STRUCTURAL = re.compile(rb'[{}\[\]",:]')
+#: Characters that are significant inside JSON strings
+_STRING = re.compile(rb'["\\]')
+
+
+class DocumentStreamParser:
+    """
+    Incremental parser for JSON API documents. Elements of top level 'data'
+    array are decoded and returned as soon as they have been received completely.
+    Other top level members (included, links, meta, etc.) are decoded once each of
+    them is complete, and can be accessed through .members.
+
+    Parser only splits the stream at element boundaries; decoding itself is
+    done with the given codec.
+
+    :param codec: JsonCodec that is used to decode complete elements.
+    """
+
+    def __init__(self, codec: 'JsonCodec') -> None:
+        self._codec = codec
+        self._buffer = bytearray()
+        self._offset = 0  # absolute position of self._buffer[0]
+        self._pos = 0  # absolute position where scanning continues
+        self._depth = 0
+        self._in_string = False
+        self._string_start = 0
+        self._expecting_key = False
+        self._key: str = None
+        self._value_start: int = None
+        self._in_data_array = False
+        self._element_start = 0
+        self._finished = False
+
+        #: Decoded top level members, except streamed 'data' array
+        self.members: Dict[str, Any] = {}
+        #: True when 'data' was an array whose elements were returned by feed()
+        self.data_streamed = False
+        #: Names of top level members in order they were completed
+        self.completed: List[str] = []
+
+    def _slice(self, start: int, end: int) -> bytes:
+        return bytes(self._buffer[start - self._offset:end - self._offset])
+
+    def _finish_element(self, end: int, elements: list) -> None:
+        raw = self._slice(self._element_start, end).strip()
+        if raw:
+            elements.append(self._codec.loads(raw))
+
+    def _finish_member(self, end: int) -> None:
+        if self._key is None:
+            return
+        if self._key == 'data' and self.data_streamed:
+            self.completed.append(self._key)
+        else:
+            raw = self._slice(self._value_start, end).strip()
+            self.members[self._key] = self._codec.loads(raw)
+            self.completed.append(self._key)
+        self._key = None
+        self._value_start = None
+
+    def _scan(self) -> Tuple[list, list]:
+        elements: list = []
+        completed_before = len(self.completed)
+        buffer = self._buffer
+        length = self._offset + len(buffer)
+
+        while self._pos < length:
+            if self._in_string:
+                match = _STRING.search(buffer, self._pos - self._offset)
+                if match is None:
+                    self._pos = length
+                    break
+                position = self._offset + match.start()
+                if match.group() == b'\\':
+                    if position + 1 >= length:
+                        # Escaped character not received yet
+                        self._pos = position
+                        break
+                    self._pos = position + 2
+                    continue
+                self._in_string = False
+                self._pos = position + 1
+                if self._depth == 1 and self._expecting_key:
+                    self._key = self._codec.loads(self._slice(self._string_start,
+                                                              self._pos))
+                    self._expecting_key = False
+                continue
+
+            match = _STRUCTURAL.search(buffer, self._pos - self._offset)
+            if match is None:
+                self._pos = length
+                break
+            position = self._offset + match.start()
+            self._pos = position + 1
+            char = match.group()
+
+            if char == b'"':
+                self._in_string = True
+                self._string_start = position
+            elif char in b'{[':
+                self._depth += 1
+                if self._depth == 1:
+                    if char != b'{':
+                        raise ValidationError('JSON API document must be an object')
+                    self._expecting_key = True
+                elif self._depth == 2 and self._key == 'data' and char == b'[':
+                    self._in_data_array = True
+                    self.data_streamed = True
+                    self._element_start = self._pos
+                    self._value_start = None
+            elif char in b'}]':
+                if self._depth == 2 and self._in_data_array:
+                    self._finish_element(position, elements)
+                    self._in_data_array = False
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_member(position)
+                    self._finished = True
+            elif char == b',':
+                if self._depth == 2 and self._in_data_array:
+                    self._finish_element(position, elements)
+                    self._element_start = self._pos
+                elif self._depth == 1:
+                    self._finish_member(position)
+                    self._expecting_key = True
+            elif char == b':':
+                if self._depth == 1:
+                    self._value_start = self._pos
+
+        self._compact()
+        return elements, self.completed[completed_before:]
+
+    def _compact(self) -> None:
+        """
+        Drop data from buffer that is not needed anymore.
+        """
+        keep = self._pos
+        if self._in_string:
+            keep = min(keep, self._string_start)
+        if self._in_data_array:
+            keep = min(keep, self._element_start)
+        elif self._value_start is not None:
+            keep = min(keep, self._value_start)
+        del self._buffer[:keep - self._offset]
+        self._offset = keep
+
+    def feed(self, chunk: bytes) -> Tuple[List[Any], List[str]]:
+        """
+        Feed next chunk of the document.
+
+        Return tuple of (decoded elements of 'data' array that were completed,
+        names of top level members that were completed).
+        """
+        self._buffer.extend(chunk)
+        return self._scan()
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Finish parsing and return top level members. If 'data' was streamed,
+        it is not included in returned members.
+        """
+        if not self._finished:
+            raise ValidationError('Incomplete JSON API document')
+        return self.members
+
+
+class DocumentStreamReader:
+    """
+    Build Document from a stream of chunks. ResourceObjects of 'data' are
+    constructed (and added to session cache) as soon as they are parsed, and
+    included resources as soon as 'included' has been received.
+
+    :param session: Session of resulting document
+    :param url: Source url of the document
+    :param no_cache: Do not store resources into Session's cache.
+    """
+
+    def __init__(self, session: 'Session', url: str, no_cache: bool=False) -> None:
+        self.session = session
+        self.url = url
+        self._no_cache = no_cache
+        self._parser = DocumentStreamParser(session.codec)
+        self.resources: 'List[ResourceObject]' = []
+        self.included: 'List[ResourceObject]' = None
+
+    def feed(self, chunk: bytes) -> 'List[ResourceObject]':
+        """
+        Feed next chunk. Return ResourceObjects that were completed.
+        """
+        from .resourceobject import ResourceObject
+        elements, completed = self._parser.feed(chunk)
+        if 'included' in completed:
+            self.included = [ResourceObject(self.session, i)
+                             for i in self._parser.members['included']]
+            if not self._no_cache:
+                self.session.add_resources(*self.included)
+        resources = [ResourceObject(self.session, i) for i in elements]
+        if not self._no_cache:
+            self.session.add_resources(*resources)
+        self.resources.extend(resources)
+        return resources
+
+    @property
+    def data_streamed(self) -> bool:
+        """
+        Whether resources of 'data' were returned by feed(). If 'data' is a
+        single resource object, it is available only in the closed Document.
+        """
+        return self._parser.data_streamed
+
+    def close(self) -> 'Document':
+        """
+        Finish reading and return the complete Document.
+        """
+        from .document import Document
+        members = self._parser.close()
+        resources = self.resources if self._parser.data_streamed else None
+        return Document(self.session, members, self.url, no_cache=self._no_cache,
+                        resources=resources, included=self.included)
@@ -0,0 +1,772 @@
+"""
+JSON API Python client
+https://github.com/qvantel/jsonapi-client
+
+(see JSON API specification in http://jsonapi.org/)
+
+Copyright (c) 2017, Qvantel
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+    * Redistributions of source code must retain the above copyright
+      notice, this list of conditions and the following disclaimer.
+    * Redistributions in binary form must reproduce the above copyright
+      notice, this list of conditions and the following disclaimer in the
+      documentation and/or other materials provided with the distribution.
+    * Neither the name of the Qvantel nor the
+      names of its contributors may be used to endorse or promote products
+      derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL QVANTEL BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import asyncio
+import io
+import logging
+import sys
+import threading
+from typing import (TYPE_CHECKING, Any, AsyncIterable, Awaitable, Callable, Dict,
+                    Iterable, List, Mapping, Tuple)
+from urllib.parse import unquote, urlsplit
+
+from .common import HttpMethod
+from .compression import Decompressor, available_encodings
+
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop
+    import aiohttp
+    import requests
+
+logger = logging.getLogger(__name__)
+
+
+class TransportResponse:
+    """
+    HTTP response as returned by transports.
+
+    :param status: HTTP status code
+    :param headers: Case-insensitive mapping of response headers
+    :param content: Response body
+    :param original: Response object of the underlying HTTP library, if any.
+    """
+    def __init__(self, status: int, headers: Mapping[str, str], content: bytes,
+                 original: Any=None) -> None:
+        self.status = status
+        self.headers = headers
+        self.content = content
+        self.original = self if original is None else original
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self.status} ({len(self.content or b"")} bytes)>'
+
+
+#: Size of chunks read from streaming responses
+CHUNK_SIZE = 64 * 1024
+
+
+class StreamingResponse:
+    """
+    HTTP response whose body is received in chunks. Must be closed after use.
+
+    :param status: HTTP status code
+    :param headers: Case-insensitive mapping of response headers
+    :param chunks: Iterable of (decompressed) body chunks
+    :param close: Callable that releases the response
+    :param original: Response object of the underlying HTTP library, if any.
+    """
+    def __init__(self, status: int, headers: Mapping[str, str], chunks: Iterable[bytes],
+                 close: Callable[[], None]=None, original: Any=None) -> None:
+        self.status = status
+        self.headers = headers
+        self._chunks = chunks
+        self._close = close
+        self.original = self if original is None else original
+
+    def iter_chunks(self) -> Iterable[bytes]:
+        return self._chunks
+
+    def read(self) -> TransportResponse:
+        """
+        Read rest of the body and return it as complete TransportResponse.
+        """
+        return TransportResponse(self.status, self.headers, b''.join(self._chunks),
+                                 self.original)
+
+    def close(self) -> None:
+        if self._close:
+            self._close()
+
+
+class AsyncStreamingResponse:
+    """
+    AsyncIO version of StreamingResponse. Close needs to be awaited.
+    """
+    def __init__(self, status: int, headers: Mapping[str, str],
+                 chunks: AsyncIterable[bytes], close: Callable=None,
+                 original: Any=None) -> None:
+        self.status = status
+        self.headers = headers
+        self._chunks = chunks
+        self._close = close
+        self.original = self if original is None else original
+
+    def iter_chunks(self) -> AsyncIterable[bytes]:
+        return self._chunks
+
+    async def read(self) -> TransportResponse:
+        """
+        Read rest of the body and return it as complete TransportResponse.
+        """
+        content = b''.join([chunk async for chunk in self._chunks])
+        return TransportResponse(self.status, self.headers, content, self.original)
+
+    async def close(self) -> None:
+        if self._close:
+            await self._close()
+
+
+async def _single_chunk(content: bytes):
+    yield content
+
+
+class Transport:
+    """
+    Base class for blocking transports that Session uses to make HTTP requests.
+
+    A transport whose shared attribute is True can be used by several Sessions
+    at the same time. Session.close() leaves it open; it is closed by its owner.
+    """
+    is_async = False
+    shared = False
+
+    def request(self, http_method: str, url: str, headers: Dict[str, str]=None,
+                data: bytes=None, **kwargs) -> TransportResponse:
+        """
+        Make a request and return the complete response.
+
+        :param http_method: HTTP method name, see HttpMethod
+        :param headers: Request headers
+        :param data: Encoded request body
+        :param kwargs: Additional, transport specific arguments (from
+            Session's request_kwargs)
+        """
+        raise NotImplementedError
+
+    def stream(self, http_method: str, url: str, headers: Dict[str, str]=None,
+               data: bytes=None, **kwargs) -> StreamingResponse:
+        """
+        Make a request and return response whose body can be consumed in chunks as
+        it is received. By default, the whole body is received first.
+        """
+        response = self.request(http_method, url, headers=headers, data=data, **kwargs)
+        return StreamingResponse(response.status, response.headers, [response.content],
+                                 original=response.original)
+
+    def accept_encodings(self) -> List[str]:
+        """
+        Content codings that this transport is able to decode from responses.
+        """
+        return available_encodings()
+
+    def pool_stats(self) -> dict:
+        """
+        Return snapshot of connection pool utilisation, if transport has one.
+        """
+        return {}
+
+    def close(self) -> None:
+        pass
+
+
+class AsyncTransport:
+    """
+    Base class for AsyncIO transports that Session uses to make HTTP requests.
+    See Transport for shared transports.
+    """
+    is_async = True
+    shared = False
+
+    async def request(self, http_method: str, url: str, headers: Dict[str, str]=None,
+                      data: bytes=None, **kwargs) -> TransportResponse:
+        """
+        Make a request and return the complete response. See Transport.request.
+        """
+        raise NotImplementedError
+
+    async def stream(self, http_method: str, url: str, headers: Dict[str, str]=None,
+                     data: bytes=None, **kwargs) -> AsyncStreamingResponse:
+        """
+        Make a request and return response whose body can be consumed in chunks as
+        it is received. By default, the whole body is received first.
+        """
+        response = await self.request(http_method, url, headers=headers, data=data,
+                                      **kwargs)
+        return AsyncStreamingResponse(response.status, response.headers,
+                                      _single_chunk(response.content),
+                                      original=response.original)
+
+    def accept_encodings(self) -> List[str]:
+        """
+        Content codings that this transport is able to decode from responses.
+        """
+        return available_encodings()
+
+    def pool_stats(self) -> dict:
+        """
+        Return snapshot of connection pool utilisation, if transport has one.
+        """
+        return {}
+
+    async def close(self) -> None:
+        pass
+
+
+def _unix_socket_adapter(socket_path: str, **kwargs) -> 'requests.adapters.HTTPAdapter':
+    """
+    Return requests adapter whose connections (for any host) are made to the
+    given Unix domain socket. TLS is not used over the socket.
+    """
+    import socket
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection
+    from urllib3.connectionpool import HTTPConnectionPool
+    from urllib3.poolmanager import SSL_KEYWORDS
+
+    class UnixSocketConnection(HTTPConnection):
+        def _new_conn(self) -> socket.socket:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            if isinstance(self.timeout, (int, float)):
+                sock.settimeout(self.timeout)
+            try:
+                sock.connect(socket_path)
+            except BaseException:
+                sock.close()
+                raise
+            return sock
+
+    class UnixSocketConnectionPool(HTTPConnectionPool):
+        ConnectionCls = UnixSocketConnection
+
+        def __init__(self, *args, **kwargs):
+            for keyword in SSL_KEYWORDS:
+                kwargs.pop(keyword, None)
+            super().__init__(*args, **kwargs)
+
+    class UnixSocketAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                'http': UnixSocketConnectionPool, 'https': UnixSocketConnectionPool}
+            self.poolmanager.key_fn_by_scheme = {
+                **self.poolmanager.key_fn_by_scheme,
+                'https': self.poolmanager.key_fn_by_scheme['http']}
+
+    return UnixSocketAdapter(**kwargs)
+
+
+class RequestsTransport(Transport):
+    """
+    Transport using requests library. Connections are kept alive and reused.
+
+    :param pool_size_per_host: Maximum number of keep-alive connections kept open
+        per host. Defaults to requests' own default.
+    :param unix_socket: Path of a Unix domain socket that all connections are
+        made to (for example a local sidecar proxy). Urls, including Host
+        header, are still built from Session's server_url.
+    :param shared: Transport (and its connection pool) is shared by several
+        Sessions, for example one Session per incoming web request. Cookies set
+        by servers are not stored, so they do not leak from one Session to
+        another, and Session.close() does not close the transport.
+    """
+    def __init__(self, pool_size_per_host: int=None, unix_socket: str=None,
+                 shared: bool=False) -> None:
+        import requests
+        from http.cookiejar import DefaultCookiePolicy
+        from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE
+
+        self.pool_size_per_host = pool_size_per_host or DEFAULT_POOLSIZE
+        self.unix_socket = unix_socket
+        self.shared = shared
+        self.requests_session: 'requests.Session' = requests.Session()
+        if shared:
+            self.requests_session.cookies.set_policy(
+                DefaultCookiePolicy(allowed_domains=[]))
+        if unix_socket:
+            self._adapter = _unix_socket_adapter(unix_socket,
+                                                 pool_maxsize=self.pool_size_per_host)
+        else:
+            self._adapter = HTTPAdapter(pool_maxsize=self.pool_size_per_host)
+        self.requests_session.mount('http://', self._adapter)
+        self.requests_session.mount('https://', self._adapter)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def request(self, http_method: str, url: str, headers: Dict[str, str]=None,
+                data: bytes=None, **kwargs) -> TransportResponse:
+        with self._lock:
+            self._in_flight += 1
+        try:
+            if http_method == HttpMethod.GET:
+                response = self.requests_session.get(url, headers=headers, **kwargs)
+            else:
+                response = self.requests_session.request(http_method, url, data=data,
+                                                         headers=headers, **kwargs)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        return TransportResponse(response.status_code, response.headers,
+                                 response.content, response)
+
+    def stream(self, http_method: str, url: str, headers: Dict[str, str]=None,
+               data: bytes=None, **kwargs) -> StreamingResponse:
+        with self._lock:
+            self._in_flight += 1
+        try:
+            response = self.requests_session.request(http_method, url, data=data,
+                                                     headers=headers, stream=True,
+                                                     **kwargs)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        return StreamingResponse(response.status_code, response.headers,
+                                 response.iter_content(CHUNK_SIZE), response.close,
+                                 response)
+
+    def accept_encodings(self) -> List[str]:
+        from urllib3.util.request import ACCEPT_ENCODING
+        return ACCEPT_ENCODING.split(',')
+
+    def pool_stats(self) -> dict:
+        pools = self._adapter.poolmanager.pools
+        pools = [pools[key] for key in pools.keys()]
+        created = sum(pool.num_connections for pool in pools)
+        requests_made = sum(pool.num_requests for pool in pools)
+        return {
+            'limit': 0,
+            'limit_per_host': self.pool_size_per_host,
+            'in_flight': self._in_flight,
+            'waiting': 0,
+            'waited': 0,
+            'created': created,
+            'reused': max(requests_made - created, 0),
+            'utilisation': 0.0,
+        }
+
+    def close(self) -> None:
+        self.requests_session.close()
+
+
+class PoolMonitor:
+    """
+    Keeps track of aiohttp connection pool utilisation via request tracing.
+    """
+
+    def __init__(self) -> None:
+        self.connector: 'aiohttp.BaseConnector' = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.waited = 0
+        self.created = 0
+        self.reused = 0
+
+    def trace_config(self) -> 'aiohttp.TraceConfig':
+        import aiohttp
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_end.append(self._on_request_done)
+        trace_config.on_request_exception.append(self._on_request_done)
+        trace_config.on_connection_queued_start.append(self._on_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_queued_end)
+        trace_config.on_connection_create_end.append(self._on_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_reuseconn)
+        return trace_config
+
+    async def _on_request_start(self, session, context, params):
+        self.in_flight += 1
+
+    async def _on_request_done(self, session, context, params):
+        self.in_flight -= 1
+
+    async def _on_queued_start(self, session, context, params):
+        self.waiting += 1
+        self.waited += 1
+
+    async def _on_queued_end(self, session, context, params):
+        self.waiting -= 1
+
+    async def _on_create_end(self, session, context, params):
+        self.created += 1
+
+    async def _on_reuseconn(self, session, context, params):
+        self.reused += 1
+
+    def stats(self) -> dict:
+        limit = self.connector.limit if self.connector else 0
+        return {
+            'limit': limit,
+            'limit_per_host': self.connector.limit_per_host if self.connector else 0,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'waited': self.waited,
+            'created': self.created,
+            'reused': self.reused,
+            'utilisation': self.in_flight / limit if limit else 0.0,
+        }
+
+
+class AiohttpTransport(AsyncTransport):
+    """
+    Transport using aiohttp library. aiohttp ClientSession is created on first
+    use, so that the transport can be constructed outside of the event loop.
+
+    :param loop: Event loop to be used
+    :param pool_size: Maximum number of simultaneous connections in total
+        (aiohttp default is 100).
+    :param pool_size_per_host: Maximum number of simultaneous connections per host
+        (aiohttp default is unlimited).
+    :param dns_cache_ttl: Time in seconds that resolved DNS entries are cached
+        (aiohttp default is 10).
+    :param keepalive_timeout: Time in seconds that idle connections are kept alive
+        (aiohttp default is 15).
+    :param unix_socket: Path of a Unix domain socket that all connections are
+        made to. Urls are still built from Session's server_url.
+    :param shared: Transport is shared by several Sessions (of the same event
+        loop). Cookies are not stored and Session.close() does not close the
+        transport, see RequestsTransport.
+    """
+    def __init__(self, loop: 'AbstractEventLoop'=None,
+                 pool_size: int=None,
+                 pool_size_per_host: int=None,
+                 dns_cache_ttl: int=None,
+                 keepalive_timeout: float=None,
+                 unix_socket: str=None,
+                 shared: bool=False) -> None:
+        self._loop = loop
+        self.unix_socket = unix_socket
+        self.shared = shared
+        self._connector_kwargs: dict = {}
+        if pool_size is not None:
+            self._connector_kwargs['limit'] = pool_size
+        if pool_size_per_host is not None:
+            self._connector_kwargs['limit_per_host'] = pool_size_per_host
+        if dns_cache_ttl is not None:
+            self._connector_kwargs['ttl_dns_cache'] = dns_cache_ttl
+        if keepalive_timeout is not None:
+            self._connector_kwargs['keepalive_timeout'] = keepalive_timeout
+        self._pool_monitor = PoolMonitor()
+        self._client_session: 'aiohttp.ClientSession' = None
+
+    def _create_connector(self) -> 'aiohttp.BaseConnector':
+        import aiohttp
+        if self.unix_socket:
+            kwargs = {key: value for key, value in self._connector_kwargs.items()
+                      if key != 'ttl_dns_cache'}
+            return aiohttp.UnixConnector(self.unix_socket, loop=self._loop, **kwargs)
+        return aiohttp.TCPConnector(loop=self._loop, **self._connector_kwargs)
+
+    @property
+    def client_session(self) -> 'aiohttp.ClientSession':
+        if self._client_session is None:
+            import aiohttp
+            connector = self._create_connector()
+            self._pool_monitor.connector = connector
+            cookie_jar = aiohttp.DummyCookieJar() if self.shared else None
+            self._client_session = aiohttp.ClientSession(
+                loop=self._loop, connector=connector, cookie_jar=cookie_jar,
+                trace_configs=[self._pool_monitor.trace_config()])
+        return self._client_session
+
+    async def request(self, http_method: str, url: str, headers: Dict[str, str]=None,
+                      data: bytes=None, **kwargs) -> TransportResponse:
+        if http_method == HttpMethod.GET:
+            context = self.client_session.get(url, headers=headers, **kwargs)
+        else:
+            context = self.client_session.request(http_method, url, data=data,
+                                                  headers=headers, **kwargs)
+        async with context as response:
+            content = await response.read()
+            return TransportResponse(response.status, response.headers, content,
+                                     response)
+
+    async def stream(self, http_method: str, url: str, headers: Dict[str, str]=None,
+                     data: bytes=None, **kwargs) -> AsyncStreamingResponse:
+        response = await self.client_session.request(http_method, url, data=data,
+                                                     headers=headers, **kwargs)
+
+        async def close():
+            response.release()
+
+        return AsyncStreamingResponse(response.status, response.headers,
+                                      response.content.iter_chunked(CHUNK_SIZE), close,
+                                      response)
+
+    def accept_encodings(self) -> List[str]:
+        try:
+            from aiohttp.compression_utils import HAS_BROTLI, HAS_ZSTD
+        except ImportError:
+            from aiohttp.http_parser import HAS_BROTLI
+            HAS_ZSTD = False
+        return ['gzip', 'deflate'] + ['br'] * HAS_BROTLI + ['zstd'] * HAS_ZSTD
+
+    def pool_stats(self) -> dict:
+        return self._pool_monitor.stats()
+
+    async def close(self) -> None:
+        if self._client_session is not None:
+            await self._client_session.close()
+
+
+def _split_url(url: str) -> Tuple[str, str, int, str, str]:
+    parsed = urlsplit(url)
+    scheme = parsed.scheme or 'http'
+    host = parsed.hostname or 'localhost'
+    port = parsed.port or (443 if scheme == 'https' else 80)
+    return scheme, host, port, parsed.path or '/', parsed.query
+
+
+def _case_insensitive(headers: List[Tuple[str, str]]) -> Mapping[str, str]:
+    from requests.structures import CaseInsensitiveDict
+    return CaseInsensitiveDict(headers)
+
+
+class WSGITransport(Transport):
+    """
+    In-process transport that calls a WSGI application directly, without
+    opening any sockets. Useful for testing and benchmarking. Compressed
+    response bodies are decompressed as chunks are received from application.
+
+    Extra keyword arguments (from Session's request_kwargs) are ignored.
+
+    :param app: WSGI application
+    """
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    def _environ(self, http_method: str, url: str, headers: Dict[str, str],
+                 data: bytes) -> dict:
+        scheme, host, port, path, query = _split_url(url)
+        data = data or b''
+        environ = {
+            'REQUEST_METHOD': http_method.upper(),
+            'SCRIPT_NAME': '',
+            'PATH_INFO': unquote(path, encoding='latin-1'),
+            'QUERY_STRING': query,
+            'SERVER_NAME': host,
+            'SERVER_PORT': str(port),
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'CONTENT_LENGTH': str(len(data)),
+            'HTTP_HOST': f'{host}:{port}',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scheme,
+            'wsgi.input': io.BytesIO(data),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in (headers or {}).items():
+            key = name.upper().replace('-', '_')
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = f'HTTP_{key}'
+            environ[key] = value
+        return environ
+
+    def stream(self, http_method: str, url: str, headers: Dict[str, str]=None,
+               data: bytes=None, **kwargs) -> StreamingResponse:
+        environ = self._environ(http_method, url, headers, data)
+        started: list = []
+
+        def start_response(status, response_headers, exc_info=None):
+            started[:] = [status, _case_insensitive(response_headers)]
+
+        result = self.app(environ, start_response)
+        iterator = iter(result)
+        # start_response may be called only when the first chunk is produced
+        first_chunks = [] if started else [next(iterator, b'')]
+        status, response_headers = started
+        decompressor = Decompressor(response_headers.get('Content-Encoding', ''))
+
+        def chunks():
+            for chunk in first_chunks:
+                yield decompressor.decompress(chunk)
+            for chunk in iterator:
+                yield decompressor.decompress(chunk)
+            yield decompressor.flush()
+
+        def close():
+            if hasattr(result, 'close'):
+                result.close()
+
+        return StreamingResponse(int(status.split(' ', 1)[0]), response_headers,
+                                 chunks(), close)
+
+    def request(self, http_method: str, url: str, headers: Dict[str, str]=None,
+                data: bytes=None, **kwargs) -> TransportResponse:
+        response = self.stream(http_method, url, headers=headers, data=data, **kwargs)
+        try:
+            return response.read()
+        finally:
+            response.close()
+
+
+class ASGITransport(AsyncTransport):
+    """
+    In-process transport that calls an ASGI (3.0) application directly, without
+    opening any sockets. Useful for testing and benchmarking. Compressed
+    response bodies are decompressed as chunks are received from application.
+
+    Extra keyword arguments (from Session's request_kwargs) are ignored.
+
+    :param app: ASGI application
+    """
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    def _scope(self, http_method: str, url: str, headers: Dict[str, str]) -> dict:
+        scheme, host, port, path, query = _split_url(url)
+        headers = {'host': f'{host}:{port}', **(headers or {})}
+        return {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': http_method.upper(),
+            'scheme': scheme,
+            'path': unquote(path),
+            'raw_path': path.encode('latin-1'),
+            'query_string': query.encode('latin-1'),
+            'root_path': '',
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                        for name, value in headers.items()],
+            'client': ('127.0.0.1', 0),
+            'server': (host, port),
+        }
+
+    async def request(self, http_method: str, url: str, headers: Dict[str, str]=None,
+                      data: bytes=None, **kwargs) -> TransportResponse:
+        scope = self._scope(http_method, url, headers)
+        request_messages = [{'type': 'http.request', 'body': data or b'',
+                             'more_body': False}]
+        status = None
+        response_headers: List[Tuple[str, str]] = []
+        body: List[bytes] = []
+        decompressor = Decompressor('')
+
+        async def receive():
+            if request_messages:
+                return request_messages.pop()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal status, decompressor
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                response_headers.extend((name.decode('latin-1'), value.decode('latin-1'))
+                                        for name, value in message.get('headers', []))
+                decompressor = Decompressor(
+                    _case_insensitive(response_headers).get('Content-Encoding', ''))
+            elif message['type'] == 'http.response.body':
+                body.append(decompressor.decompress(message.get('body', b'')))
+
+        await self.app(scope, receive, send)
+        body.append(decompressor.flush())
+        return TransportResponse(status, _case_insensitive(response_headers),
+                                 b''.join(body))
+
+
+class AsyncEngine:
+    """
+    Private AsyncIO event loop that runs in a background (daemon) thread.
+    Coroutines can be run in it from any other thread.
+    """
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name='jsonapi-engine',
+                                        daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coroutine: Awaitable, timeout: float=None) -> Any:
+        """
+        Run coroutine in the engine and block until it completes.
+
+        :param timeout: Seconds after which coroutine is cancelled and
+            asyncio.TimeoutError is raised.
+        """
+        if timeout is not None:
+            coroutine = asyncio.wait_for(coroutine, timeout)
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self) -> None:
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class EngineTransport(Transport):
+    """
+    Blocking transport that drives an AsyncTransport (by default
+    AiohttpTransport) in a private event loop running in a background thread.
+    Requests made from several threads are multiplexed on that loop and share
+    its connection pool.
+
+    A timeout keyword argument (seconds) limits the whole request.
+
+    :param transport: AsyncTransport to drive. It is closed with this transport.
+    :param shared: Transport is shared by several Sessions (see RequestsTransport).
+        Default AiohttpTransport is then created as shared too.
+    """
+    def __init__(self, transport: AsyncTransport=None, shared: bool=False) -> None:
+        self.engine = AsyncEngine()
+        self.transport = transport or AiohttpTransport(None, shared=shared)
+        self.shared = shared
+
+    def request(self, http_method: str, url: str, headers: Dict[str, str]=None,
+                data: bytes=None, timeout: float=None, **kwargs) -> TransportResponse:
+        return self.engine.run(self.transport.request(http_method, url, headers=headers,
+                                                      data=data, **kwargs), timeout)
+
+    def stream(self, http_method: str, url: str, headers: Dict[str, str]=None,
+               data: bytes=None, timeout: float=None, **kwargs) -> StreamingResponse:
+        response = self.engine.run(self.transport.stream(http_method, url,
+                                                         headers=headers, data=data,
+                                                         **kwargs), timeout)
+        iterator = response.iter_chunks().__aiter__()
+
+        def chunks():
+            while True:
+                try:
+                    yield self.engine.run(iterator.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return
+
+        def close():
+            self.engine.run(response.close())
+
+        return StreamingResponse(response.status, response.headers, chunks(), close,
+                                 response.original)
+
+    def accept_encodings(self) -> List[str]:
+        return self.transport.accept_encodings()
+
+    def pool_stats(self) -> dict:
+        return self.transport.pool_stats()
+
+    def close(self) -> None:
+        if not self.engine.loop.is_closed():
+            self.engine.run(self.transport.close())
+        self.engine.close()
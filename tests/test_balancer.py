@@ -0,0 +1,164 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from jsonapi_client.balancer import EndpointBalancer
+from jsonapi_client.session import Session
+from jsonapi_client.transport import WSGITransport, ASGITransport
+
+
+SCHEMA = {'articles': {'properties': {'title': {'type': 'string'}}}}
+
+
+def test_least_outstanding():
+    balancer = EndpointBalancer(['http://a/api', 'http://b/api/', 'http://c/api'])
+    first = balancer.select()
+    second = balancer.select()
+    third = balancer.select()
+    assert {first.url, second.url, third.url} == {'http://a/api', 'http://b/api',
+                                                  'http://c/api'}
+    balancer.release(second, 200, 0.1)
+    assert balancer.select() is second
+
+
+def test_latency_weighted():
+    balancer = EndpointBalancer(['http://a', 'http://b'], strategy='latency')
+    a, b = balancer.endpoints
+    balancer.release(balancer.select(), 200, 0.045)
+    balancer.release(balancer.select(), 200, 0.01)
+    assert (a.latency, b.latency) == (0.045, 0.01)
+    # Slow endpoint gets a request only when the fast one is busy enough
+    assert [balancer.select() for _ in range(4)] == [b] * 4
+    assert balancer.select() is a
+    with pytest.raises(ValueError):
+        EndpointBalancer(['http://a'], strategy='random')
+
+
+def test_eject_on_error():
+    balancer = EndpointBalancer(['http://a', 'http://b'], max_failures=2, eject_time=60)
+    a, b = balancer.endpoints
+    balancer.release(balancer.select(), 503)
+    balancer.release(balancer.select(), None)
+    balancer.release(balancer.select(), 200)  # success resets failure count
+    assert a.failures == 0 or b.failures == 0
+    for _ in range(4):
+        endpoint = balancer.select()
+        balancer.release(endpoint, None)
+    ejected = [url for url, stats in balancer.stats().items() if stats['ejected']]
+    assert len(ejected) == 2
+    # When all endpoints are ejected, they are still used
+    assert balancer.select() in (a, b)
+
+
+def test_canonical_url():
+    balancer = EndpointBalancer(['http://replica-1/api', 'http://replica-2/api'])
+    prefix = 'http://primary/api'
+    assert (balancer.canonical_url('http://replica-2/api/articles?page=2', prefix) ==
+            'http://primary/api/articles?page=2')
+    assert balancer.canonical_url('http://primary/api/articles', prefix) == \
+        'http://primary/api/articles'
+    assert balancer.canonical_url('http://replica-1/apiv2/x', prefix) == \
+        'http://replica-1/apiv2/x'
+    assert balancer.canonical_url('http://other/api/x', prefix) == 'http://other/api/x'
+
+
+def replicated_wsgi_app(environ, start_response):
+    host = environ['SERVER_NAME']
+    replicated_wsgi_app.requests.append((environ['REQUEST_METHOD'], host))
+    if host == 'broken':
+        start_response('503 Service Unavailable', [])
+        return [b'{"errors": [{"title": "Down"}]}']
+    if environ['REQUEST_METHOD'] == 'POST':
+        data = json.loads(environ['wsgi.input'].read(int(environ['CONTENT_LENGTH'])))
+        start_response('201 Created', [])
+        return [json.dumps({'data': {**data['data'], 'id': '9'}}).encode()]
+    start_response('200 OK', [])
+    if environ['PATH_INFO'] == '/api/articles':
+        return [json.dumps({'data': [], 'links': {
+            'next': f'http://{host}/api/articles/1'}}).encode()]
+    return [json.dumps({'data': {'type': 'articles', 'id': '1',
+                                 'attributes': {'title': host}}}).encode()]
+
+
+def test_read_write_split():
+    replicated_wsgi_app.requests = []
+    s = Session('http://primary/api', schema=SCHEMA,
+                read_urls=['http://replica-1/api', 'http://replica-2/api'],
+                transport=WSGITransport(replicated_wsgi_app))
+    doc = s.get('articles')
+    assert s.documents_by_link.keys() == {'http://primary/api/articles'}
+    # Link pointing to a replica is cached under server_url too
+    article = s.fetch_document_by_url(doc.links.next.url).resource
+    assert 'http://primary/api/articles/1' in s.documents_by_link
+    assert s.get('articles', '1').resource is article
+    s.create_and_commit('articles', title='New')
+
+    assert replicated_wsgi_app.requests == [
+        ('GET', 'replica-1'), ('GET', 'replica-2'), ('POST', 'primary')]
+    assert {url: stats['requests'] for url, stats in s.balancer.stats().items()} == {
+        'http://replica-1/api': 1, 'http://replica-2/api': 1}
+
+
+def test_broken_replica_is_ejected():
+    replicated_wsgi_app.requests = []
+    balancer = EndpointBalancer(['http://broken/api', 'http://replica/api'],
+                                max_failures=1)
+    s = Session('http://primary/api', read_urls=balancer,
+                transport=WSGITransport(replicated_wsgi_app))
+    for i in range(3):
+        try:
+            s.get('articles', str(i))
+        except Exception:
+            pass
+    assert [host for _, host in replicated_wsgi_app.requests] == \
+        ['broken', 'replica', 'replica']
+    assert balancer.stats()['http://broken/api']['ejections'] == 1
+
+
+@pytest.mark.asyncio
+async def test_balancing_async():
+    hosts = []
+
+    async def app(scope, receive, send):
+        host = dict(scope['headers'])[b'host'].decode().partition(':')[0]
+        hosts.append(host)
+        await asyncio.sleep(0.05 if host == 'replica-1' else 0.01)
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body',
+                    'body': b'{"data": {"type": "articles", "id": "1"}}'})
+
+    s = Session('http://primary/api', enable_async=True,
+                read_urls=['http://replica-1/api', 'http://replica-2/api'],
+                transport=ASGITransport(app))
+    started = time.monotonic()
+    await asyncio.gather(*[s.get('articles', str(i)) for i in range(4)])
+    assert time.monotonic() - started < 0.15
+    assert sorted(hosts) == ['replica-1', 'replica-1', 'replica-2', 'replica-2']
+    assert all(stats['outstanding'] == 0 for stats in s.balancer.stats().values())
+    await s.close()
+
+
+
+def paged_wsgi_app(environ, start_response):
+    host = environ['SERVER_NAME']
+    page = int(environ['QUERY_STRING'].partition('=')[2] or 1)
+    content = {'data': [{'type': 'articles', 'id': str(page),
+                         'attributes': {'title': host}}]}
+    if page < 3:
+        # Absolute link to the replica that served the page
+        content['links'] = {'next': f'http://{host}/api/articles?page={page + 1}'}
+    start_response('200 OK', [])
+    return [json.dumps(content).encode()]
+
+
+def test_stream_pages_cached_under_primary():
+    s = Session('http://primary/api', schema=SCHEMA,
+                read_urls=['http://replica-1/api', 'http://replica-2/api'],
+                transport=WSGITransport(paged_wsgi_app))
+    assert [r.title for r in s.iterate('articles', stream=True)] == [
+        'replica-1', 'replica-2', 'replica-1']
+    assert s.documents_by_link.keys() == {'http://primary/api/articles',
+                                          'http://primary/api/articles?page=2',
+                                          'http://primary/api/articles?page=3'}
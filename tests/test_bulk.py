@@ -0,0 +1,70 @@
+import json
+
+import jsonschema
+import pytest
+
+from jsonapi_client.bulk import codec_for_workers, decode_and_validate
+from jsonapi_client.codec import JsonCodec, get_codec
+from jsonapi_client.session import Session
+
+
+SCHEMA = {'articles': {'properties': {
+    'title': {'type': 'string'},
+    'author': {'relation': 'to-one', 'resource': ['people']}}},
+    'people': {'properties': {'name': {'type': 'string'}}}}
+
+
+def page(number: int) -> dict:
+    return {
+        'data': [{'type': 'articles', 'id': f'{number}-{i}',
+                  'attributes': {'title': f'Article {number}-{i}'},
+                  'relationships': {'author': {'data': {'type': 'people', 'id': '1'}}}}
+                 for i in range(3)],
+        'included': [{'type': 'people', 'id': '1', 'attributes': {'name': 'Alice'}}],
+    }
+
+
+def test_decode_and_validate():
+    assert decode_and_validate(json.dumps(page(1)), 'json', SCHEMA) == page(1)
+    invalid = page(1)
+    invalid['included'][0]['attributes']['name'] = 42
+    with pytest.raises(jsonschema.ValidationError):
+        decode_and_validate(json.dumps(invalid).encode(), 'json', SCHEMA)
+    assert decode_and_validate(b'', 'json') == {}
+
+
+def test_codec_for_workers():
+    class CustomCodec(JsonCodec):
+        name = 'json'
+
+    assert codec_for_workers(get_codec('json')) == 'json'
+    custom = CustomCodec()
+    assert codec_for_workers(custom) is custom
+
+
+def test_read_many(tmp_path):
+    paths = []
+    for number in range(10):
+        path = tmp_path / f'page-{number}.json'
+        path.write_text(json.dumps(page(number)))
+        paths.append(path)
+    s = Session('http://localhost:8080/api', schema=SCHEMA)
+    docs = s.read_many(paths, processes=2, chunksize=3)
+    assert [doc.resources[0].id for doc in docs] == [f'{i}-0' for i in range(10)]
+    assert docs[4].url == paths[4].as_uri()
+    assert s.documents_by_link[paths[4].as_uri()] is docs[4]
+    assert len(s.resources_by_resource_identifier) == 31
+    assert docs[9].resources[2].author.name == 'Alice'
+
+    urls = [f'http://localhost:8080/api/articles?page={i}' for i in range(2)]
+    docs = s.read_many([json.dumps(page(i)).encode() for i in range(2)], urls,
+                       processes=1)
+    assert s.documents_by_link[urls[1]] is docs[1]
+
+
+def test_read_many_invalid():
+    invalid = page(2)
+    invalid['data'][1]['attributes']['title'] = 1
+    s = Session('http://localhost:8080/api', schema=SCHEMA)
+    with pytest.raises(jsonschema.ValidationError):
+        s.read_many([json.dumps(page(1)), json.dumps(invalid)], processes=1)
@@ -0,0 +1,372 @@
+import gc
+import json
+
+import pytest
+
+from jsonapi_client.cache import ObjectCache, approximate_size, url_prefixes
+from jsonapi_client.common import ResourceTuple
+from jsonapi_client.exceptions import DocumentInvalid
+from jsonapi_client.filter import Modifier
+from jsonapi_client.resourceobject import ResourceObject
+from jsonapi_client.session import Session
+from jsonapi_client.transport import WSGITransport
+
+
+SCHEMA = {'articles': {'properties': {'title': {'type': 'string'}}},
+          'people': {'properties': {'name': {'type': 'string'}}}}
+
+
+def test_lru_eviction():
+    evicted = []
+    cache = ObjectCache(max_entries=3, on_evict=lambda k, v: evicted.append(k))
+    for key in 'abc':
+        cache[key] = key.upper()
+    assert cache['a'] == 'A'
+    cache['d'] = 'D'
+    assert evicted == ['b']
+    assert list(cache) == ['c', 'a', 'd']
+    del cache['c']
+    assert evicted == ['b']
+    assert 'c' not in cache and len(cache) == 2
+
+
+def test_size_limit_and_pinned_entries():
+    cache = ObjectCache(max_bytes=100, sizeof=len, is_evictable=lambda v: v != 'dirty' * 8)
+    cache['pinned'] = 'dirty' * 8  # 40 bytes
+    cache['a'] = 'x' * 40
+    cache['b'] = 'x' * 40
+    assert set(cache) == {'pinned', 'b'}
+    assert cache.size == 80
+    # A value bigger than the limit is kept until something else is added
+    cache['big'] = 'x' * 200
+    assert set(cache) == {'pinned', 'big'}
+    assert cache.evictions == 2
+
+
+def test_ttl(mocker):
+    now = mocker.patch('time.monotonic', return_value=100.0)
+    cache = ObjectCache(ttl=lambda key, value: {'short': 10}.get(key))
+    cache['short'] = 1
+    cache['long'] = 2
+    now.return_value = 111.0
+    assert 'short' not in cache
+    assert cache['long'] == 2
+    assert cache.evictions == 1
+
+
+def test_approximate_size():
+    assert approximate_size({'a': 'xyz'}) == 64 + 50 + 52
+    assert approximate_size([1, None]) == 56 + 2 * (8 + 24)
+
+
+def pages_wsgi_app(environ, start_response):
+    pages_wsgi_app.requests.append(environ['PATH_INFO'] + '?' + environ['QUERY_STRING'])
+    page = int(environ['QUERY_STRING'].partition('=')[2] or 1)
+    content = {'data': [{'type': 'articles', 'id': str(page * 10 + i),
+                         'attributes': {'title': 'x' * 100}} for i in range(10)]}
+    if page < 20:
+        content['links'] = {'next': f'/api/articles?page={page + 1}'}
+    start_response('200 OK', [])
+    return [json.dumps(content).encode()]
+
+
+def test_bounded_session_cache():
+    pages_wsgi_app.requests = []
+    s = Session('http://testserver/api', schema=SCHEMA, cache_max_resources=50,
+                cache_max_documents=3, transport=WSGITransport(pages_wsgi_app))
+    first = s.get('articles').resources[0]
+    first.title = 'Changed'
+    seen = [r for r in s.iterate('articles')]
+    assert len(seen) == 200
+    assert len(s.resources_by_resource_identifier) == 50
+    assert len(s.resources_by_link) == 50
+    assert len(s.documents_by_link) == 3
+    # Dirty resource is kept, clean ones are evicted and marked invalid
+    assert s.resources_by_resource_identifier[('articles', '10')] is first
+    assert s.dirty_resources == {first}
+    assert seen[1]._invalid
+    assert not seen[-1]._invalid
+
+    # Document whose resources have been evicted is fetched again
+    requests = len(pages_wsgi_app.requests)
+    s.get('articles')
+    assert len(pages_wsgi_app.requests) == requests + 1
+
+
+def test_cache_size_limit():
+    pages_wsgi_app.requests = []
+    s = Session('http://testserver/api', schema=SCHEMA, cache_max_bytes=20000,
+                transport=WSGITransport(pages_wsgi_app))
+    for _ in s.iterate('articles'):
+        pass
+    cache = s.resources_by_resource_identifier
+    assert 0 < len(cache) < 200
+    assert cache.size <= 20000
+
+
+@pytest.mark.parametrize('limit', [{'cache_max_resources': 25},
+                                   {'cache_max_bytes': 8000}])
+def test_bounded_cache_frees_resources(limit):
+    pages_wsgi_app.requests = []
+    s = Session('http://testserver/api', schema=SCHEMA,
+                transport=WSGITransport(pages_wsgi_app), **limit)
+    for _ in s.iterate('articles'):
+        pass
+    gc.collect()
+    alive = [i for i in gc.get_objects()
+             if isinstance(i, ResourceObject) and i.session is s]
+    # Cached documents do not keep evicted resources alive
+    assert 0 < len(alive) == len(s.resources_by_resource_identifier) < 30
+    assert 0 < len(s.documents_by_link) <= 2
+
+
+def test_cache_ttl_by_type(mocker):
+    now = mocker.patch('time.monotonic', return_value=100.0)
+    pages_wsgi_app.requests = []
+    s = Session('http://testserver/api', schema=SCHEMA, cache_ttl={'articles': 60},
+                transport=WSGITransport(pages_wsgi_app))
+    article = s.get('articles').resources[0]
+    s.read({'data': {'type': 'people', 'id': '1', 'attributes': {'name': 'Alice'}}},
+           'http://testserver/api/people/1')
+    now.return_value = 170.0
+    assert ('articles', '10') not in s.resources_by_resource_identifier
+    assert article._invalid
+    assert ('people', '1') in s.resources_by_resource_identifier
+    s.get('articles')
+    assert len(pages_wsgi_app.requests) == 2
+
+
+def test_cache_stats():
+    cache = ObjectCache(max_entries=2, sizeof=len, category=lambda key: key[0],
+                        stats=True)
+    cache['a1'] = 'xx'
+    cache['b1'] = 'yyy'
+    assert cache.lookup('a1') == 'xx'
+    assert cache.lookup('a2') is None
+    cache.record_fetch('a')
+    cache['a2'] = 'z'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['fetches'], stats['evictions'],
+            stats['entries'], stats['bytes']) == (1, 1, 1, 1, 2, 3)
+    assert stats['hit_ratio'] == 0.5
+    assert stats['by_type']['b']['evictions'] == 1
+    assert stats['by_type']['a']['entries'] == 2
+    cache.stats(reset=True)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['entries']) == \
+        (0, 0, 0, 2)
+
+
+def test_lazy_stats_and_index_updates():
+    sizeof = []
+    cache = ObjectCache(sizeof=lambda value: sizeof.append(value) or len(value),
+                        tags=lambda key, value: [value[0]])
+    cache['a'] = 'xx'
+    assert cache.lookup('a') == 'xx'
+    assert not sizeof
+    assert cache.keys_tagged('x') == ['a']
+    cache['a'] = 'zz'
+    assert cache.keys_tagged('x') == []
+    assert cache.keys_tagged('z') == ['a']
+    cache['b'] = 'yyy'
+    assert cache.keys_tagged('y') == ['b']
+    stats = cache.stats()
+    assert (stats['hits'], stats['entries'], stats['bytes']) == (1, 2, 5)
+    cache.lookup('b')
+    assert cache.stats()['hits'] == 2
+    del cache['a']
+    assert cache.keys_tagged('z') == []
+
+
+def test_session_cache_stats():
+    pages_wsgi_app.requests = []
+    s = Session('http://testserver/api', schema=SCHEMA, cache_max_resources=15,
+                cache_collect_stats=True, transport=WSGITransport(pages_wsgi_app))
+    s.get('articles')
+    s.get('articles')
+    s.get('articles', Modifier('page=2'))
+    stats = s.cache_stats(reset=True)
+    documents = stats['documents']['by_type']['articles']
+    assert (documents['hits'], documents['misses'], documents['fetches']) == (1, 2, 2)
+    resources = stats['resources']
+    assert (resources['entries'], resources['evictions']) == (15, 5)
+    assert resources['bytes'] > 15 * 100
+    assert stats['documents']['by_type']['articles']['bytes'] > 10 * 100
+    assert s.cache_stats()['documents']['hits'] == 0
+
+
+def test_session_cache_stats_by_default():
+    pages_wsgi_app.requests = []
+    s = Session('http://testserver/api', schema=SCHEMA,
+                transport=WSGITransport(pages_wsgi_app))
+    s.get('articles')
+    s.get('articles')
+    documents = s.cache_stats()['documents']
+    assert (documents['hits'], documents['misses'], documents['fetches']) == (1, 1, 1)
+    s = Session('http://testserver/api', schema=SCHEMA, cache_max_resources=7,
+                transport=WSGITransport(pages_wsgi_app))
+    s.get('articles')
+    resources = s.cache_stats()['resources']
+    assert (resources['entries'], resources['evictions']) == (7, 3)
+
+
+class Value:
+    def __init__(self, dirty=False):
+        self.dirty = dirty
+
+
+def test_weak_cache():
+    collected = []
+    cache = ObjectCache(weak=True, keep_recent=1, is_evictable=lambda v: not v.dirty,
+                        on_collect=collected.append, stats=True)
+    values = {key: Value(dirty=key == 'd') for key in 'abcd'}
+    cache.update(values)
+    cache.pin('a', values['a'])
+    assert cache['b'] is values['b']
+    del values
+    gc.collect()
+    # a is pinned, b is recently used and d is not evictable
+    assert set(cache) == {'a', 'b', 'd'}
+    assert collected == ['c']
+    cache.unpin('a', cache['a'])
+    cache['e'] = Value()
+    gc.collect()
+    assert set(cache) == {'d', 'e'}
+    assert cache.stats()['collected'] == 3
+
+
+def test_session_weak_cache():
+    pages_wsgi_app.requests = []
+    s = Session('http://testserver/api', schema=SCHEMA, cache_weak=True,
+                cache_collect_stats=True, transport=WSGITransport(pages_wsgi_app))
+    doc = s.get('articles')
+    first, second = doc.resources[:2]
+    first.title = 'Changed'
+    second.delete()
+    third = doc.resources[2]
+    del doc
+    gc.collect()
+    assert set(s.resources_by_resource_identifier) == {
+        ('articles', '10'), ('articles', '11'), ('articles', '12')}
+    assert len(s.documents_by_link) == 0
+    assert s.dirty_resources == {first, second}
+
+    # Dirty resources are held by the session
+    del first, second, third
+    gc.collect()
+    assert set(s.resources_by_resource_identifier) == {
+        ('articles', '10'), ('articles', '11')}
+    s.resources_by_resource_identifier[('articles', '10')].mark_clean()
+    gc.collect()
+    # Resource marked to be deleted is still dirty
+    assert set(s.resources_by_resource_identifier) == {('articles', '11')}
+    assert set(s.resources_by_link) == {'http://testserver/api/articles/11'}
+    assert s.cache_stats()['resources']['collected'] == 9
+
+
+def test_url_prefixes():
+    assert url_prefixes('http://host/api/articles/1?include=author') == [
+        'http://host', 'http://host/api', 'http://host/api/articles',
+        'http://host/api/articles/1']
+    assert url_prefixes('http://host/') == ['http://host']
+
+
+def library_wsgi_app(environ, start_response):
+    library_wsgi_app.requests.append(environ['PATH_INFO'])
+    type_, *id_ = environ['PATH_INFO'].split('/')[2:]
+
+    def resource(type_, id_):
+        name = 'title' if type_ == 'articles' else 'name'
+        return {'type': type_, 'id': id_, 'attributes': {name: f'{type_} {id_}'}}
+
+    content = {'data': resource(type_, id_[0]) if id_ else
+               [resource(type_, str(i)) for i in range(3)]}
+    if environ['QUERY_STRING']:
+        content['included'] = [resource('articles', '1')]
+    start_response('200 OK', [])
+    return [json.dumps(content).encode()]
+
+
+@pytest.fixture
+def library_session():
+    library_wsgi_app.requests = []
+    s = Session('http://testserver/api', schema=SCHEMA,
+                transport=WSGITransport(library_wsgi_app))
+    s.get('articles')
+    s.get('articles', '1')
+    s.get('people')
+    s.get('people', Modifier('include=articles'))
+    return s
+
+
+def test_invalidate_resource_types(library_session):
+    s = library_session
+    article = s.resources_by_resource_identifier[('articles', '1')]
+    s.invalidate(resource_types=['articles'])
+    assert article._invalid
+    assert {type_ for type_, id_ in s.resources_by_resource_identifier} == {'people'}
+    assert set(s.documents_by_link) == {'http://testserver/api/people'}
+    assert not any(r._invalid for r in s.resources_by_resource_identifier.values())
+    s.get('people')
+    assert len(library_wsgi_app.requests) == 4
+
+
+def test_invalidate_resources(library_session):
+    s = library_session
+    s.invalidate(resources=[ResourceTuple('1', 'articles'), ResourceTuple('5', 'people')])
+    assert ('articles', '1') not in s.resources_by_resource_identifier
+    assert len(s.resources_by_resource_identifier) == 5
+    assert 'http://testserver/api/articles/1' not in s.documents_by_link
+    assert 'http://testserver/api/articles' not in s.documents_by_link
+    assert not s._check_documents
+    # Documents that contain the resource are fetched again
+    s.get('articles')
+    s.get('people')
+    assert library_wsgi_app.requests[4:] == ['/api/articles']
+
+
+def test_invalidate_prefix(library_session):
+    s = library_session
+    s.invalidate(prefix='http://testserver/api/people/')
+    assert set(s.documents_by_link) == {'http://testserver/api/articles',
+                                        'http://testserver/api/articles/1'}
+    assert {type_ for type_, id_ in s.resources_by_resource_identifier} == {'articles'}
+    # Document of all articles contains articles/1
+    s.invalidate(prefix='articles/1')
+    assert set(s.documents_by_link) == set()
+    s.invalidate(prefix='http://testserver')
+    assert len(s.documents_by_link) == len(s.resources_by_resource_identifier) == 0
+
+
+def test_invalidate_by_generation(mocker):
+    library_wsgi_app.requests = []
+    s = Session('http://testserver/api', transport=WSGITransport(library_wsgi_app))
+    person = s.read({'data': {
+        'type': 'people', 'id': '9', 'attributes': {'address': {'city': 'Tampere'}},
+        'relationships': {'articles': {'data': [{'type': 'articles', 'id': '1'}]}}}},
+        'http://testserver/api/people/9').resource
+    mark_invalid = mocker.spy(ResourceObject, 'mark_invalid')
+    s.invalidate()
+    assert mark_invalid.call_count == 0
+    assert person._invalid
+    assert person._attributes['address']._invalid
+    assert person._relationships['articles']._invalid
+    with pytest.raises(DocumentInvalid):
+        person._attributes['address'].diff
+    assert not s.get('people', '1').resource._invalid
+
+
+def test_invalidate_keeps_uncached_objects_valid():
+    def app(environ, start_response):
+        start_response('201 Created', [])
+        return [json.dumps({'data': {'type': 'articles', 'id': '5',
+                                     'attributes': {'title': 'New'}}}).encode()]
+    s = Session('http://testserver/api', schema=SCHEMA, transport=WSGITransport(app))
+    article = s.create('articles', title='New')
+    s.invalidate()
+    article.commit()
+    assert article.id == '5'
+    assert s.resources_by_resource_identifier[('articles', '5')] is article
+    # Once committed, the resource is cached and invalidated with the session
+    s.invalidate()
+    assert article._invalid
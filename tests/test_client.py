@@ -1,3 +1,6 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import socketserver
+import threading
 from unittest.mock import Mock
 from urllib.parse import urlparse
 from yarl import URL
@@ -17,6 +20,7 @@ import jsonapi_client.resourceobject
 from jsonapi_client.exceptions import DocumentError, AsyncError
 from jsonapi_client.filter import Filter
 from jsonapi_client.session import Session
+from jsonapi_client.transport import EngineTransport, RequestsTransport, AiohttpTransport
 from unittest import mock
 
 
@@ -756,14 +760,14 @@ async def test_more_relationships_async_fetch(mocked_fetch, api_schema):
 class SuccessfullResponse:
     status_code = 200
     headers = {}
-    content = ''
+    content = b''
     @classmethod
     def json(cls):
         return {}
 
 
 def test_patching(mocker, mocked_fetch, api_schema, mock_update_resource):
-    mock_patch = mocker.patch('requests.request')
+    mock_patch = mocker.patch('requests.Session.request')
     mock_patch.return_value = SuccessfullResponse
 
     s = Session('http://localhost:80801/api', schema=api_schema)
@@ -819,7 +823,7 @@ def test_patching(mocker, mocked_fetch, api_schema, mock_update_resource):
     assert len(mock_patch.mock_calls) == 1
     d1.commit()
     assert len(mock_patch.mock_calls) == 2
-    actual_data = mock_patch.mock_calls[1][2]['json']['data']
+    actual_data = json.loads(mock_patch.mock_calls[1][2]['data'])['data']
     expected_data = {
         'id': 'qvantel-lease1',
         'type': 'leases',
@@ -1570,6 +1574,146 @@ class SuccessfullLeaseResponse:
         }
 
 
+SuccessfullLeaseResponse.content = json.dumps(SuccessfullLeaseResponse.json()).encode()
+
+
+@pytest.mark.asyncio
+async def test_async_connection_pool_configuration_and_stats():
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    async def handler(request):
+        return web.json_response(SuccessfullLeaseResponse.json(),
+                                 content_type='application/vnd.api+json')
+
+    app = web.Application()
+    app.router.add_get('/leases/{id}', handler)
+    async with TestServer(app) as server:
+        s = Session(str(server.make_url('')), enable_async=True, pool_size=5,
+                    pool_size_per_host=2, dns_cache_ttl=30, keepalive_timeout=5)
+        connector = s._transport.client_session.connector
+        assert connector.limit == 5
+        assert connector.limit_per_host == 2
+
+        await s.get('leases', 'qvantel-lease1')
+        s.documents_by_link.clear()
+        await s.get('leases', 'qvantel-lease1')
+        stats = s.pool_stats()
+        assert stats['limit'] == 5
+        assert stats['limit_per_host'] == 2
+        assert stats['in_flight'] == 0
+        assert stats['created'] == 1
+        assert stats['reused'] == 1
+        assert stats['utilisation'] == 0
+        await s.close()
+
+
+class CommentHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        content = json.dumps({'data': {'type': 'comments', 'id': '1',
+                                       'attributes': {'text': 'Hello'}}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_async_engine_with_aiohttp():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CommentHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        s = Session(f'http://127.0.0.1:{server.server_port}/api', async_engine=True)
+        assert isinstance(s._transport, EngineTransport)
+        assert s.get('comments', '1').resource.text == 'Hello'
+        assert s.pool_stats()['created'] == 1
+        s.close()
+    finally:
+        server.shutdown()
+
+    with pytest.raises(AsyncError):
+        Session('http://localhost/api', enable_async=True, async_engine=True)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def test_unix_socket_with_aiohttp(tmp_path):
+    path = str(tmp_path / 'gateway.sock')
+    server = UnixHTTPServer(path, CommentHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        s = Session('http://gateway.example/api', async_engine=True, unix_socket=path)
+        assert s.get('comments', '1').resource.text == 'Hello'
+        s.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        content = json.dumps({'data': {'type': 'echoes', 'id': '1', 'attributes': {
+            'user': self.headers['X-User'],
+            'cookie': self.headers['Cookie']}}}).encode()
+        self.send_response(200)
+        self.send_header('Set-Cookie', f'user={self.headers["X-User"]}; Path=/')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_shared_transport():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), EchoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/api'
+    transport = RequestsTransport(shared=True)
+    try:
+        for user in ('alice', 'bob', 'carol'):
+            s = Session(url, transport=transport,
+                        request_kwargs={'headers': {'X-User': user}})
+            for _ in range(2):
+                echo = s.get('echoes', '1').resource
+                assert echo.user == user
+                assert echo.cookie is None
+                s.invalidate()
+            s.close()
+        # One keep-alive connection served all sessions
+        assert transport.pool_stats()['created'] == 1
+        assert transport.pool_stats()['reused'] == 5
+    finally:
+        transport.close()
+        server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_shared_transport_async():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), EchoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/api'
+    transport = AiohttpTransport(shared=True)
+    try:
+        for user in ('alice', 'bob'):
+            async with Session(url, enable_async=True, transport=transport,
+                               request_kwargs={'headers': {'X-User': user}}) as s:
+                echo = (await s.get('echoes', '1')).resource
+                assert echo.user == user
+                assert echo.cookie is None
+        assert transport.pool_stats()['created'] == 1
+        assert not transport.client_session.closed
+    finally:
+        await transport.close()
+        server.shutdown()
+
+
 @pytest.mark.asyncio
 async def test_set_custom_request_header_async_get_session():
     patcher = mock.patch('aiohttp.ClientSession')
@@ -1594,7 +1738,7 @@ async def test_set_custom_request_header_async_get_session():
 
 
 def test_set_custom_request_header_get_session():
-    patcher = mock.patch('requests.get')
+    patcher = mock.patch('requests.Session.get')
     get_mock = patcher.start()
     request_kwargs = {'headers': {'Foo': 'Bar', 'X-Test': 'test'}}
     s = Session('http://localhost', schema=leases, request_kwargs=request_kwargs)
@@ -1610,7 +1754,7 @@ def test_set_custom_request_header_get_session():
 
 
 def test_set_custom_request_header_patch_session():
-    patcher = mock.patch('requests.get')
+    patcher = mock.patch('requests.Session.get')
     get_mock = patcher.start()
     request_kwargs = {'headers': {'Foo': 'Bar', 'X-Test': 'test'}}
     s = Session('http://localhost', schema=leases, request_kwargs=request_kwargs)
@@ -1618,8 +1762,9 @@ def test_set_custom_request_header_patch_session():
     lease = s.get('leases', 1)
     patcher.stop()
 
-    patcher = mock.patch('requests.request')
+    patcher = mock.patch('requests.Session.request')
     request_mock = patcher.start()
+    request_mock.return_value.content = b''
     lease.resource.valid_for.new_field = "updated"
     with pytest.raises(DocumentError):
         s.commit()
@@ -1632,6 +1777,25 @@ def test_set_custom_request_header_patch_session():
     patcher.stop()
 
 
+def test_sync_requests_use_connection_pool(mocker):
+    s = Session('http://localhost', schema=leases, pool_size_per_host=4)
+    requests_session = s._transport.requests_session
+    assert requests_session.get_adapter('http://localhost')._pool_maxsize == 4
+    assert requests_session.get_adapter('https://localhost')._pool_maxsize == 4
+
+    get_mock = mocker.patch.object(requests_session, 'get',
+                                   return_value=SuccessfullLeaseResponse)
+    close_mock = mocker.patch.object(requests_session, 'close')
+    s.get('leases', 1)
+    s.documents_by_link.clear()
+    s.get('leases', 1)
+    assert get_mock.call_count == 2
+    assert s._transport.requests_session is requests_session
+
+    s.close()
+    close_mock.assert_called_once_with()
+
+
 @pytest.mark.asyncio
 async def test_posting_async_with_custom_header(loop, session):
     response = ClientResponse('post', URL('http://localhost/api/leases'),
@@ -1685,7 +1849,7 @@ def test_error_handling_get():
     response._content = json.dumps({'errors': [{'title': 'Resource not found'}]}).encode('UTF-8')
     response.status_code = 404
 
-    patcher = mock.patch('requests.get')
+    patcher = mock.patch('requests.Session.get')
     client_mock = patcher.start()
     s = Session('http://localhost', schema=leases)
     client_mock.return_value = response
@@ -1704,7 +1868,7 @@ def test_error_handling_post():
     response._content = json.dumps({'errors': [{'title': 'Internal server error'}]}).encode('UTF-8')
     response.status_code = 500
 
-    patcher = mock.patch('requests.request')
+    patcher = mock.patch('requests.Session.request')
     client_mock = patcher.start()
     s = Session('http://localhost', schema=leases)
     client_mock.return_value = response
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from jsonapi_client.codec import JsonCodec, get_codec, CODECS
+from jsonapi_client.session import Session
+
+
+DOCUMENT = {'data': [{'type': 'articles', 'id': '1',
+                      'attributes': {'title': 'Ünïcödé', 'nested': {'count': 1}}}]}
+
+
+def installed_codecs():
+    names = []
+    for name, codec_class in CODECS.items():
+        try:
+            codec_class()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+@pytest.mark.parametrize('name', installed_codecs())
+def test_codec_roundtrip(name):
+    codec = get_codec(name)
+    assert codec.name == name
+    encoded = codec.dumps(DOCUMENT)
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == DOCUMENT
+    assert codec.loads(encoded) == DOCUMENT
+    assert codec.loads(encoded.decode()) == DOCUMENT
+    with pytest.raises(ValueError):
+        codec.loads(b'{invalid')
+
+
+def test_get_codec():
+    assert get_codec('auto').name == installed_codecs()[0]
+    codec = JsonCodec()
+    assert get_codec(codec) is codec
+    with pytest.raises(ValueError):
+        get_codec('pickle')
+
+
+@pytest.mark.parametrize('name', installed_codecs())
+def test_session_read_encoded(name):
+    s = Session('http://localhost/api', json_codec=name)
+    assert s.codec.name == name
+    doc = s.read(json.dumps(DOCUMENT).encode(), 'http://localhost/api/articles')
+    assert doc.resource.title == 'Ünïcödé'
+    assert doc.resource.nested.count == 1
+    assert s.documents_by_link['http://localhost/api/articles'] is doc
@@ -0,0 +1,42 @@
+import json
+import zlib
+
+import pytest
+
+from jsonapi_client.compression import (Decompressor, available_encodings, compress,
+                                        decompress_chunks)
+
+
+DATA = json.dumps({'data': [{'type': 'articles', 'id': str(i),
+                             'attributes': {'title': 'Same title again'}}
+                            for i in range(1000)]}).encode()
+
+
+def chunked(data, size=100):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('encoding', available_encodings())
+def test_streaming_roundtrip(encoding):
+    compressed = compress(DATA, encoding)
+    assert len(compressed) < len(DATA) / 10
+    assert decompress_chunks(chunked(compressed), encoding) == DATA
+
+
+def test_raw_deflate():
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    compressed = compressor.compress(DATA) + compressor.flush()
+    assert decompress_chunks(chunked(compressed), 'deflate') == DATA
+
+
+def test_multiple_encodings():
+    compressed = compress(compress(DATA, 'deflate'), 'gzip')
+    assert decompress_chunks(chunked(compressed), 'deflate, gzip') == DATA
+
+
+def test_identity_and_unsupported():
+    assert Decompressor('identity').decompress(b'abc') == b'abc'
+    with pytest.raises(ValueError):
+        Decompressor('compress')
+    with pytest.raises(ValueError):
+        compress(DATA, 'compress')
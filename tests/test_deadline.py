@@ -0,0 +1,110 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from jsonapi_client.deadline import current_deadline
+from jsonapi_client.exceptions import DeadlineExceeded
+from jsonapi_client.session import Session
+from jsonapi_client.transport import WSGITransport, ASGITransport, AsyncStreamingResponse
+
+
+def page(number: int) -> dict:
+    return {'data': [{'type': 'articles', 'id': str(number)}],
+            'links': {'next': f'/api/articles?page={number + 1}'}}
+
+
+def endless_wsgi_app(environ, start_response):
+    time.sleep(0.02)
+    number = int(environ['QUERY_STRING'].partition('=')[2] or 1)
+    start_response('200 OK', [])
+    return [json.dumps(page(number)).encode()]
+
+
+def test_deadline_spans_operation(mocker):
+    transport = WSGITransport(endless_wsgi_app)
+    s = Session('http://testserver/api', transport=transport,
+                request_kwargs={'timeout': 10})
+    spy = mocker.spy(transport, 'request')
+    ids = []
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        with s.deadline(0.1):
+            for resource in s.iterate('articles'):
+                ids.append(resource.id)
+    assert time.monotonic() - started < 0.3
+    assert 2 <= len(ids) <= 6
+    timeouts = [call[1]['timeout'] for call in spy.call_args_list]
+    assert all(timeout <= 0.1 for timeout in timeouts)
+    assert timeouts == sorted(timeouts, reverse=True)
+
+    # Without deadline, configured timeout is used as is
+    s.get('articles', '1')
+    assert spy.call_args[1]['timeout'] == 10
+
+
+def test_nested_deadline():
+    s = Session('http://testserver/api', transport=WSGITransport(endless_wsgi_app))
+    assert current_deadline() is None
+    with s.deadline(10) as outer:
+        with s.deadline(20) as inner:
+            assert inner.expires_at == outer.expires_at
+        with s.deadline(1) as inner:
+            assert inner.expires_at < outer.expires_at
+            assert current_deadline() == inner.expires_at
+        assert current_deadline() == outer.expires_at
+    assert current_deadline() is None
+
+
+@pytest.mark.asyncio
+async def test_deadline_async():
+    async def app(scope, receive, send):
+        await asyncio.sleep(0.05 if scope['path'] == '/api/articles/1' else 1)
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body',
+                    'body': b'{"data": {"type": "articles", "id": "1"}}'})
+
+    s = Session('http://testserver/api', enable_async=True, transport=ASGITransport(app))
+    started = time.monotonic()
+    async with s.deadline(0.2):
+        await s.get('articles', '1')
+        with pytest.raises(DeadlineExceeded):
+            await s.get('articles', '2')
+    assert time.monotonic() - started < 0.5
+    await s.close()
+
+
+class StalledBodyTransport(ASGITransport):
+    async def stream(self, http_method, url, headers=None, data=None, **kwargs):
+        async def chunks():
+            yield b'{"data": [{"type": "articles", "id": "1"}'
+            await asyncio.sleep(10)
+
+        return AsyncStreamingResponse(200, {}, chunks())
+
+
+@pytest.mark.asyncio
+async def test_deadline_stalled_stream_async():
+    s = Session('http://testserver/api', enable_async=True,
+                transport=StalledBodyTransport(None))
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        async with s.deadline(0.1):
+            async for _ in s.iterate('articles', stream=True):
+                pass
+    assert time.monotonic() - started < 0.5
+    await s.close()
+
+
+@pytest.mark.asyncio
+async def test_transport_timeout_within_deadline_async():
+    async def app(scope, receive, send):
+        raise asyncio.TimeoutError()
+
+    s = Session('http://testserver/api', enable_async=True, transport=ASGITransport(app))
+    with pytest.raises(asyncio.TimeoutError) as excinfo:
+        async with s.deadline(10):
+            await s.get('articles', '1')
+    assert not isinstance(excinfo.value, DeadlineExceeded)
+    await s.close()
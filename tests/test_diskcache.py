@@ -0,0 +1,131 @@
+import json
+import multiprocessing
+
+import pytest
+
+from jsonapi_client.diskcache import DiskCache, canonical_url
+from jsonapi_client.session import Session
+from jsonapi_client.transport import WSGITransport, ASGITransport
+
+
+ARTICLES = {'data': [{'type': 'articles', 'id': '1', 'attributes': {'title': 'First'}}]}
+
+
+def test_canonical_url():
+    assert (canonical_url('HTTP://Example.com:80/api/articles?b=2&a=1#top') ==
+            'http://example.com/api/articles?a=1&b=2')
+    assert canonical_url('https://example.com:8443') == 'https://example.com:8443/'
+
+
+def test_freshness_and_validators(tmp_path):
+    cache = DiskCache(str(tmp_path / 'cache.db'), default_ttl=60)
+    cache.set('http://example.com/a', b'a', {'ETag': '"1"'})
+    cache.set('http://example.com/b', b'b', {'Cache-Control': 'max-age=0',
+                                             'Last-Modified': 'yesterday'})
+    cache.set('http://example.com/c', b'c', {'Cache-Control': 'no-store'})
+
+    a = cache.get('http://EXAMPLE.com/a')
+    assert a.content == b'a'
+    assert a.is_fresh()
+    assert a.validators == {'If-None-Match': '"1"'}
+    b = cache.get('http://example.com/b')
+    assert not b.is_fresh()
+    assert b.validators == {'If-Modified-Since': 'yesterday'}
+    assert cache.get('http://example.com/c') is None
+
+    cache.refresh('http://example.com/b', {'Cache-Control': 'max-age=60', 'ETag': '"2"'})
+    b = cache.get('http://example.com/b')
+    assert b.is_fresh()
+    assert b.validators == {'If-None-Match': '"2"', 'If-Modified-Since': 'yesterday'}
+
+
+def test_eviction(tmp_path):
+    cache = DiskCache(str(tmp_path / 'cache.db'), max_size=350)
+    content = bytes(range(100))  # does not compress, ~110 bytes stored
+    for i in range(3):
+        cache.set(f'http://example.com/{i}', content, {})
+    cache.get('http://example.com/0')
+    cache.set('http://example.com/3', content, {})
+    assert len(cache) == 3
+    assert cache.size <= 350
+    assert cache.get('http://example.com/0') is not None
+    assert cache.get('http://example.com/1') is None
+    assert cache.get('http://example.com/3') is not None
+
+
+def _write_entries(path, worker):
+    cache = DiskCache(path)
+    for i in range(20):
+        cache.set(f'http://example.com/{worker}/{i}', b'x' * 1000, {})
+        assert cache.get(f'http://example.com/{worker}/{i}').content == b'x' * 1000
+    cache.close()
+
+
+def test_concurrent_processes(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    DiskCache(path).close()
+    processes = [multiprocessing.Process(target=_write_entries, args=(path, i))
+                 for i in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert [p.exitcode for p in processes] == [0] * 4
+    assert len(DiskCache(path)) == 80
+
+
+def counting_wsgi_app(environ, start_response):
+    counting_wsgi_app.requests.append(environ)
+    headers = [('ETag', '"1"'), ('Cache-Control', counting_wsgi_app.cache_control)]
+    if environ.get('HTTP_IF_NONE_MATCH') == '"1"':
+        start_response('304 Not Modified', headers)
+        return []
+    start_response('200 OK', headers)
+    return [json.dumps(ARTICLES).encode()]
+
+
+def test_session_disk_cache(tmp_path):
+    counting_wsgi_app.requests = []
+    counting_wsgi_app.cache_control = 'max-age=60'
+    path = str(tmp_path / 'cache.db')
+    s = Session('http://testserver/api', disk_cache=DiskCache(path),
+                transport=WSGITransport(counting_wsgi_app))
+    assert s.get('articles').resource.title == 'First'
+    assert len(counting_wsgi_app.requests) == 1
+    s.close()
+
+    # New session (as after restart) is served from disk
+    s = Session('http://testserver/api', disk_cache=DiskCache(path),
+                transport=WSGITransport(counting_wsgi_app))
+    assert s.get('articles').resource.title == 'First'
+    assert len(counting_wsgi_app.requests) == 1
+    s.close()
+
+    # Stale entries are revalidated
+    counting_wsgi_app.cache_control = 'no-cache'
+    s = Session('http://testserver/api', disk_cache=DiskCache(path),
+                transport=WSGITransport(counting_wsgi_app))
+    s.get('articles', '1')
+    s.invalidate()
+    assert s.get('articles', '1').resource.title == 'First'
+    assert len(counting_wsgi_app.requests) == 3
+    assert counting_wsgi_app.requests[-1]['HTTP_IF_NONE_MATCH'] == '"1"'
+
+
+async def asgi_app(scope, receive, send):
+    asgi_app.requests += 1
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': json.dumps(ARTICLES).encode()})
+
+
+@pytest.mark.asyncio
+async def test_session_disk_cache_async(tmp_path):
+    asgi_app.requests = 0
+    cache = DiskCache(str(tmp_path / 'cache.db'))
+    for _ in range(2):
+        s = Session('http://testserver/api', enable_async=True, disk_cache=cache,
+                    transport=ASGITransport(asgi_app))
+        doc = await s.get('articles')
+        assert doc.resource.title == 'First'
+        await s.close()
+    assert asgi_app.requests == 1
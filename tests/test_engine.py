@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from jsonapi_client.session import Session
+from jsonapi_client.transport import EngineTransport, ASGITransport
+
+
+SCHEMA = {
+    'articles': {'properties': {
+        'title': {'type': 'string'},
+        'comments': {'relation': 'to-many', 'resource': ['comments']}}},
+    'comments': {'properties': {'text': {'type': 'string'}}},
+}
+
+
+def article(id_: str) -> dict:
+    return {'type': 'articles', 'id': id_, 'attributes': {'title': f'Article {id_}'},
+            'relationships': {'comments': {'data': [
+                {'type': 'comments', 'id': str(i)} for i in range(5)]}}}
+
+
+class App:
+    """
+    ASGI JSON API application that records concurrency and request order.
+    """
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+
+    async def __call__(self, scope, receive, send):
+        body = (await receive()).get('body', b'')
+        path = scope['path'] + ('?' + scope['query_string'].decode()
+                                if scope['query_string'] else '')
+        self.requests.append((scope['method'], path))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        _, _, type_, *rest = scope['path'].split('/')
+        if scope['method'] == 'PATCH':
+            content = json.loads(body)
+        elif type_ == 'comments':
+            content = {'data': {'type': 'comments', 'id': rest[0],
+                                'attributes': {'text': f'Comment {rest[0]}'}}}
+        elif rest:
+            content = {'data': article(rest[0])}
+        else:
+            page = int(scope['query_string'].decode().partition('=')[2] or 1)
+            content = {'data': [article(str(page * 10 + i)) for i in range(2)]}
+            if page < 3:
+                content['links'] = {'next': f'/api/articles?page={page + 1}'}
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': json.dumps(content).encode()})
+
+
+@pytest.fixture
+def engine_session():
+    app = App()
+    s = Session('http://testserver/api', schema=SCHEMA,
+                transport=EngineTransport(ASGITransport(app)))
+    yield s, app
+    s.close()
+
+
+def test_relationship_fan_out(engine_session):
+    s, app = engine_session
+    article = s.get('articles', '1').resource
+    started = time.monotonic()
+    comments = article.relationships.comments.fetch()
+    assert time.monotonic() - started < 0.2
+    assert [c.text for c in comments] == [f'Comment {i}' for i in range(5)]
+    assert app.max_in_flight == 5
+
+
+def test_pagination_prefetch(engine_session):
+    s, app = engine_session
+    ids = []
+    for res in s.iterate('articles'):
+        ids.append(res.id)
+        if res.id == '10':
+            time.sleep(0.1)
+            # Next page was requested while first page was being consumed
+            assert ('GET', '/api/articles?page=2') in app.requests
+    assert ids == ['10', '11', '20', '21', '30', '31']
+
+
+def test_commit_fan_out(engine_session):
+    s, app = engine_session
+    articles = [s.get('articles', str(i)).resource for i in range(4)]
+    app.max_in_flight = 0
+    for article in articles:
+        article.title = 'Changed'
+    started = time.monotonic()
+    s.commit()
+    assert time.monotonic() - started < 0.15
+    assert app.max_in_flight == 4
+    assert not s.dirty_resources
+
+
+def test_commit_fan_out_cache_consistency(mocker):
+    threads = set()
+    read = Session.read
+
+    def recording_read(self, *args, **kwargs):
+        threads.add(threading.current_thread())
+        return read(self, *args, **kwargs)
+
+    mocker.patch.object(Session, 'read', recording_read)
+    app = App()
+    s = Session('http://testserver/api', schema=SCHEMA, cache_max_documents=3,
+                transport=EngineTransport(ASGITransport(app)))
+    articles = [s.read({'data': article(str(i))},
+                       f'http://testserver/api/articles/{i}').resource
+                for i in range(100)]
+    for article_ in articles:
+        article_.title = 'Changed'
+    threads.clear()
+    s.commit()
+    # Results of concurrent requests are applied in the calling thread
+    assert threads == {threading.current_thread()}
+    assert not s.dirty_resources
+    stats = s.cache_stats()
+    assert stats['documents']['entries'] == len(s.documents_by_link) <= 3
+    assert stats['resources']['entries'] == len(s.resources_by_resource_identifier)
+    s.close()
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from jsonapi_client.exceptions import DocumentError
+from jsonapi_client.session import Session
+from jsonapi_client.transport import WSGITransport, ASGITransport
+
+
+def article(path: str) -> dict:
+    return {'data': {'type': 'articles', 'id': path.rsplit('/', 1)[1],
+                     'attributes': {'title': path}}}
+
+
+def slow_wsgi_app(environ, start_response):
+    with slow_wsgi_app.lock:
+        slow_wsgi_app.requests.append(environ['PATH_INFO'])
+    time.sleep(0.05)
+    if environ['PATH_INFO'].endswith('/missing'):
+        start_response('404 Not Found', [])
+        return [b'{"errors": [{"title": "Not found"}]}']
+    start_response('200 OK', [])
+    return [json.dumps(article(environ['PATH_INFO'])).encode()]
+
+
+slow_wsgi_app.lock = threading.Lock()
+
+
+def test_fetch_many():
+    slow_wsgi_app.requests = []
+    s = Session('http://testserver/api', transport=WSGITransport(slow_wsgi_app))
+    urls = [f'http://testserver/api/articles/{i}' for i in range(8)]
+    started = time.monotonic()
+    docs = s.fetch_many(urls + urls[:2], max_workers=8)
+    assert time.monotonic() - started < 0.3
+    assert [doc.resource.id for doc in docs] == [str(i) for i in range(8)] + ['0', '1']
+    assert docs[8] is docs[0]
+    assert sorted(slow_wsgi_app.requests) == sorted(f'/api/articles/{i}' for i in range(8))
+    assert s.documents_by_link[urls[3]] is docs[3]
+    assert s.resources_by_resource_identifier['articles', '3'] is docs[3].resource
+
+    # Cached documents are not fetched again
+    assert s.fetch_many(urls[:3]) == docs[:3]
+    assert len(slow_wsgi_app.requests) == 8
+
+    with pytest.raises(DocumentError):
+        s.fetch_many(['http://testserver/api/articles/10',
+                      'http://testserver/api/articles/missing',
+                      'http://testserver/api/articles/11'])
+    assert 'http://testserver/api/articles/10' in s.documents_by_link
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_async():
+    async def app(scope, receive, send):
+        await asyncio.sleep(0.05)
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body',
+                    'body': json.dumps(article(scope['path'])).encode()})
+
+    s = Session('http://testserver/api', enable_async=True, transport=ASGITransport(app))
+    urls = [f'http://testserver/api/articles/{i}' for i in range(8)]
+    started = time.monotonic()
+    docs = await s.fetch_many(urls)
+    assert time.monotonic() - started < 0.3
+    assert [doc.resource.id for doc in docs] == [str(i) for i in range(8)]
+    await s.close()
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from jsonapi_client.hedging import HedgingPolicy
+from jsonapi_client.session import Session
+from jsonapi_client.transport import WSGITransport, ASGITransport
+
+
+ARTICLE = {'data': {'type': 'articles', 'id': '1', 'attributes': {'title': 'First'}}}
+
+
+def trained_policy(**kwargs) -> HedgingPolicy:
+    policy = HedgingPolicy(min_samples=10, **kwargs)
+    for _ in range(10):
+        policy.record(0.01)
+    return policy
+
+
+def test_delay():
+    policy = HedgingPolicy(percentile=90, min_samples=10)
+    assert policy.delay() is None
+    for i in range(1, 101):
+        policy.record(i / 100)
+    assert policy.delay() == 0.91
+    assert HedgingPolicy(min_delay=2, min_samples=0).delay() is None
+    policy.min_delay = 2
+    assert policy.delay() == 2
+
+
+def slow_first_wsgi_app(environ, start_response):
+    slow_first_wsgi_app.requests += 1
+    slow_first_wsgi_app.threads.append(threading.current_thread())
+    if slow_first_wsgi_app.requests == 1:
+        time.sleep(0.5)
+        if slow_first_wsgi_app.fail:
+            raise ConnectionError('Connection reset')
+    start_response('200 OK', [])
+    return [json.dumps(ARTICLE).encode()]
+
+
+def reset_app(fail=False):
+    slow_first_wsgi_app.requests = 0
+    slow_first_wsgi_app.threads = []
+    slow_first_wsgi_app.fail = fail
+
+
+@pytest.mark.parametrize('fail', [False, True])
+def test_hedged_get(fail):
+    reset_app(fail)
+    policy = trained_policy(budget=1)
+    s = Session('http://testserver/api', hedging=policy,
+                transport=WSGITransport(slow_first_wsgi_app))
+    assert s.get('articles', '1').resource.title == 'First'
+    # Original request is sent from the calling thread, the hedge from the pool
+    assert slow_first_wsgi_app.threads[0] is threading.current_thread()
+    assert slow_first_wsgi_app.threads[1] is not threading.current_thread()
+    stats = policy.stats()
+    assert stats['requests'] == 1
+    assert stats['hedges'] == 1
+    assert stats['hedge_wins'] == 1
+    policy.close()
+
+
+def test_concurrent_originals_not_limited_by_pool():
+    in_flight = []
+
+    def app(environ, start_response):
+        in_flight.append(1)
+        app.max_in_flight = max(app.max_in_flight, len(in_flight))
+        time.sleep(0.2)
+        in_flight.pop()
+        start_response('200 OK', [])
+        return [json.dumps(ARTICLE).encode()]
+    app.max_in_flight = 0
+
+    policy = trained_policy(budget=0, max_workers=1)
+    s = Session('http://testserver/api', hedging=policy, transport=WSGITransport(app))
+    threads = [threading.Thread(target=s.fetch_document_by_url,
+                                args=(f'http://testserver/api/articles/{i}',))
+               for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert app.max_in_flight == 4
+    policy.close()
+
+
+def test_hedging_budget():
+    reset_app()
+    policy = trained_policy(budget=0.5)
+    s = Session('http://testserver/api', hedging=policy,
+                transport=WSGITransport(slow_first_wsgi_app))
+    s.get('articles', '1')
+    assert policy.stats()['hedges'] == 0
+    assert policy.stats()['budget_exhausted'] == 1
+    policy.close()
+
+
+@pytest.mark.asyncio
+async def test_hedged_get_async():
+    cancelled = []
+
+    async def app(scope, receive, send):
+        app.requests += 1
+        if app.requests == 1:
+            try:
+                await asyncio.sleep(0.5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': json.dumps(ARTICLE).encode()})
+    app.requests = 0
+
+    policy = trained_policy(budget=1)
+    s = Session('http://testserver/api', enable_async=True, hedging=policy,
+                transport=ASGITransport(app))
+    started = time.monotonic()
+    doc = await s.get('articles', '1')
+    assert doc.resource.title == 'First'
+    assert time.monotonic() - started < 0.4
+    assert policy.stats()['hedge_wins'] == 1
+    await asyncio.sleep(0)
+    assert cancelled == [True]
+    await s.close()
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import time
+from email.utils import formatdate
+
+import pytest
+
+from jsonapi_client.limiter import AdaptiveLimiter, parse_retry_after
+from jsonapi_client.session import Session
+from jsonapi_client.transport import WSGITransport, ASGITransport
+
+
+SCHEMA = {'articles': {'properties': {'title': {'type': 'string'}}}}
+
+
+def test_parse_retry_after():
+    now = time.time()
+    assert parse_retry_after('120') == 120
+    assert parse_retry_after(formatdate(now + 30, usegmt=True), now) == pytest.approx(30, abs=1)
+    assert parse_retry_after(formatdate(now - 30, usegmt=True), now) == 0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+
+def test_aimd():
+    limiter = AdaptiveLimiter(initial_limit=4, max_limit=5, max_limit_per_host=4)
+    permits = [limiter.acquire('http://a/x') for _ in range(4)]
+    assert limiter.stats()['hosts']['a']['in_flight'] == 4
+
+    for permit in permits:
+        permit.release(200)
+    assert limiter.stats()['limit'] == 4  # +1 per window of successful responses
+    for _ in range(4):
+        limiter.acquire('http://a/x').release(200)
+    assert limiter.stats()['limit'] == 5
+    assert limiter.stats()['hosts']['a']['limit'] == 4
+
+    # Concurrent congestion signals decrease limit only once
+    permits = [limiter.acquire('http://a/x') for _ in range(2)]
+    permits[0].release(503)
+    permits[1].release(429)
+    stats = limiter.stats()
+    assert stats['hosts']['a']['limit'] == 2
+    assert stats['limit'] == 2
+    assert stats['throttled'] == 2
+
+    limiter = AdaptiveLimiter(latency_threshold=0)
+    limiter.acquire('http://a/x').release(200)
+    assert limiter.stats()['limit'] == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    limiter = AdaptiveLimiter(initial_limit=3, max_limit=3)
+    in_flight = []
+
+    async def app(scope, receive, send):
+        in_flight.append(1)
+        app.max_in_flight = max(getattr(app, 'max_in_flight', 0), len(in_flight))
+        await asyncio.sleep(0.005)
+        in_flight.pop()
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b'{"data": []}'})
+
+    s = Session('http://testserver/api', enable_async=True, limiter=limiter,
+                transport=ASGITransport(app))
+    await asyncio.gather(*[s.get('articles', str(i)) for i in range(20)])
+    assert app.max_in_flight == 3
+    assert limiter.stats()['in_flight'] == 0
+    await s.close()
+
+
+def throttling_wsgi_app(environ, start_response):
+    throttling_wsgi_app.requests.append(environ['REQUEST_METHOD'])
+    if len(throttling_wsgi_app.requests) % 2:
+        start_response('429 Too Many Requests', [('Retry-After', '0')])
+        return [b'{"errors": [{"title": "Slow down"}]}']
+    body = environ['wsgi.input'].read(int(environ.get('CONTENT_LENGTH') or 0))
+    if body:
+        start_response('201 Created', [])
+        data = json.loads(body)['data']
+        return [json.dumps({'data': {**data, 'id': '1'}}).encode()]
+    start_response('200 OK', [])
+    return [b'{"data": []}']
+
+
+def test_retry_after():
+    throttling_wsgi_app.requests = []
+    limiter = AdaptiveLimiter()
+    s = Session('http://testserver/api', schema=SCHEMA, limiter=limiter,
+                transport=WSGITransport(throttling_wsgi_app))
+    assert s.get('articles').resources == []
+    assert s.create_and_commit('articles', title='Hello').id == '1'
+    assert throttling_wsgi_app.requests == ['GET', 'GET', 'POST', 'POST']
+    assert limiter.stats()['throttled'] == 2
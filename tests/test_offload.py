@@ -0,0 +1,63 @@
+import json
+import threading
+
+import pytest
+
+from jsonapi_client.exceptions import DocumentError
+from jsonapi_client.session import Session
+from jsonapi_client.transport import ASGITransport
+
+
+SCHEMA = {'articles': {'properties': {
+    'title': {'type': 'string'},
+    'author': {'relation': 'to-one', 'resource': ['people']}}},
+    'people': {'properties': {'name': {'type': 'string'}}}}
+
+
+def articles(count: int) -> dict:
+    return {
+        'data': [{'type': 'articles', 'id': str(i), 'attributes': {'title': f'Article {i}'},
+                  'relationships': {'author': {'data': {'type': 'people', 'id': '1'}}}}
+                 for i in range(count)],
+        'included': [{'type': 'people', 'id': '1', 'attributes': {'name': 'Alice'}}],
+    }
+
+
+async def app(scope, receive, send):
+    if scope['path'] == '/api/articles/error':
+        status, content = 404, {'errors': [{'title': 'Not found ' + 'x' * 1000}]}
+    else:
+        status, content = 200, articles(int(scope['path'].rpartition('/')[2]))
+    await send({'type': 'http.response.start', 'status': status, 'headers': []})
+    await send({'type': 'http.response.body', 'body': json.dumps(content).encode()})
+
+
+@pytest.mark.asyncio
+async def test_offload_large_documents(monkeypatch):
+    threads = []
+    build_resources = Session._build_resources
+
+    def recording_build_resources(self, content):
+        threads.append(threading.get_ident())
+        return build_resources(self, content)
+
+    monkeypatch.setattr(Session, '_build_resources', recording_build_resources)
+    s = Session('http://testserver/api', enable_async=True, schema=SCHEMA,
+                offload_threshold=2000, transport=ASGITransport(app))
+
+    doc = await s.fetch_document_by_url_async('http://testserver/api/articles/50')
+    assert [r.id for r in doc.resources] == [str(i) for i in range(50)]
+    assert threads and threads[0] != threading.get_ident()
+    assert s.documents_by_link['http://testserver/api/articles/50'] is doc
+    assert s.resources_by_resource_identifier[('articles', '7')] is doc.resources[7]
+    author = s.resources_by_resource_identifier[('people', '1')]
+    assert author is doc.included[0]
+    assert author.name == 'Alice'
+
+    # Small documents are read in the event loop
+    await s.fetch_document_by_url_async('http://testserver/api/articles/1')
+    assert len(threads) == 1
+
+    with pytest.raises(DocumentError):
+        await s.fetch_document_by_url_async('http://testserver/api/articles/error')
+    await s.close()
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+from jsonapi_client.common import HttpMethod
+from jsonapi_client.exceptions import DocumentError
+from jsonapi_client.retry import RetryPolicy
+from jsonapi_client.session import Session
+from jsonapi_client.transport import WSGITransport, ASGITransport
+
+
+SCHEMA = {'articles': {'properties': {'title': {'type': 'string'}}}}
+
+
+def test_backoff_delay():
+    policy = RetryPolicy(backoff=0.1, max_backoff=0.3)
+    for retry, upper in [(1, 0.1), (2, 0.2), (3, 0.3), (10, 0.3)]:
+        delays = [policy.backoff_delay(retry) for _ in range(50)]
+        assert all(0 <= delay <= upper for delay in delays)
+        assert len(set(delays)) > 1  # jitter
+
+
+def test_budget():
+    policy = RetryPolicy(budget=0.5, min_retries=0)
+    for _ in range(4):
+        policy._start()
+    assert policy._try_retry('status 503')
+    assert policy._try_retry('status 503')
+    assert not policy._try_retry('status 503')
+    stats = policy.stats()
+    assert stats['retries'] == 2
+    assert stats['budget_exhausted'] == 1
+    assert stats['reasons'] == {'status 503': 2}
+
+
+class FlakyApp:
+    """
+    WSGI application where every second request fails, alternating between a
+    502 response and a dropped connection.
+    """
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        self.requests.append(method)
+        if len(self.requests) % 4 == 1:
+            start_response('502 Bad Gateway', [])
+            return [b'{"errors": [{"title": "Bad gateway"}]}']
+        if len(self.requests) % 4 == 3:
+            raise ConnectionResetError('Connection reset by peer')
+        if method == 'POST':
+            start_response('201 Created', [])
+            data = json.loads(environ['wsgi.input'].read(int(environ['CONTENT_LENGTH'])))
+            return [json.dumps({'data': {**data['data'], 'id': '1'}}).encode()]
+        page = int(environ['QUERY_STRING'].partition('=')[2] or 1)
+        content = {'data': [{'type': 'articles', 'id': str(page)}]}
+        if page < 5:
+            content['links'] = {'next': f'/api/articles?page={page + 1}'}
+        start_response('200 OK', [])
+        return [json.dumps(content).encode()]
+
+
+def test_iterate_survives_transient_failures():
+    app = FlakyApp()
+    policy = RetryPolicy(backoff=0.001)
+    s = Session('http://testserver/api', retry=policy, transport=WSGITransport(app))
+    assert [r.id for r in s.iterate('articles')] == ['1', '2', '3', '4', '5']
+    stats = policy.stats()
+    assert stats['requests'] == 5
+    assert stats['retries'] == 5
+    assert stats['recovered'] == 5
+    assert stats['reasons'] == {'status 502': 3, 'ConnectionResetError': 2}
+
+    # Without retries the first failure is raised
+    s = Session('http://testserver/api', transport=WSGITransport(FlakyApp()))
+    with pytest.raises(DocumentError):
+        list(s.iterate('articles'))
+
+
+def test_non_idempotent_opt_in():
+    app = FlakyApp()
+    s = Session('http://testserver/api', schema=SCHEMA, transport=WSGITransport(app),
+                retry=RetryPolicy(backoff=0.001))
+    with pytest.raises(DocumentError):
+        s.create_and_commit('articles', title='Hello')
+    assert app.requests == ['POST']
+
+    app = FlakyApp()
+    policy = RetryPolicy(backoff=0.001,
+                         methods=[HttpMethod.GET, HttpMethod.POST, HttpMethod.PATCH])
+    s = Session('http://testserver/api', schema=SCHEMA, transport=WSGITransport(app),
+                retry=policy)
+    assert s.create_and_commit('articles', title='Hello').id == '1'
+    assert app.requests == ['POST', 'POST']
+
+
+def test_give_up():
+    def failing_app(environ, start_response):
+        start_response('503 Service Unavailable', [])
+        return [b'{"errors": [{"title": "Down"}]}']
+
+    policy = RetryPolicy(max_attempts=3, backoff=0.001)
+    s = Session('http://testserver/api', retry=policy,
+                transport=WSGITransport(failing_app))
+    with pytest.raises(DocumentError):
+        s.get('articles')
+    assert policy.stats()['retries'] == 2
+    assert policy.stats()['gave_up'] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_async():
+    requests = []
+
+    async def app(scope, receive, send):
+        requests.append(scope['path'])
+        status = 504 if len(requests) == 1 else 200
+        await send({'type': 'http.response.start', 'status': status, 'headers': []})
+        await send({'type': 'http.response.body',
+                    'body': b'{"data": {"type": "articles", "id": "1"}}'})
+
+    policy = RetryPolicy(backoff=0.001)
+    s = Session('http://testserver/api', enable_async=True, retry=policy,
+                transport=ASGITransport(app))
+    doc = await s.get('articles', '1')
+    assert doc.resource.id == '1'
+    assert len(requests) == 2
+    assert policy.stats()['reasons'] == {'status 504': 1}
+    await s.close()
@@ -0,0 +1,144 @@
+import json
+
+import pytest
+
+from jsonapi_client.codec import JsonCodec
+from jsonapi_client.exceptions import DocumentError, ValidationError
+from jsonapi_client.session import Session
+from jsonapi_client.streaming import DocumentStreamParser
+from jsonapi_client.transport import WSGITransport, ASGITransport
+
+
+SCHEMA = {'articles': {'properties': {'title': {'type': 'string'},
+                                      'author': {'relation': 'to-one',
+                                                 'resource': ['people']}}},
+          'people': {'properties': {'name': {'type': 'string'}}}}
+
+
+def article(id_, author_id='1'):
+    return {'type': 'articles', 'id': id_,
+            'attributes': {'title': f'Title "{id_}" [{{,}}]\\'},
+            'relationships': {'author': {'data': {'type': 'people', 'id': author_id}}}}
+
+
+PEOPLE = [{'type': 'people', 'id': '1', 'attributes': {'name': 'John'}}]
+
+PAGES = {
+    '/api/articles': {'included': PEOPLE,
+                      'data': [article('1'), article('2')],
+                      'links': {'next': '/api/articles?page=2'}},
+    '/api/articles?page=2': {'data': [article('3')],
+                             'included': PEOPLE,
+                             'links': {'next': '/api/articles?page=3'}},
+    '/api/articles?page=3': {'data': [], 'links': {'next': '/api/articles?page=4'}},
+    '/api/featured': {'data': article('4'), 'included': PEOPLE},
+}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1000])
+def test_parser_chunking(chunk_size):
+    document = PAGES['/api/articles']
+    content = json.dumps(document, indent=1).encode()
+    parser = DocumentStreamParser(JsonCodec())
+    elements, completed = [], []
+    for i in range(0, len(content), chunk_size):
+        new_elements, new_completed = parser.feed(content[i:i + chunk_size])
+        elements.extend(new_elements)
+        completed.extend(new_completed)
+    assert elements == document['data']
+    assert completed == ['included', 'data', 'links']
+    assert parser.data_streamed
+    assert parser.close() == {'included': PEOPLE, 'links': document['links']}
+
+
+def test_parser_single_resource_and_errors():
+    parser = DocumentStreamParser(JsonCodec())
+    assert parser.feed(json.dumps({'data': article('1')}).encode()) == ([], ['data'])
+    assert not parser.data_streamed
+    assert parser.close() == {'data': article('1')}
+
+    parser = DocumentStreamParser(JsonCodec())
+    parser.feed(b'{"data": [{"type": "articles", ')
+    with pytest.raises(ValidationError):
+        parser.close()
+    with pytest.raises(ValidationError):
+        DocumentStreamParser(JsonCodec()).feed(b'[]')
+
+
+def paging_wsgi_app(environ, start_response, progress):
+    url = environ['PATH_INFO']
+    if environ['QUERY_STRING']:
+        url += '?' + environ['QUERY_STRING']
+    if url not in PAGES:
+        start_response('404 Not Found', [])
+        return [json.dumps({'errors': [{'title': 'Not found'}]}).encode()]
+    content = json.dumps(PAGES[url]).encode()
+    start_response('200 OK', [('Content-Type', 'application/vnd.api+json')])
+
+    def body():
+        for i in range(0, len(content), 16):
+            progress[url] = i
+            yield content[i:i + 16]
+        progress[url] = 'done'
+    return body()
+
+
+def test_iterate_stream():
+    progress = {}
+    s = Session('http://testserver/api', schema=SCHEMA, transport=WSGITransport(
+        lambda environ, start_response: paging_wsgi_app(environ, start_response,
+                                                        progress)))
+    resources = []
+    for res in s.iterate('articles', stream=True):
+        if not resources:
+            # First resource is available before whole page has been received
+            assert progress['/api/articles'] != 'done'
+            # Included resources were received before data
+            assert res.author.name == 'John'
+        resources.append(res)
+    assert [r.id for r in resources] == ['1', '2', '3']
+    assert resources[2].title == 'Title "3" [{,}]\\'
+    assert progress['/api/articles?page=3'] == 'done'
+    assert '/api/articles?page=4' not in progress
+
+    doc = s.documents_by_link['http://testserver/api/articles']
+    assert doc.resources == resources[:2]
+    assert doc.links.next.url == 'http://testserver/api/articles?page=2'
+    assert s.resources_by_resource_identifier['people', '1'].name == 'John'
+
+    # Documents are cached
+    progress.clear()
+    assert [r.id for r in s.iterate('articles', stream=True)] == ['1', '2', '3']
+    assert not progress
+
+    with pytest.raises(DocumentError) as exp:
+        list(s.iterate('people', stream=True))
+    assert str(exp.value) == 'Error 404: Not found'
+
+
+def test_iterate_stream_single_resource():
+    s = Session('http://testserver/api', schema=SCHEMA, transport=WSGITransport(
+        lambda environ, start_response: paging_wsgi_app(environ, start_response, {})))
+    assert [r.id for r in s.iterate('featured')] == ['4']
+    s.invalidate()
+    assert [r.id for r in s.iterate('featured', stream=True)] == ['4']
+
+
+async def paging_asgi_app(scope, receive, send):
+    url = scope['path']
+    if scope['query_string']:
+        url += '?' + scope['query_string'].decode()
+    await send({'type': 'http.response.start', 'status': 200,
+                'headers': [(b'content-type', b'application/vnd.api+json')]})
+    await send({'type': 'http.response.body', 'body': json.dumps(PAGES[url]).encode()})
+
+
+@pytest.mark.asyncio
+async def test_iterate_stream_async():
+    s = Session('http://testserver/api', enable_async=True, schema=SCHEMA,
+                transport=ASGITransport(paging_asgi_app))
+    ids = [res.id async for res in s.iterate('articles', stream=True)]
+    assert ids == ['1', '2', '3']
+    assert s.resources_by_resource_identifier['people', '1'].name == 'John'
+    assert [res.id async for res in s.iterate('featured', stream=True)] == ['4']
+    await s.close()
@@ -0,0 +1,247 @@
+import asyncio
+import json
+
+import pytest
+
+from jsonapi_client.compression import compress, decompress_chunks, available_encodings
+from jsonapi_client.exceptions import AsyncError, DocumentError
+from jsonapi_client.objects import ResourceIdentifier
+from jsonapi_client.session import Session
+from jsonapi_client.transport import WSGITransport, ASGITransport
+
+
+ARTICLES = {
+    'data': [
+        {'type': 'articles', 'id': '1', 'attributes': {'title': 'First'}},
+        {'type': 'articles', 'id': '2', 'attributes': {'title': 'Second'}},
+    ]
+}
+SCHEMA = {'articles': {'properties': {'title': {'type': 'string'}}}}
+NOT_FOUND = {'errors': [{'title': 'Resource not found'}]}
+
+
+def handle(method, path, body):
+    """
+    Return (status, json) for a request to a minimal JSON API server.
+    """
+    if method == 'GET' and path == '/api/articles':
+        return 200, ARTICLES
+    if method == 'POST' and path == '/api/articles':
+        data = json.loads(body)['data']
+        return 201, {'data': {**data, 'id': '3'}}
+    return 404, NOT_FOUND
+
+
+def wsgi_app(environ, start_response):
+    body = environ['wsgi.input'].read(int(environ.get('CONTENT_LENGTH') or 0))
+    status, content = handle(environ['REQUEST_METHOD'], environ['PATH_INFO'], body)
+    start_response(f'{status} Whatever', [('Content-Type', 'application/vnd.api+json')])
+    return [json.dumps(content).encode()]
+
+
+async def asgi_app(scope, receive, send):
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    status, content = handle(scope['method'], scope['path'], body)
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/vnd.api+json')]})
+    await send({'type': 'http.response.body', 'body': json.dumps(content).encode()})
+
+
+def test_wsgi_transport():
+    s = Session('http://testserver/api', schema=SCHEMA,
+                transport=WSGITransport(wsgi_app))
+    doc = s.get('articles')
+    assert [r.title for r in doc.resources] == ['First', 'Second']
+
+    with pytest.raises(DocumentError) as exp:
+        s.get('people')
+    assert str(exp.value) == 'Error 404: Resource not found'
+
+    article = s.create_and_commit('articles', title='Third')
+    assert article.id == '3'
+    assert article.title == 'Third'
+    s.close()
+
+
+@pytest.mark.asyncio
+async def test_asgi_transport():
+    s = Session('http://testserver/api', enable_async=True, schema=SCHEMA,
+                transport=ASGITransport(asgi_app))
+    doc = await s.get('articles')
+    assert [r.title for r in doc.resources] == ['First', 'Second']
+
+    with pytest.raises(DocumentError) as exp:
+        await s.get('people')
+    assert str(exp.value) == 'Error 404: Resource not found'
+
+    article = await s.create_and_commit('articles', title='Third')
+    assert article.id == '3'
+    await s.close()
+
+
+def test_transport_mode_mismatch():
+    with pytest.raises(AsyncError):
+        Session('http://testserver/api', transport=ASGITransport(asgi_app))
+    with pytest.raises(AsyncError):
+        Session('http://testserver/api', enable_async=True,
+                transport=WSGITransport(wsgi_app))
+
+
+def compressing_wsgi_app(environ, start_response):
+    """
+    Compress response with the first accepted coding, and echo request body
+    back as title of the created article.
+    """
+    encoding = environ['HTTP_ACCEPT_ENCODING'].split(',')[0].strip()
+    body = environ['wsgi.input'].read(int(environ.get('CONTENT_LENGTH') or 0))
+    if environ.get('HTTP_CONTENT_ENCODING'):
+        body = decompress_chunks([body], environ['HTTP_CONTENT_ENCODING'])
+    if body:
+        status, content = 201, {'data': {'type': 'articles', 'id': '3',
+                                         'attributes': {'title': body.decode()}}}
+    else:
+        status, content = 200, ARTICLES
+    headers = [('Content-Type', 'application/vnd.api+json'),
+               ('X-Request-Encoding', environ.get('HTTP_CONTENT_ENCODING', ''))]
+    content = json.dumps(content).encode()
+    if encoding != 'identity':
+        content = compress(content, encoding)
+        headers.append(('Content-Encoding', encoding))
+    start_response(f'{status} Whatever', headers)
+    return [content[i:i + 10] for i in range(0, len(content), 10)]
+
+
+@pytest.mark.parametrize('encoding', available_encodings() + ['identity'])
+def test_response_compression(encoding):
+    accept_encodings = [] if encoding == 'identity' else [encoding]
+    s = Session('http://testserver/api', accept_encodings=accept_encodings,
+                transport=WSGITransport(compressing_wsgi_app))
+    doc = s.get('articles')
+    assert [r.title for r in doc.resources] == ['First', 'Second']
+
+
+def test_request_compression(mocker):
+    transport = WSGITransport(compressing_wsgi_app)
+    s = Session('http://testserver/api', schema=SCHEMA, transport=transport,
+                request_compression='gzip', request_compression_threshold=100)
+    spy = mocker.spy(transport, 'request')
+
+    short = s.create_and_commit('articles', title='Short')
+    assert spy.call_args[1]['headers'].get('Content-Encoding') is None
+    assert json.loads(short.title)['data']['attributes']['title'] == 'Short'
+
+    long = s.create_and_commit('articles', title='Long' * 100)
+    assert spy.call_args[1]['headers']['Content-Encoding'] == 'gzip'
+    assert json.loads(long.title)['data']['attributes']['title'] == 'Long' * 100
+
+    with pytest.raises(ValueError):
+        Session('http://testserver/api', request_compression='compress')
+
+
+def caching_wsgi_app(environ, start_response):
+    """
+    Serve ARTICLES with validators, responding 304 when client's copy is current.
+    """
+    caching_wsgi_app.requests.append(environ)
+    etag = f'"v{caching_wsgi_app.version}"'
+    headers = [('ETag', etag), ('Last-Modified', 'Wed, 21 Oct 2015 07:28:00 GMT')]
+    if environ.get('HTTP_IF_NONE_MATCH') == etag:
+        start_response('304 Not Modified', headers)
+        return []
+    start_response('200 OK', headers + [('Content-Type', 'application/vnd.api+json')])
+    return [json.dumps(ARTICLES).encode()]
+
+
+def test_conditional_revalidation():
+    caching_wsgi_app.requests = []
+    caching_wsgi_app.version = 1
+    s = Session('http://testserver/api', schema=SCHEMA, revalidate=True,
+                transport=WSGITransport(caching_wsgi_app))
+    doc = s.get('articles')
+    assert 'HTTP_IF_NONE_MATCH' not in caching_wsgi_app.requests[-1]
+
+    assert s.get('articles') is doc
+    request = caching_wsgi_app.requests[-1]
+    assert request['HTTP_IF_NONE_MATCH'] == '"v1"'
+    assert request['HTTP_IF_MODIFIED_SINCE'] == 'Wed, 21 Oct 2015 07:28:00 GMT'
+    assert not doc.resources[0].is_dirty
+
+    caching_wsgi_app.version = 2
+    new_doc = s.get('articles')
+    assert new_doc is not doc
+    assert [r.title for r in new_doc.resources] == ['First', 'Second']
+    assert s.get('articles') is new_doc
+    assert caching_wsgi_app.requests[-1]['HTTP_IF_NONE_MATCH'] == '"v2"'
+    assert len(caching_wsgi_app.requests) == 4
+
+    # Without revalidation cached document is returned without a request
+    s.revalidate = False
+    assert s.get('articles') is new_doc
+    assert len(caching_wsgi_app.requests) == 4
+
+
+async def caching_asgi_app(scope, receive, send):
+    headers = dict(scope['headers'])
+    caching_asgi_app.requests.append(headers)
+    if headers.get(b'if-none-match') == b'"v1"':
+        await send({'type': 'http.response.start', 'status': 304,
+                    'headers': [(b'etag', b'"v1"')]})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+    await send({'type': 'http.response.start', 'status': 200,
+                'headers': [(b'etag', b'"v1"')]})
+    await send({'type': 'http.response.body', 'body': json.dumps(ARTICLES).encode()})
+
+
+@pytest.mark.asyncio
+async def test_conditional_revalidation_async():
+    s = Session('http://testserver/api', enable_async=True, schema=SCHEMA,
+                revalidate=True, transport=ASGITransport(caching_asgi_app))
+    caching_asgi_app.requests = []
+    doc = await s.get('articles')
+    assert await s.get('articles') is doc
+    assert caching_asgi_app.requests[-1][b'if-none-match'] == b'"v1"'
+    await s.close()
+
+
+async def slow_asgi_app(scope, receive, send):
+    slow_asgi_app.requests.append(scope['path'])
+    await asyncio.sleep(0.01)
+    if scope['path'] == '/api/people/1':
+        content = {'data': {'type': 'people', 'id': '1', 'attributes': {'name': 'John'}}}
+    else:
+        content = ARTICLES
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': json.dumps(content).encode()})
+
+
+@pytest.mark.asyncio
+async def test_single_flight_async():
+    slow_asgi_app.requests = []
+    s = Session('http://testserver/api', enable_async=True, schema=SCHEMA,
+                transport=ASGITransport(slow_asgi_app))
+    docs = await asyncio.gather(*[s.get('articles') for _ in range(10)])
+    assert slow_asgi_app.requests == ['/api/articles']
+    assert all(doc is docs[0] for doc in docs)
+
+    author = ResourceIdentifier(s, {'type': 'people', 'id': '1'})
+    people = await asyncio.gather(*[
+        s.fetch_resource_by_resource_identifier_async(author) for _ in range(10)])
+    assert slow_asgi_app.requests == ['/api/articles', '/api/people/1']
+    assert all(p is people[0] for p in people)
+    assert people[0].name == 'John'
+
+    # Cancelling one waiter does not cancel the shared fetch
+    s.invalidate()
+    first = asyncio.ensure_future(s.get('articles'))
+    second = asyncio.ensure_future(s.get('articles'))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert [r.title for r in (await second).resources] == ['First', 'Second']
+    assert not s._in_flight
+    await s.close()
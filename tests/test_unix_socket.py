@@ -0,0 +1,56 @@
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from jsonapi_client.session import Session
+from jsonapi_client.transport import RequestsTransport
+
+
+class ArticleHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'data': {'type': 'articles', 'id': '1', 'attributes': {
+            'title': 'First', 'host': self.headers['Host'], 'path': self.path}}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.api+json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        return 'unix'
+
+    def log_message(self, *args):
+        pass
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    path = str(tmp_path / 'gateway.sock')
+    server = UnixHTTPServer(path, ArticleHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('scheme', ['http', 'https'])
+def test_requests_unix_socket(socket_path, scheme):
+    s = Session(f'{scheme}://gateway.example/api', unix_socket=socket_path)
+    assert isinstance(s._transport, RequestsTransport)
+    for id_ in ('1', '2'):
+        article = s.get('articles', id_).resource
+        assert article.title == 'First'
+        assert article.host.partition(':')[0] == 'gateway.example'
+        assert article.path == f'/api/articles/{id_}'
+    s.close()
+